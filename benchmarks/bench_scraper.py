@@ -0,0 +1,157 @@
+"""
+Offline Scraper benchmark built on recorded chart pages.
+
+Record the live charts once (needs network access):
+    python benchmarks/bench_scraper.py --record --snapshots benchmarks/snapshots
+
+Then benchmark every chart in MUSIC_CHART_SCRAPER_CONFIG from disk, with no network:
+    python benchmarks/bench_scraper.py --snapshots benchmarks/snapshots [--engine http|playwright] [--rounds 20]
+
+Or against the live charts (needs network access):
+    python benchmarks/bench_scraper.py --live --engine playwright [--rounds 3]
+
+Reports p50/p95 scrape latency, rows per second, peak RSS and, with Playwright, the requests blocked and
+bytes saved per scrape for each chart type. Each chart type is benchmarked in a fresh subprocess, so its
+peak RSS is its own rather than the running maximum. Peak RSS covers that process and, separately, its
+largest Chromium child process.
+
+With --live the bytes saved are measured: every round is also scraped with nothing blocked, and the
+response bytes the page loaded (Content-Length of its Playwright response events) are compared with
+the blocked run's. Snapshot replays abort every request but the chart page itself, so offline the
+column falls back to ResourceBlocker's per-resource-type estimate, marked with "~".
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from music_chart_scraper_config import MUSIC_CHART_SCRAPER_CONFIG  # noqa: E402
+from services.scrape_replay import ScrapeReplay, RECORD, REPLAY  # noqa: E402
+from services.scraper import Scraper  # noqa: E402
+
+DEFAULT_SNAPSHOTS = os.path.join(PROJECT_ROOT, "benchmarks", "snapshots")
+# Network rules for the unblocked baseline: the ResourceBlocker lets every request through and only counts bytes
+NO_BLOCKING = {"block_resource_types": [], "block_url_patterns": [], "allow_url_patterns": []}
+
+
+def peak_rss_mb(who: int) -> float:
+    """Peak resident set size in MB (ru_maxrss is KB on Linux and bytes on macOS)."""
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def quiet(scraper: Scraper) -> Scraper:
+    # Per-row logging would dominate the measurement
+    scraper.logger.setLevel(logging.WARNING)
+    return scraper
+
+
+def record(snapshots: str, engine: str) -> None:
+    replay = ScrapeReplay(snapshots, mode=RECORD)
+    for chart_type in MUSIC_CHART_SCRAPER_CONFIG:
+        songs = quiet(Scraper(chart_type=chart_type, engine=engine, replay=replay)).get_latest_chart()
+        print(f"Recorded {chart_type}: {len(songs.songs)} rows")
+
+
+def benchmark_chart(snapshots: str, engine: str, rounds: int, chart_type: str, live: bool = False) -> dict:
+    """
+    Scrape one chart `rounds` times, in this process.
+
+    :param live: Scrape the live chart instead of the snapshot directory, and measure the bytes saved
+        against an unblocked run of every round (Playwright only).
+    :return: The latency samples (seconds), row count, this process's peak RSS (MB), the last
+        scrape's blocked requests, the median measured bytes saved (None unless live) and the
+        estimated bytes saved (both None with the HTTP engine).
+    """
+    replay = None if live else ScrapeReplay(snapshots, mode=REPLAY)
+    scraper = quiet(Scraper(chart_type=chart_type, engine=engine, replay=replay))
+    baseline = None
+    if live and engine == "playwright":
+        baseline = quiet(Scraper(chart_type=chart_type, engine=engine))
+        baseline.network_config = dict(NO_BLOCKING)
+
+    samples = []
+    savings = []
+    rows = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        songs = scraper.get_latest_chart()
+        samples.append(time.perf_counter() - start)
+        rows = len(songs.songs)
+        if baseline is not None and scraper.last_network_stats:
+            baseline.get_latest_chart()
+            if baseline.last_network_stats:
+                savings.append(baseline.last_network_stats["bytes_loaded"]
+                               - scraper.last_network_stats["bytes_loaded"])
+    network = scraper.last_network_stats or {}
+    return {"samples": samples, "rows": rows, "rss_self": peak_rss_mb(resource.RUSAGE_SELF),
+            "rss_children": peak_rss_mb(resource.RUSAGE_CHILDREN),
+            "requests_blocked": network.get("requests_blocked"),
+            "bytes_saved": statistics.median(savings) if savings else None,
+            "bytes_saved_estimate": network.get("bytes_saved")}
+
+
+def benchmark(snapshots: str, engine: str, rounds: int, live: bool = False) -> dict:
+    """
+    Benchmark every chart, each in a fresh subprocess so peak RSS is measured per chart type.
+
+    :return: A dict mapping chart type to the result of benchmark_chart.
+    """
+    results = {}
+    for chart_type in MUSIC_CHART_SCRAPER_CONFIG:
+        command = [sys.executable, os.path.abspath(__file__), "--snapshots", snapshots, "--engine", engine,
+                   "--rounds", str(rounds), "--chart", chart_type]
+        if live:
+            command.append("--live")
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        results[chart_type] = json.loads(output.strip().splitlines()[-1])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshots", default=DEFAULT_SNAPSHOTS)
+    parser.add_argument("--engine", choices=["http", "playwright"], default="http")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--record", action="store_true", help="Record live chart pages instead of benchmarking")
+    parser.add_argument("--live", action="store_true",
+                        help="Benchmark the live charts and measure bytes saved against an unblocked run")
+    parser.add_argument("--chart", help=argparse.SUPPRESS)  # Benchmark one chart and print JSON (used per subprocess)
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.snapshots, args.engine)
+        return
+    if args.chart:
+        print(json.dumps(benchmark_chart(args.snapshots, args.engine, args.rounds, args.chart, live=args.live)))
+        return
+
+    results = benchmark(args.snapshots, args.engine, args.rounds, live=args.live)
+    print(f"engine={args.engine} rounds={args.rounds} live={args.live}")
+    print(f"{'chart':<32} {'rows':>5} {'p50 ms':>9} {'p95 ms':>9} {'rows/s':>9} {'RSS MB':>8} {'child MB':>9} {'blocked':>8} {'saved KB':>9}")
+    for chart_type, result in results.items():
+        samples = sorted(result["samples"])
+        p50 = statistics.median(samples)
+        p95 = samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))]
+        rows_per_second = result["rows"] / p50 if p50 else 0.0
+        blocked = "-" if result["requests_blocked"] is None else result["requests_blocked"]
+        if result["bytes_saved"] is not None:
+            saved_kb = f"{result['bytes_saved'] / 1024:.0f}"
+        elif result["bytes_saved_estimate"] is not None:
+            saved_kb = f"~{result['bytes_saved_estimate'] / 1024:.0f}"
+        else:
+            saved_kb = "-"
+        print(f"{chart_type:<32} {result['rows']:>5} {p50 * 1000:>9.1f} {p95 * 1000:>9.1f} {rows_per_second:>9.0f} "
+              f"{result['rss_self']:>8.1f} {result['rss_children']:>9.1f} {blocked:>8} {saved_kb:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare the Scraper row extraction modes against a saved chart page.
+
+The page is loaded once with ``page.set_content`` so the numbers only measure
+row extraction, not network or navigation time.
+
+Usage (from the project root):
+    python benchmarks/bench_scraper_extraction.py [--chart-type billboard_hot_100] [--rounds 20]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from playwright.sync_api import sync_playwright  # noqa: E402
+from services.scraper import Scraper, EXTRACTION_MODES  # noqa: E402
+
+DEFAULT_FIXTURE = os.path.join(PROJECT_ROOT, "tests", "fixtures", "charts", "billboard_hot_100.html")
+
+
+def run_benchmark(chart_type: str, fixture_path: str, rounds: int) -> dict:
+    """
+    Time each extraction mode on the same loaded page.
+
+    :return: A dict mapping extraction mode to a list of per-round timings in seconds.
+    """
+    with open(fixture_path, encoding="utf-8") as fixture:
+        html = fixture.read()
+
+    scrapers = {mode: Scraper(chart_type=chart_type, extraction_mode=mode) for mode in EXTRACTION_MODES}
+    for scraper in scrapers.values():
+        # Per-row logging would dominate the measurement
+        scraper.logger.setLevel(logging.WARNING)
+
+    timings = {mode: [] for mode in EXTRACTION_MODES}
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        page = browser.new_page()
+        page.set_content(html)
+
+        # Both modes must agree before their timings mean anything
+        reference = [song.to_dict() for song in scrapers["per_element"]._extract_songs(page)]
+        for mode, scraper in scrapers.items():
+            result = [song.to_dict() for song in scraper._extract_songs(page)]
+            if result != reference:
+                raise RuntimeError(f"Extraction mode '{mode}' returned different rows")
+
+        for _ in range(rounds):
+            for mode, scraper in scrapers.items():
+                start = time.perf_counter()
+                scraper._extract_songs(page)
+                timings[mode].append(time.perf_counter() - start)
+
+        browser.close()
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chart-type", default="billboard_hot_100")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    timings = run_benchmark(args.chart_type, args.fixture, args.rounds)
+    baseline = statistics.median(timings["per_element"])
+    print(f"{'mode':<12} {'median ms':>10} {'min ms':>10} {'speedup':>8}")
+    for mode, samples in timings.items():
+        median = statistics.median(samples)
+        print(f"{mode:<12} {median * 1000:>10.2f} {min(samples) * 1000:>10.2f} {baseline / median:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Spotify client throughput benchmark against a local stand-in Spotify API.
+
+Runs a tiny ASGI app under hypercorn (pip install -r benchmarks/requirements.txt) in a child
+process. It answers every request after a fixed delay that simulates the Web API's round-trip
+time, and it speaks HTTP/1.1 and HTTP/2 on the same port. The same number of searches is then issued through:
+
+    spotipy serial        - one request at a time, as the original playlist loop did
+    spotipy threads       - spotipy from a thread pool (HTTP/1.1)
+    async client h1       - AsyncSpotifyClient over HTTP/1.1 with asyncio.gather
+    async client h2       - AsyncSpotifyClient over HTTP/2, one multiplexed connection (as with api.spotify.com)
+    blocking facade h2    - BlockingSpotifyClient over HTTP/2 from a thread pool (what sync call sites use)
+
+    python benchmarks/bench_spotify_client.py [--requests 1000] [--concurrency 32] [--latency-ms 50]
+
+The stand-in is plain TCP, so HTTP/2 is spoken with prior knowledge instead of being negotiated by TLS ALPN.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import spotipy
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
+
+from services.spotify_operations.async_spotify_client import AsyncSpotifyClient, BlockingSpotifyClient  # noqa: E402
+
+SEARCH_RESPONSE = json.dumps({"tracks": {"items": [{"uri": "spotify:track:0"}]}}).encode()
+
+
+def serve_stand_in(port: int, latency: float) -> None:
+    from hypercorn.asyncio import serve
+    from hypercorn.config import Config
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(latency)
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(SEARCH_RESPONSE)).encode())
+        ]})
+        await send({"type": "http.response.body", "body": SEARCH_RESPONSE})
+
+    config = Config()
+    config.bind = [f"127.0.0.1:{port}"]
+    config.loglevel = "ERROR"
+    config.backlog = 1024
+    config.h2_max_concurrent_streams = 1000
+    asyncio.run(serve(app, config))
+
+
+def start_stand_in(latency: float):
+    """
+    Run the stand-in API in a child process, so it does not compete with the clients under test
+    for this process's GIL.
+
+    :return: The server process and its port.
+    """
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    process = multiprocessing.Process(target=serve_stand_in, args=(port, latency), daemon=True)
+    process.start()
+
+    deadline = time.time() + 10
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, port
+        except OSError:
+            if time.time() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    server, port = start_stand_in(args.latency_ms / 1000)
+    base_url = f"http://127.0.0.1:{port}/v1/"
+    queries = [f"artist:Artist {n} track:Song {n}" for n in range(args.requests)]
+
+    sp = spotipy.Spotify(auth="stand-in-token", retries=0)
+    sp.prefix = base_url
+
+    def spotipy_serial():
+        for query in queries:
+            sp.search(q=query, type="track", limit=1)
+
+    def spotipy_threads():
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(lambda query: sp.search(q=query, type="track", limit=1), queries))
+
+    def async_client(http1: bool):
+        async def run():
+            client = AsyncSpotifyClient(lambda: "stand-in-token", base_url=base_url, http1=http1,
+                                        max_connections=args.concurrency)
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def search(query):
+                async with semaphore:
+                    return await client.search(q=query, type="track", limit=1)
+            try:
+                await asyncio.gather(*(search(query) for query in queries))
+            finally:
+                await client.aclose()
+        asyncio.run(run())
+
+    blocking = BlockingSpotifyClient(lambda: "stand-in-token", base_url=base_url, http1=False)
+
+    def blocking_facade():
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(lambda query: blocking.search(q=query, type="track", limit=1), queries))
+
+    print(f"requests={args.requests} concurrency={args.concurrency} latency={args.latency_ms:.0f}ms")
+    print(f"{'client':<20} {'seconds':>8} {'req/s':>8}")
+    for name, fn in [("spotipy serial", spotipy_serial),
+                     ("spotipy threads", spotipy_threads),
+                     ("async client h1", lambda: async_client(http1=True)),
+                     ("async client h2", lambda: async_client(http1=False)),
+                     ("blocking facade h2", blocking_facade)]:
+        elapsed = timed(fn)
+        print(f"{name:<20} {elapsed:>8.2f} {args.requests / elapsed:>8.0f}")
+
+    blocking.close()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,140 @@
+import atexit
+import json
 import logging
-from flask import Flask, jsonify, request
+import time
+from datetime import date
+from flask import Flask, Response, jsonify, request, stream_with_context, url_for
+from config import Config
+from services.browser_pool import BrowserPool
+from services.chart_archive import ChartArchive
+from services.chart_cache import ChartCache
+from services.insights_cache import InsightsCache
+from services.job_queue import JobQueueFull, JobRunner, JobStore
+from services.single_flight import single_flight_metrics
+from services.client_registry import get_client_registry
 from services.playlist_manager import PlaylistManager
+from services.spotify_operations.track_cache import TrackCache
+from services.spotify_operations.track_index import TrackIndex
+from services.spotify_operations.track_resolver import TokenBucket
 from services.spotify_operations.user_info_viewer import UserInfoViewer
 from music_chart_scraper_config import MUSIC_CHART_SCRAPER_CONFIG
-from services.gpt_operations import GPTOperations
 
 # Set up logging with a prefix
 logging.basicConfig(level=logging.INFO, format='[App] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Seconds an event stream waits for new job events per read, and between keep-alive comments
+JOB_EVENTS_WAIT = 1.0
+JOB_EVENTS_KEEPALIVE = 15.0
+
 app = Flask(__name__)
-playlist_manager = PlaylistManager()
-user_info_viewer = UserInfoViewer()
-gpt_operations = GPTOperations()
+config = Config()
+
+# One Spotify session/auth and one OpenAI client for the whole process, connected before the first request
+clients = get_client_registry()
+clients.start()
+atexit.register(clients.close)
+
+# One browser pool for the whole process; scrapes lease pages from it instead of launching Chromium
+browser_pool = BrowserPool(
+    size=config.get_browser_pool_size(),
+    max_pages_per_browser=config.get_browser_pool_max_pages(),
+    reuse_context=config.get_browser_pool_reuse_context()
+)
+atexit.register(browser_pool.close)
+
+chart_cache = ChartCache(config.get_chart_cache_path())
+atexit.register(chart_cache.close)
+
+chart_archive = ChartArchive(config.get_chart_archive_path())
+atexit.register(chart_archive.close)
+
+# Shared by every worker process through WAL; each process keeps its own hit/miss counters
+track_cache = TrackCache(config.get_track_cache_path())
+atexit.register(track_cache.close)
+
+# Every track seen in search results and playlists, so known songs resolve without a Spotify search
+track_index = TrackIndex(config.get_track_index_path())
+atexit.register(track_index.close)
+
+# Collaborator insights per playlist, reused until the playlist's snapshot_id changes
+insights_cache = InsightsCache(config.get_insights_cache_path())
+atexit.register(insights_cache.close)
+
+# One token bucket for every Spotify track search in this process
+spotify_rate_limiter = TokenBucket(rate=config.get_spotify_requests_per_second())
+
+playlist_manager = PlaylistManager(browser_pool=browser_pool, chart_cache=chart_cache, chart_archive=chart_archive,
+                                   track_cache=track_cache, rate_limiter=spotify_rate_limiter,
+                                   search_concurrency=config.get_spotify_search_concurrency(),
+                                   use_async_client=config.get_spotify_async_client(),
+                                   spotify_auth=clients.get_spotify_auth(),
+                                   gpt_operations=clients.get_gpt_operations(), track_index=track_index,
+                                   insights_cache=insights_cache)
+user_info_viewer = UserInfoViewer(auth=clients.get_spotify_auth())
+gpt_operations = clients.get_gpt_operations()
+
+# Playlist creation runs as background jobs; each handler takes the job's JSON params and a progress callback.
+# A job interrupted after creating its playlist is requeued with params['playlist_id'] and syncs that playlist.
+def run_chart_playlist_job(params, progress_callback):
+    return playlist_manager.create_playlist(chart_type=params['chart_type'], bypass_cache=params['bypass_cache'],
+                                            playlist_id=params.get('playlist_id'), progress_callback=progress_callback)
+
+def run_sync_playlist_job(params, progress_callback):
+    return playlist_manager.create_playlist(chart_type=params['chart_type'], playlist_id=params['playlist_id'],
+                                            bypass_cache=params['bypass_cache'], progress_callback=progress_callback)
+
+def run_historical_chart_playlist_job(params, progress_callback):
+    return playlist_manager.create_playlist(chart_type=params['chart_type'],
+                                            chart_date=date.fromisoformat(params['chart_date']),
+                                            playlist_id=params.get('playlist_id'), progress_callback=progress_callback)
+
+def run_gpt_playlist_job(params, progress_callback):
+    # Stream songs from GPT so Spotify searches start while the rest are generated
+    return playlist_manager.create_playlist(song_stream=gpt_operations.stream_songs(params['prompt']),
+                                            playlist_name=params['playlist_name'], playlist_id=params.get('playlist_id'),
+                                            progress_callback=progress_callback)
+
+def run_mood_or_activity_playlist_job(params, progress_callback):
+    if params.get('playlist_id'):
+        songs = gpt_operations.stream_songs_by_mood_or_activity(params['mood_or_activity'])
+        return playlist_manager.create_playlist(song_stream=songs, playlist_id=params['playlist_id'],
+                                                progress_callback=progress_callback)
+    return playlist_manager.create_mood_or_activity_playlist(mood_or_activity=params['mood_or_activity'],
+                                                             playlist_name=params['playlist_name'],
+                                                             progress_callback=progress_callback)
+
+# Jobs are persisted, so work accepted before a restart is picked up again by start()
+job_store = JobStore(config.get_job_store_path())
+job_runner = JobRunner(job_store, {
+    "chart_playlist": run_chart_playlist_job,
+    "sync_playlist": run_sync_playlist_job,
+    "historical_chart_playlist": run_historical_chart_playlist_job,
+    "gpt_playlist": run_gpt_playlist_job,
+    "mood_or_activity_playlist": run_mood_or_activity_playlist_job
+}, max_workers=config.get_job_workers(), max_pending=config.get_job_max_pending())
+job_runner.start()
+atexit.register(job_store.close)
+atexit.register(job_runner.close)
+
+def submit_job(kind, params):
+    """Queue a job and answer 202 with its ID and status URL, or 503 when the queue is full."""
+    try:
+        job = job_runner.submit(kind, params)
+    except JobQueueFull as e:
+        logger.warning(f"Refusing {kind} job: {str(e)}")
+        return jsonify({"error": "Too many playlist jobs in progress, try again later"}), 503
+    status_url = url_for('get_job', job_id=job.id)
+    return jsonify({"job_id": job.id, "status": job.status, "status_url": status_url}), 202, {"Location": status_url}
 
 def create_playlist_handler(chart_type):
     try:
-        logger.info(f"Attempting to create playlist for chart type: {chart_type}")
-        playlist_manager.create_playlist(chart_type=chart_type)
-        logger.info(f"Successfully created playlist for {chart_type}")
-        return jsonify({"message": f"{chart_type.replace('_', ' ').title()} playlist created successfully"}), 201
+        logger.info(f"Queueing playlist creation for chart type: {chart_type}")
+        # ?bypass_cache=true forces a fresh scrape instead of a cached chart snapshot
+        bypass_cache = request.args.get('bypass_cache', 'false').lower() == 'true'
+        return submit_job("chart_playlist", {"chart_type": chart_type, "bypass_cache": bypass_cache})
     except Exception as e:
-        logger.error(f"Error creating playlist for {chart_type}: {str(e)}")
+        logger.error(f"Error queueing playlist for {chart_type}: {str(e)}")
         return jsonify({"error": f"Failed to create playlist for {chart_type}"}), 500
 
 @app.route('/create/playlist/billboard_tiktok_top_50', methods=['POST'])
@@ -36,6 +149,54 @@ def create_billboard_hot_100_playlist():
 def create_billboard_decade_end_hot_100_playlist():
     return create_playlist_handler("billboard_decade_end_hot_100")
 
+@app.route('/sync/playlist/<chart_type>/<playlist_id>', methods=['POST'])
+def sync_chart_playlist(chart_type, playlist_id):
+    if chart_type not in MUSIC_CHART_SCRAPER_CONFIG:
+        return jsonify({"error": f"Unknown chart type '{chart_type}'"}), 400
+
+    try:
+        logger.info(f"Queueing sync of playlist {playlist_id} to {chart_type}")
+        bypass_cache = request.args.get('bypass_cache', 'false').lower() == 'true'
+        return submit_job("sync_playlist",
+                          {"chart_type": chart_type, "playlist_id": playlist_id, "bypass_cache": bypass_cache})
+    except Exception as e:
+        logger.error(f"Error syncing playlist {playlist_id} to {chart_type}: {str(e)}")
+        return jsonify({"error": f"Failed to sync playlist {playlist_id} to {chart_type}"}), 500
+
+@app.route('/create/playlist/<chart_type>/<chart_date>', methods=['POST'])
+def create_historical_chart_playlist(chart_type, chart_date):
+    try:
+        week = date.fromisoformat(chart_date)
+    except ValueError:
+        return jsonify({"error": "Chart date must be formatted as YYYY-MM-DD"}), 400
+    if not MUSIC_CHART_SCRAPER_CONFIG.get(chart_type, {}).get('date_url'):
+        return jsonify({"error": f"Chart type '{chart_type}' does not support dated charts"}), 400
+
+    try:
+        logger.info(f"Queueing playlist creation for {chart_type} on {chart_date}")
+        return submit_job("historical_chart_playlist", {"chart_type": chart_type, "chart_date": week.isoformat()})
+    except Exception as e:
+        logger.error(f"Error creating playlist for {chart_type} on {chart_date}: {str(e)}")
+        return jsonify({"error": f"Failed to create playlist for {chart_type} on {chart_date}"}), 500
+
+@app.route('/charts/<chart_type>/archive', methods=['GET'])
+def get_chart_archive(chart_type):
+    try:
+        start = date.fromisoformat(request.args['start'])
+        end = date.fromisoformat(request.args['end'])
+        max_rank = request.args.get('max_rank', type=int)
+    except (KeyError, ValueError):
+        return jsonify({"error": "start and end are required and must be formatted as YYYY-MM-DD"}), 400
+
+    try:
+        weeks = chart_archive.get_range(chart_type, start, end, max_rank=max_rank)
+        return jsonify({
+            chart_date: [song.to_dict() for song in songs.songs] for chart_date, songs in weeks.items()
+        }), 200
+    except Exception as e:
+        logger.error(f"Error reading chart archive for {chart_type}: {str(e)}")
+        return jsonify({"error": "Failed to read chart archive"}), 500
+
 @app.route('/user/info', methods=['GET'])
 def get_user_info():
     try:
@@ -60,17 +221,7 @@ def create_gpt_playlist():
         if not prompt:
             return jsonify({"error": "No prompt provided"}), 400
 
-        # Get songs from GPT
-        gpt_ops = GPTOperations()
-        songs_data = gpt_ops.fetch_songs(prompt)
-        
-        # Create playlist using the songs
-        result = playlist_manager.create_playlist(
-            songs_data=songs_data,
-            playlist_name=playlist_name
-        )
-        
-        return jsonify(result), 201 if result['status'] == 'success' else 500
+        return submit_job("gpt_playlist", {"prompt": prompt, "playlist_name": playlist_name})
         
     except Exception as e:
         logger.error(f"Error creating GPT playlist: {str(e)}")
@@ -95,15 +246,70 @@ def create_mood_or_activity_playlist():
         if not mood_or_activity:
             return jsonify({"error": "Mood or activity not specified."}), 400
         
-        result = playlist_manager.create_mood_or_activity_playlist(
-            mood_or_activity=mood_or_activity,
-            playlist_name=playlist_name
-        )
-        return jsonify(result), 201 if result['status'] == 'success' else 500
+        return submit_job("mood_or_activity_playlist",
+                          {"mood_or_activity": mood_or_activity, "playlist_name": playlist_name})
     except Exception as e:
         logger.error(f"Error creating mood/activity playlist: {str(e)}")
         return jsonify({"error": "Failed to create playlist."}), 500
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    try:
+        job = job_store.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Job '{job_id}' not found"}), 404
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {str(e)}")
+        return jsonify({"error": "Failed to fetch job"}), 500
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_job_events(job_id):
+    """
+    Server-Sent Events stream of a job's progress. Every event recorded so far is replayed, then new
+    events are pushed as they happen until the job's final "done" event, or an "error" event when
+    the job stops without one or goes silent (see JobStore.follow). A reconnecting client's
+    Last-Event-ID header resumes after the last event it received.
+    """
+    try:
+        if job_store.get(job_id) is None:
+            return jsonify({"error": f"Job '{job_id}' not found"}), 404
+        last_event_id = request.headers.get('Last-Event-ID', '0')
+        after = int(last_event_id) if last_event_id.isdigit() else 0
+    except Exception as e:
+        logger.error(f"Error opening event stream for job {job_id}: {str(e)}")
+        return jsonify({"error": "Failed to stream job events"}), 500
+
+    def generate(after):
+        last_sent = time.monotonic()
+        for item in job_store.follow(job_id, after=after, wait=JOB_EVENTS_WAIT):
+            if item is None:
+                if time.monotonic() - last_sent >= JOB_EVENTS_KEEPALIVE:
+                    # Comment lines keep proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    last_sent = time.monotonic()
+                continue
+            seq, event = item
+            event_id = f"id: {seq}\n" if seq is not None else ""
+            yield f"{event_id}event: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+            last_sent = time.monotonic()
+
+    return Response(stream_with_context(generate(after)), mimetype='text/event-stream',
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify({
+        "chart_cache": chart_cache.metrics(),
+        "track_cache": track_cache.metrics(),
+        "track_index": track_index.metrics(),
+        "insights_cache": insights_cache.metrics(),
+        "gpt_cache": clients.get_gpt_cache().metrics(),
+        "single_flight": single_flight_metrics(),
+        "jobs": job_runner.metrics(),
+        "track_matcher": playlist_manager.spotify_maker.matcher.metrics()
+    }), 200
+
 @app.errorhandler(404)
 def not_found(error):
     logger.warning(f"404 error: {request.url}")
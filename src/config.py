@@ -27,6 +27,29 @@ class Config:
         self.SPOTIPY_REDIRECT_URI = os.getenv('SPOTIPY_REDIRECT_URI')
         self.GPT_KEY = os.getenv('GPT_KEY')
         self.GPT_MODEL = os.getenv('GPT_MODEL', 'gpt-4o-mini')
+        self.BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+        self.BROWSER_POOL_MAX_PAGES = int(os.getenv('BROWSER_POOL_MAX_PAGES', '50'))
+        self.BROWSER_POOL_REUSE_CONTEXT = os.getenv('BROWSER_POOL_REUSE_CONTEXT', 'false').lower() == 'true'
+        self.CHART_CACHE_PATH = os.getenv('CHART_CACHE_PATH', 'chart_cache.sqlite3')
+        self.CHART_ARCHIVE_PATH = os.getenv('CHART_ARCHIVE_PATH', 'chart_archive.sqlite3')
+        self.TRACK_CACHE_PATH = os.getenv('TRACK_CACHE_PATH', 'track_cache.sqlite3')
+        self.TRACK_INDEX_PATH = os.getenv('TRACK_INDEX_PATH', 'track_index.sqlite3')
+        self.INSIGHTS_CACHE_PATH = os.getenv('INSIGHTS_CACHE_PATH', 'insights_cache.sqlite3')
+        self.GPT_CACHE_PATH = os.getenv('GPT_CACHE_PATH', 'gpt_cache.sqlite3')
+        self.GPT_CACHE_TTL = float(os.getenv('GPT_CACHE_TTL', str(7 * 24 * 3600)))
+        self.GPT_CACHE_SIMILARITY = float(os.getenv('GPT_CACHE_SIMILARITY', '0'))
+        self.JOB_STORE_PATH = os.getenv('JOB_STORE_PATH', 'jobs.sqlite3')
+        self.JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+        self.JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', '50'))
+        self.SPOTIFY_SEARCH_CONCURRENCY = int(os.getenv('SPOTIFY_SEARCH_CONCURRENCY', '8'))
+        self.SPOTIFY_REQUESTS_PER_SECOND = float(os.getenv('SPOTIFY_REQUESTS_PER_SECOND', '10'))
+        self.SPOTIFY_ASYNC_CLIENT = os.getenv('SPOTIFY_ASYNC_CLIENT', 'false').lower() == 'true'
+        self.SPOTIFY_TOKEN_CACHE_PATH = os.getenv('SPOTIFY_TOKEN_CACHE_PATH', '.cache')
+        self.SPOTIFY_HTTP_POOL_SIZE = int(os.getenv('SPOTIFY_HTTP_POOL_SIZE', '20'))
+        self.SPOTIFY_HTTP_TIMEOUT = float(os.getenv('SPOTIFY_HTTP_TIMEOUT', '10'))
+        self.SPOTIFY_HTTP_RETRIES = int(os.getenv('SPOTIFY_HTTP_RETRIES', '3'))
+        self.OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))
+        self.OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
         self._log_variables()
 
     def _log_variables(self) -> None:
@@ -74,4 +97,96 @@ class Config:
     
     def get_gpt_model(self) -> str:
         """Returns the GPT model."""
-        return self.GPT_MODEL
\ No newline at end of file
+        return self.GPT_MODEL
+
+    def get_browser_pool_size(self) -> int:
+        """Returns the number of browsers kept in the shared browser pool."""
+        return self.BROWSER_POOL_SIZE
+
+    def get_browser_pool_max_pages(self) -> int:
+        """Returns how many pages a pooled browser serves before it is recycled."""
+        return self.BROWSER_POOL_MAX_PAGES
+
+    def get_browser_pool_reuse_context(self) -> bool:
+        """Returns whether pooled browsers reuse one cached, stripped-down context."""
+        return self.BROWSER_POOL_REUSE_CONTEXT
+
+    def get_chart_cache_path(self) -> str:
+        """Returns the path of the SQLite chart snapshot cache."""
+        return self.CHART_CACHE_PATH
+
+    def get_chart_archive_path(self) -> str:
+        """Returns the path of the SQLite historical chart archive."""
+        return self.CHART_ARCHIVE_PATH
+
+    def get_track_cache_path(self) -> str:
+        """Returns the path of the SQLite Spotify track search cache."""
+        return self.TRACK_CACHE_PATH
+
+    def get_track_index_path(self) -> str:
+        """Returns the path of the SQLite full-text index of known Spotify tracks."""
+        return self.TRACK_INDEX_PATH
+
+    def get_insights_cache_path(self) -> str:
+        """Returns the path of the SQLite playlist insights cache."""
+        return self.INSIGHTS_CACHE_PATH
+
+    def get_gpt_cache_path(self) -> str:
+        """Returns the path of the SQLite GPT response cache."""
+        return self.GPT_CACHE_PATH
+
+    def get_gpt_cache_ttl(self) -> float:
+        """Returns the seconds a cached GPT song list stays valid."""
+        return self.GPT_CACHE_TTL
+
+    def get_gpt_cache_similarity(self) -> float:
+        """Returns the prompt similarity (0-1) needed to reuse a reworded prompt's songs; 0 disables it."""
+        return self.GPT_CACHE_SIMILARITY
+
+    def get_job_store_path(self) -> str:
+        """Returns the path of the SQLite store of background jobs."""
+        return self.JOB_STORE_PATH
+
+    def get_job_workers(self) -> int:
+        """Returns the number of background jobs run at once per process."""
+        return self.JOB_WORKERS
+
+    def get_job_max_pending(self) -> int:
+        """Returns the number of waiting or running jobs per process before new jobs are refused."""
+        return self.JOB_MAX_PENDING
+
+    def get_spotify_search_concurrency(self) -> int:
+        """Returns the maximum number of Spotify track searches run at once."""
+        return self.SPOTIFY_SEARCH_CONCURRENCY
+
+    def get_spotify_requests_per_second(self) -> float:
+        """Returns the steady request rate allowed by the shared Spotify rate limiter."""
+        return self.SPOTIFY_REQUESTS_PER_SECOND
+
+    def get_spotify_async_client(self) -> bool:
+        """Returns whether hot-path Spotify calls use the pooled asyncio client instead of spotipy."""
+        return self.SPOTIFY_ASYNC_CLIENT
+
+    def get_spotify_token_cache_path(self) -> str:
+        """Returns the path of the Spotify OAuth token file shared by all worker processes."""
+        return self.SPOTIFY_TOKEN_CACHE_PATH
+
+    def get_spotify_http_pool_size(self) -> int:
+        """Returns the number of keep-alive connections pooled for the Spotify Web API."""
+        return self.SPOTIFY_HTTP_POOL_SIZE
+
+    def get_spotify_http_timeout(self) -> float:
+        """Returns the timeout in seconds of Spotify Web API requests."""
+        return self.SPOTIFY_HTTP_TIMEOUT
+
+    def get_spotify_http_retries(self) -> int:
+        """Returns how many times a failed Spotify Web API request is retried by the shared session."""
+        return self.SPOTIFY_HTTP_RETRIES
+
+    def get_openai_timeout(self) -> float:
+        """Returns the timeout in seconds of OpenAI requests."""
+        return self.OPENAI_TIMEOUT
+
+    def get_openai_max_retries(self) -> int:
+        """Returns how many times a failed OpenAI request is retried."""
+        return self.OPENAI_MAX_RETRIES
\ No newline at end of file
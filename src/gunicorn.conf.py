@@ -0,0 +1,17 @@
+import os
+
+# Gunicorn settings for the Flask app, read automatically when started from src: `gunicorn app:app`
+bind = os.getenv('GUNICORN_BIND', '127.0.0.1:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+
+# GET /jobs/<job_id>/events keeps its response open for as long as the job runs (up to an hour).
+# A sync worker would be held by one stream and killed after `timeout`, so each worker serves
+# requests on a thread pool instead; every open event stream occupies one of these threads.
+# gevent is not an option: the Playwright sync API and the job runner's threads do not survive
+# its monkey-patching.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+
+# With gthread this only bounds how long a worker may go without notifying the arbiter, not how
+# long a request may take
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
@@ -20,4 +20,17 @@ class Songs:
             str: A JSON string representation of the songs.
         """
         # Convert each song to a dictionary and serialize to JSON
-        return json.dumps([song.to_dict() for song in self.songs], indent=4)
\ No newline at end of file
+        return json.dumps([song.to_dict() for song in self.songs], indent=4)
+
+    @classmethod
+    def from_json(cls, json_str: str) -> "Songs":
+        """
+        Build a Songs object from a JSON string produced by to_json.
+
+        Args:
+            json_str (str): A JSON array of objects with title and artist keys.
+
+        Returns:
+            Songs: A Songs instance with one Song per array entry.
+        """
+        return cls([Song(song["title"], song["artist"]) for song in json.loads(json_str)])
@@ -1,4 +1,28 @@
+# Request blocking applied to every Playwright scrape. A chart can override any key with its own
+# "network" entry; allow_url_patterns always win over the deny rules.
+DEFAULT_NETWORK_CONFIG = {
+    "block_resource_types": ["image", "media", "font", "stylesheet"],
+    "block_url_patterns": [
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*googletagmanager.com*",
+        "*google-analytics.com*",
+        "*amazon-adsystem.com*",
+        "*scorecardresearch.com*",
+        "*facebook.net*",
+        "*chartbeat.com*",
+        "*permutive.com*"
+    ],
+    "allow_url_patterns": []
+}
+
+# Seconds a cached chart stays fresh unless the chart sets its own "cache_ttl"
+DEFAULT_CHART_CACHE_TTL = 6 * 3600
+
 # Consolidated configuration dictionary for various music charts
+# "date_url" (optional) is the URL of a past chart week; {date} is the week-ending date (YYYY-MM-DD).
+# "engine" picks the scraper engine: "http" parses the server-rendered page without a browser
+# (falling back to Playwright when no rows match), "playwright" always renders in Chromium.
 MUSIC_CHART_SCRAPER_CONFIG = {
     "billboard_tiktok_top_50": {
         "tags": {
@@ -6,7 +30,9 @@ MUSIC_CHART_SCRAPER_CONFIG = {
             "title": "h3.c-title",                                   # Song title tag
             "artist": "span.c-label.a-font-primary-s"                # Artist name tag
         },
-        "url": "https://www.billboard.com/charts/tiktok-billboard-top-50/"
+        "url": "https://www.billboard.com/charts/tiktok-billboard-top-50/",
+        "date_url": "https://www.billboard.com/charts/tiktok-billboard-top-50/{date}/",
+        "engine": "http"
     },
     "billboard_hot_100": {
         "tags": {
@@ -14,7 +40,9 @@ MUSIC_CHART_SCRAPER_CONFIG = {
             "title": "h3.c-title",                                    # Song title tag
             "artist": "span.c-label.a-no-trucate.a-font-primary-s"    # Artist name tag
         },
-        "url": "https://www.billboard.com/charts/hot-100"
+        "url": "https://www.billboard.com/charts/hot-100",
+        "date_url": "https://www.billboard.com/charts/hot-100/{date}/",
+        "engine": "http"
     },
      "billboard_decade_end_hot_100": {
         "tags": {
@@ -22,6 +50,8 @@ MUSIC_CHART_SCRAPER_CONFIG = {
             "title": "h3.c-title",                                    # Song title tag
             "artist": "span.c-label.a-font-primary-s"                 # Artist name tag
         },
-        "url": "https://www.billboard.com/charts/decade-end/hot-100"
+        "url": "https://www.billboard.com/charts/decade-end/hot-100",
+        "engine": "http",
+        "cache_ttl": 7 * 24 * 3600                                    # Decade-end chart never changes
     } # You can add more chart configurations here from other sources
 }
\ No newline at end of file
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+from playwright.async_api import async_playwright
+from model.songs import Songs
+from model.chart_tags import ChartTags
+from music_chart_scraper_config import MUSIC_CHART_SCRAPER_CONFIG
+from services.scraper import EXTRACT_ROWS_SCRIPT, rows_to_songs
+
+class AsyncScraper:
+    def __init__(self, headless: bool = True, concurrency: int = 4):
+        """
+        Initialize the AsyncScraper class, which scrapes several charts at once inside one browser.
+
+        :param headless: Whether to run the browser in headless mode (default True).
+        :param concurrency: Maximum number of charts loaded at the same time (default 4).
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+
+        self.headless = headless
+        self.concurrency = concurrency
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[AsyncScraper] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    async def scrape_charts(self, chart_types: Optional[Iterable[str]] = None
+                            ) -> Tuple[Dict[str, Songs], Dict[str, str]]:
+        """
+        Scrape the given charts concurrently.
+
+        A chart that fails maps to an empty Songs object and its error is returned alongside;
+        the other charts in the batch are unaffected. Errors belong to the call, so concurrent
+        batches on one AsyncScraper do not mix them up.
+
+        :param chart_types: Chart types from MUSIC_CHART_SCRAPER_CONFIG (default every configured chart).
+        :return: A dict mapping each chart type to its Songs, in the order requested, and a dict
+            mapping each failed chart type to its error message.
+        """
+        chart_types = list(chart_types) if chart_types is not None else list(MUSIC_CHART_SCRAPER_CONFIG)
+        errors: Dict[str, str] = {}
+        self.logger.info(f"Scraping {len(chart_types)} charts with concurrency={self.concurrency}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        try:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=self.headless)
+                self.logger.info("Browser launched")
+                try:
+                    results = await asyncio.gather(
+                        *(self._scrape_chart(browser, semaphore, chart_type, errors) for chart_type in chart_types)
+                    )
+                finally:
+                    await browser.close()
+        except Exception as e:
+            self.logger.error(f"An error occurred while starting the browser: {e}")
+            for chart_type in chart_types:
+                errors.setdefault(chart_type, str(e))
+            return {chart_type: Songs([]) for chart_type in chart_types}, errors
+
+        return dict(results), errors
+
+    async def _scrape_chart(self, browser, semaphore: asyncio.Semaphore, chart_type: str, errors: Dict[str, str]):
+        """Scrape one chart in its own browser context, never raising; a failure is recorded in errors."""
+        async with semaphore:
+            try:
+                config = MUSIC_CHART_SCRAPER_CONFIG.get(chart_type)
+                if not config:
+                    raise ValueError(f"Chart type '{chart_type}' is not supported.")
+                tags = ChartTags(config['tags']["chart_item"], config['tags']["title"], config['tags']["artist"])
+
+                context = await browser.new_context()
+                try:
+                    page = await context.new_page()
+                    self.logger.info(f"Navigating to URL: {config['url']}")
+                    await page.goto(config['url'], wait_until="domcontentloaded", timeout=60000)
+                    await page.wait_for_selector(tags.chart_item, timeout=60000)
+                    rows = await page.eval_on_selector_all(tags.chart_item, EXTRACT_ROWS_SCRIPT, [tags.title, tags.artist])
+                finally:
+                    await context.close()
+
+                songs = rows_to_songs(rows)
+                self.logger.info(f"Successfully scraped {len(songs)} songs from {chart_type}")
+                return chart_type, Songs(songs)
+
+            except Exception as e:
+                self.logger.error(f"An error occurred while scraping {chart_type}: {e}")
+                errors[chart_type] = str(e)
+                return chart_type, Songs([])
+
+
+def scrape_charts(chart_types: Optional[Iterable[str]] = None, headless: bool = True,
+                  concurrency: int = 4) -> Tuple[Dict[str, Songs], Dict[str, str]]:
+    """
+    Scrape several charts concurrently from synchronous code.
+
+    :param chart_types: Chart types from MUSIC_CHART_SCRAPER_CONFIG (default every configured chart).
+    :param headless: Whether to run the browser in headless mode (default True).
+    :param concurrency: Maximum number of charts loaded at the same time (default 4).
+    :return: A dict mapping each chart type to its Songs, and a dict of error messages per failed chart type.
+    """
+    scraper = AsyncScraper(headless=headless, concurrency=concurrency)
+    return asyncio.run(scraper.scrape_charts(chart_types))
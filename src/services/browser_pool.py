@@ -0,0 +1,197 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+from playwright.sync_api import sync_playwright
+
+# Options for the stripped-down context reused across leases: no service workers,
+# a small viewport and no downloads.
+LEAN_CONTEXT_OPTIONS = {
+    "service_workers": "block",
+    "viewport": {"width": 800, "height": 600},
+    "accept_downloads": False
+}
+
+class BrowserPool:
+    def __init__(self, size: int = 2, headless: bool = True, max_pages_per_browser: int = 50,
+                 reuse_context: bool = False):
+        """
+        Initialize a pool of long-lived Chromium browsers shared across Scraper instances.
+
+        The Playwright sync API is bound to the thread that started it, so every worker thread
+        owns one browser and callers lease a page by submitting a callable through run().
+        Workers are started lazily on the first lease.
+
+        :param size: Number of worker browsers (default 2).
+        :param headless: Whether to run the browsers in headless mode (default True).
+        :param max_pages_per_browser: Pages a browser serves before it is relaunched (default 50).
+        :param reuse_context: Keep one cached, stripped-down context per browser and open each leased
+            page in it, instead of a fresh context per lease (default False). The cached context keeps
+            its HTTP cache between scrapes; it is dropped whenever its browser is recycled.
+        """
+        if size < 1:
+            raise ValueError("Browser pool size must be at least 1.")
+        if max_pages_per_browser < 1:
+            raise ValueError("max_pages_per_browser must be at least 1.")
+
+        self.size = size
+        self.headless = headless
+        self.max_pages_per_browser = max_pages_per_browser
+        self.reuse_context = reuse_context
+
+        self._tasks = queue.Queue()
+        self._workers = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {
+            "pages_served": 0,
+            "browsers_launched": 0,
+            "browsers_recycled": 0,
+            "unhealthy_browsers": 0
+        }
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[BrowserPool] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def run(self, fn: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """
+        Lease a fresh page from the pool, call fn(page) on the owning worker thread and return its result.
+
+        The page is closed once fn returns, together with its context unless reuse_context is set.
+
+        :param fn: Callable receiving a Playwright page.
+        :param timeout: Seconds to wait for the result (default no limit).
+        :return: Whatever fn returns; exceptions raised by fn are re-raised here.
+        """
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Browser pool is closed.")
+            self._start_workers()
+            self._tasks.put((fn, future))
+        return future.result(timeout=timeout)
+
+    def close(self, timeout: float = 30) -> None:
+        """
+        Stop accepting leases, let queued work finish and close every browser.
+
+        :param timeout: Seconds to wait for each worker thread to exit.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            workers = list(self._workers)
+            for _ in workers:
+                self._tasks.put(None)
+
+        for worker in workers:
+            worker.join(timeout=timeout)
+        self.logger.info(f"Browser pool closed after serving {self._stats['pages_served']} pages")
+
+    def stats(self) -> dict:
+        """Return a snapshot of the pool counters."""
+        with self._lock:
+            return dict(self._stats, size=self.size, workers=len(self._workers), closed=self._closed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _start_workers(self) -> None:
+        """Start the worker threads on first use. Caller must hold the lock."""
+        if self._workers:
+            return
+        for idx in range(self.size):
+            worker = threading.Thread(target=self._worker_loop, name=f"browser-pool-{idx}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        self.logger.info(f"Started browser pool with {self.size} workers")
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._stats[key] += 1
+
+    def _worker_loop(self) -> None:
+        """Serve leases on this thread until the pool is closed."""
+        playwright_manager = None
+        playwright = None
+        browser = None
+        cached_context = None
+        pages_served = 0
+
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            fn, future = task
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if playwright is None:
+                    playwright_manager = sync_playwright()
+                    playwright = playwright_manager.__enter__()
+
+                # Health check and recycling happen before handing out a page
+                if browser is not None and not browser.is_connected():
+                    self.logger.warning("Browser is no longer connected, relaunching")
+                    self._count("unhealthy_browsers")
+                    browser = None
+                    cached_context = None
+                elif browser is not None and pages_served >= self.max_pages_per_browser:
+                    self.logger.info(f"Recycling browser after {pages_served} pages")
+                    self._count("browsers_recycled")
+                    self._close_quietly(browser)
+                    browser = None
+                    cached_context = None
+
+                if browser is None:
+                    browser = playwright.chromium.launch(headless=self.headless)
+                    pages_served = 0
+                    self._count("browsers_launched")
+                    self.logger.info("Browser launched")
+
+                if self.reuse_context:
+                    if cached_context is None:
+                        cached_context = browser.new_context(**LEAN_CONTEXT_OPTIONS)
+                    context = cached_context
+                else:
+                    context = browser.new_context()
+
+                page = None
+                try:
+                    page = context.new_page()
+                    result = fn(page)
+                finally:
+                    pages_served += 1
+                    self._count("pages_served")
+                    if not self.reuse_context:
+                        self._close_quietly(context)
+                    elif page is not None:
+                        self._close_quietly(page)
+
+                future.set_result(result)
+            except Exception as e:
+                future.set_exception(e)
+
+        if browser is not None:
+            self._close_quietly(browser)
+        if playwright_manager is not None:
+            try:
+                playwright_manager.__exit__(None, None, None)
+            except Exception as e:
+                self.logger.warning(f"Error stopping Playwright: {e}")
+
+    def _close_quietly(self, closable) -> None:
+        try:
+            closable.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing browser resource: {e}")
@@ -0,0 +1,221 @@
+import argparse
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from model.song import Song
+from model.songs import Songs
+from music_chart_scraper_config import MUSIC_CHART_SCRAPER_CONFIG
+from services.browser_pool import BrowserPool
+from services.scraper import Scraper, chart_week
+
+class ChartArchive:
+    def __init__(self, db_path: str = "chart_archive.sqlite3"):
+        """
+        Initialize the archive of historical weekly charts.
+
+        Entries live in a WITHOUT ROWID table whose primary key (chart_type, chart_date, rank) is also
+        its storage order, so a range query over many years is a single sequential index scan.
+
+        :param db_path: Path of the SQLite database file (':memory:' for a private in-process archive).
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chart_entries (
+                chart_type TEXT NOT NULL,
+                chart_date TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                artist TEXT NOT NULL,
+                PRIMARY KEY (chart_type, chart_date, rank)
+            ) WITHOUT ROWID;
+
+            -- One row per fully archived week; backfills skip these to resume
+            CREATE TABLE IF NOT EXISTS chart_weeks (
+                chart_type TEXT NOT NULL,
+                chart_date TEXT NOT NULL,
+                row_count INTEGER NOT NULL,
+                archived_at REAL NOT NULL,
+                PRIMARY KEY (chart_type, chart_date)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[ChartArchive] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def store(self, chart_type: str, chart_date: date, songs: Songs) -> None:
+        """
+        Store one chart week, replacing any rows already archived for it.
+
+        :param chart_type: The chart the songs belong to.
+        :param chart_date: Any day of the chart week; stored as the week-ending date.
+        :param songs: The chart in rank order.
+        """
+        week = chart_week(chart_date).isoformat()
+        rows = [(chart_type, week, rank, song.title, song.artist) for rank, song in enumerate(songs.songs, start=1)]
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM chart_entries WHERE chart_type = ? AND chart_date = ?",
+                                   (chart_type, week))
+                self._conn.executemany("INSERT INTO chart_entries VALUES (?, ?, ?, ?, ?)", rows)
+                self._conn.execute("INSERT OR REPLACE INTO chart_weeks VALUES (?, ?, ?, ?)",
+                                   (chart_type, week, len(rows), time.time()))
+
+    def get_chart(self, chart_type: str, chart_date: date) -> Optional[Songs]:
+        """
+        Return an archived chart week, or None if the week is not archived.
+
+        :param chart_type: The chart to read.
+        :param chart_date: Any day of the chart week.
+        """
+        week = chart_week(chart_date).isoformat()
+        with self._lock:
+            archived = self._conn.execute(
+                "SELECT 1 FROM chart_weeks WHERE chart_type = ? AND chart_date = ?", (chart_type, week)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT title, artist FROM chart_entries WHERE chart_type = ? AND chart_date = ? ORDER BY rank",
+                (chart_type, week)
+            ).fetchall()
+        if not archived:
+            return None
+        return Songs([Song(title, artist) for title, artist in rows])
+
+    def get_range(self, chart_type: str, start: date, end: date, max_rank: Optional[int] = None) -> Dict[str, Songs]:
+        """
+        Return every archived week between start and end (inclusive), oldest first.
+
+        :param chart_type: The chart to read.
+        :param start: First day of the range.
+        :param end: Last day of the range.
+        :param max_rank: Only return positions up to this rank (e.g. 10 for the top 10), optional.
+        :return: A dict mapping week-ending dates (YYYY-MM-DD) to Songs in rank order.
+        """
+        query = ("SELECT chart_date, title, artist FROM chart_entries "
+                 "WHERE chart_type = ? AND chart_date BETWEEN ? AND ?")
+        params = [chart_type, start.isoformat(), end.isoformat()]
+        if max_rank is not None:
+            query += " AND rank <= ?"
+            params.append(max_rank)
+        query += " ORDER BY chart_date, rank"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        weeks: Dict[str, List[Song]] = {}
+        for chart_date, title, artist in rows:
+            weeks.setdefault(chart_date, []).append(Song(title, artist))
+        return {chart_date: Songs(songs) for chart_date, songs in weeks.items()}
+
+    def archived_weeks(self, chart_type: str) -> set:
+        """Return the week-ending dates (YYYY-MM-DD) already archived for a chart."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chart_date FROM chart_weeks WHERE chart_type = ?", (chart_type,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def backfill(self, chart_type: str, start: date, end: date, concurrency: int = 4,
+                 browser_pool: Optional[BrowserPool] = None) -> dict:
+        """
+        Scrape and archive every chart week between start and end that is not archived yet.
+
+        Weeks are scraped in parallel by at most `concurrency` threads, each with its own Scraper.
+        Weeks that fail or come back empty are not marked as archived, so running the backfill
+        again resumes where it stopped.
+
+        :param chart_type: The chart to backfill; it must have a "date_url" configured.
+        :param start: First day of the range.
+        :param end: Last day of the range; the chart week containing it is included.
+        :param concurrency: Maximum number of weeks scraped at the same time (default 4).
+        :param browser_pool: Shared BrowserPool for weeks that need Playwright, optional.
+        :return: A dict with the archived, skipped and failed week counts and the failed dates.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be at least 1.")
+        if not MUSIC_CHART_SCRAPER_CONFIG.get(chart_type, {}).get("date_url"):
+            raise ValueError(f"Chart type '{chart_type}' does not support dated charts.")
+
+        weeks = []
+        week = chart_week(start)
+        # end may fall mid-week; the week containing it still belongs to the range
+        while week <= chart_week(end):
+            weeks.append(week)
+            week += timedelta(days=7)
+
+        done = self.archived_weeks(chart_type)
+        pending = [week for week in weeks if week.isoformat() not in done]
+        self.logger.info(f"Backfilling {chart_type}: {len(pending)} of {len(weeks)} weeks to scrape "
+                         f"with concurrency={concurrency}")
+
+        scrapers = threading.local()
+
+        def archive_week(week: date) -> bool:
+            if not hasattr(scrapers, "scraper"):
+                scrapers.scraper = Scraper(chart_type=chart_type, browser_pool=browser_pool)
+            songs = scrapers.scraper.get_chart_for_date(week)
+            if not songs.songs:
+                return False
+            self.store(chart_type, week, songs)
+            return True
+
+        failed = []
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(archive_week, week): week for week in pending}
+            for future in as_completed(futures):
+                week = futures[future]
+                try:
+                    archived = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to archive {chart_type} for {week}: {e}")
+                    archived = False
+                if not archived:
+                    failed.append(week.isoformat())
+
+        summary = {
+            "archived": len(pending) - len(failed),
+            "skipped": len(weeks) - len(pending),
+            "failed": len(failed),
+            "failed_weeks": sorted(failed)
+        }
+        self.logger.info(f"Backfill of {chart_type} finished: {summary['archived']} archived, "
+                         f"{summary['skipped']} already archived, {summary['failed']} failed")
+        return summary
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the historical chart archive.")
+    parser.add_argument("chart_type", help="Chart to backfill, e.g. billboard_hot_100")
+    parser.add_argument("start", type=date.fromisoformat, help="First day, YYYY-MM-DD")
+    parser.add_argument("end", type=date.fromisoformat, help="Last day, YYYY-MM-DD")
+    parser.add_argument("--db-path", default="chart_archive.sqlite3")
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    archive = ChartArchive(args.db_path)
+    try:
+        summary = archive.backfill(args.chart_type, args.start, args.end, concurrency=args.concurrency)
+    finally:
+        archive.close()
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Callable, Iterator, Optional
+from model.song import Song
+from model.songs import Songs
+
+# Sentinel a refresh callable returns when the source confirmed the cached chart is unchanged (e.g. HTTP 304)
+NOT_MODIFIED = object()
+
+class ChartSnapshot:
+    def __init__(self, chart_type: str, songs: Songs, content_hash: str, fetched_at: float,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        A cached chart result together with the validators needed to revalidate it.
+
+        :param chart_type: The chart this snapshot belongs to.
+        :param songs: The cached Songs object.
+        :param content_hash: SHA-256 of the songs JSON.
+        :param fetched_at: Unix time the snapshot was last confirmed fresh.
+        :param etag: ETag of the chart page, if the source sent one.
+        :param last_modified: Last-Modified of the chart page, if the source sent one.
+        """
+        self.chart_type = chart_type
+        self.songs = songs
+        self.content_hash = content_hash
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+class ChartCache:
+    def __init__(self, db_path: str = "chart_cache.sqlite3", stale_ttl: float = 24 * 3600):
+        """
+        Initialize a persistent, SQLite-backed cache of scraped charts.
+
+        :param db_path: Path of the SQLite database file (':memory:' for a private in-process cache).
+        :param stale_ttl: Seconds past a chart's TTL during which the stale snapshot is still served
+            while a background refresh runs (default 24 hours).
+        """
+        self.db_path = db_path
+        self.stale_ttl = stale_ttl
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "bypasses": 0,
+            "revalidated_unchanged": 0,
+            "refresh_failures": 0
+        }
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chart_snapshots (
+                chart_type TEXT PRIMARY KEY,
+                songs_json TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[ChartCache] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def get(self, chart_type: str, ttl: float,
+            refresh: Callable[[Optional[ChartSnapshot]], object]) -> Songs:
+        """
+        Return the chart from the cache, refreshing it when needed.
+
+        Fresh snapshots are returned as-is. Snapshots past their TTL but within stale_ttl are returned
+        immediately while refresh runs in the background. Anything older, or a missing snapshot, is
+        refreshed synchronously.
+
+        :param chart_type: The chart to look up.
+        :param ttl: Seconds a snapshot stays fresh.
+        :param refresh: Called with the current snapshot (or None). Returns NOT_MODIFIED, or a tuple
+            (songs, etag, last_modified) with the newly scraped chart.
+        :return: A Songs object (empty only when nothing is cached and the refresh failed).
+        """
+        snapshot = self.get_snapshot(chart_type)
+        age = time.time() - snapshot.fetched_at if snapshot else None
+
+        if snapshot and age < ttl:
+            self._count("hits")
+            self.logger.info(f"Cache hit for {chart_type} (age {age:.0f}s)")
+            return snapshot.songs
+
+        if snapshot and age < ttl + self.stale_ttl:
+            self._count("stale_hits")
+            self.logger.info(f"Serving stale {chart_type} (age {age:.0f}s) while revalidating")
+            self._refresh_in_background(chart_type, snapshot, refresh)
+            return snapshot.songs
+
+        self._count("misses")
+        self.logger.info(f"Cache miss for {chart_type}")
+        songs = self._refresh(chart_type, snapshot, refresh)
+        if songs is None:
+            # Refresh failed; an expired snapshot is still better than nothing
+            return snapshot.songs if snapshot else Songs([])
+        return songs
+
+    def stream(self, chart_type: str, ttl: float, refresh: Callable[[Optional[ChartSnapshot]], object],
+               scrape: Callable[[], Iterator[Song]]) -> Iterator[Song]:
+        """
+        Streaming counterpart of get.
+
+        Fresh and stale snapshots are served as get serves them, a stale one while refresh runs in the
+        background. Anything older, or a missing snapshot, is streamed from scrape and stored only once
+        the stream has completed. If scrape fails or finds nothing before its first song, the expired
+        snapshot is served instead; a failure after songs were yielded is raised, since those songs
+        cannot be taken back.
+
+        :param chart_type: The chart to look up.
+        :param ttl: Seconds a snapshot stays fresh.
+        :param refresh: Background refresh for stale snapshots, as for get.
+        :param scrape: Returns an iterator of the chart's songs in order.
+        :return: An iterator of Song objects (empty only when nothing is cached and the scrape found nothing).
+        """
+        snapshot = self.get_snapshot(chart_type)
+        age = time.time() - snapshot.fetched_at if snapshot else None
+
+        if snapshot and age < ttl:
+            self._count("hits")
+            self.logger.info(f"Cache hit for {chart_type} (age {age:.0f}s)")
+            yield from snapshot.songs.songs
+            return
+
+        if snapshot and age < ttl + self.stale_ttl:
+            self._count("stale_hits")
+            self.logger.info(f"Serving stale {chart_type} (age {age:.0f}s) while revalidating")
+            self._refresh_in_background(chart_type, snapshot, refresh)
+            yield from snapshot.songs.songs
+            return
+
+        self._count("misses")
+        self.logger.info(f"Cache miss for {chart_type}")
+        songs = []
+        try:
+            for song in scrape():
+                songs.append(song)
+                yield song
+        except Exception as e:
+            self._count("refresh_failures")
+            if songs or snapshot is None:
+                raise
+            self.logger.error(f"Refreshing {chart_type} failed: {e}")
+            yield from snapshot.songs.songs
+            return
+
+        if not songs:
+            self._count("refresh_failures")
+            if snapshot is not None:
+                # An expired snapshot is still better than nothing
+                yield from snapshot.songs.songs
+            return
+
+        if not self.put(chart_type, Songs(songs)):
+            self._count("revalidated_unchanged")
+            self.logger.info(f"{chart_type} content unchanged, snapshot revalidated")
+
+    def record_bypass(self) -> None:
+        """Count a lookup that skipped the cache on request."""
+        self._count("bypasses")
+
+    def get_snapshot(self, chart_type: str) -> Optional[ChartSnapshot]:
+        """Return the stored snapshot for a chart, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT songs_json, content_hash, fetched_at, etag, last_modified "
+                "FROM chart_snapshots WHERE chart_type = ?",
+                (chart_type,)
+            ).fetchone()
+        if row is None:
+            return None
+        songs_json, content_hash, fetched_at, etag, last_modified = row
+        return ChartSnapshot(chart_type, Songs.from_json(songs_json), content_hash, fetched_at, etag, last_modified)
+
+    def put(self, chart_type: str, songs: Songs, etag: Optional[str] = None,
+            last_modified: Optional[str] = None) -> bool:
+        """
+        Store a freshly scraped chart.
+
+        :return: True when the content differs from the previous snapshot.
+        """
+        songs_json = songs.to_json()
+        content_hash = hashlib.sha256(songs_json.encode("utf-8")).hexdigest()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash FROM chart_snapshots WHERE chart_type = ?", (chart_type,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chart_snapshots "
+                "(chart_type, songs_json, content_hash, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (chart_type, songs_json, content_hash, etag, last_modified, time.time())
+            )
+            self._conn.commit()
+        return row is None or row[0] != content_hash
+
+    def touch(self, chart_type: str) -> None:
+        """Mark a snapshot as confirmed fresh without changing its content."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE chart_snapshots SET fetched_at = ? WHERE chart_type = ?", (time.time(), chart_type)
+            )
+            self._conn.commit()
+
+    def invalidate(self, chart_type: str) -> None:
+        """Drop the snapshot for a chart."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chart_snapshots WHERE chart_type = ?", (chart_type,))
+            self._conn.commit()
+
+    def metrics(self) -> dict:
+        """Return the hit, miss and staleness counters."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        lookups = metrics["hits"] + metrics["stale_hits"] + metrics["misses"]
+        metrics["hit_rate"] = (metrics["hits"] + metrics["stale_hits"]) / lookups if lookups else 0.0
+        return metrics
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self._metrics[key] += 1
+
+    def _refresh(self, chart_type: str, snapshot: Optional[ChartSnapshot], refresh) -> Optional[Songs]:
+        """Run a refresh and store its outcome. Returns the current songs, or None if the refresh failed."""
+        try:
+            result = refresh(snapshot)
+        except Exception as e:
+            self.logger.error(f"Refreshing {chart_type} failed: {e}")
+            result = None
+
+        if result is NOT_MODIFIED and snapshot is not None:
+            self._count("revalidated_unchanged")
+            self.touch(chart_type)
+            self.logger.info(f"{chart_type} not modified, snapshot revalidated")
+            return snapshot.songs
+
+        if not result or result is NOT_MODIFIED or not result[0].songs:
+            self._count("refresh_failures")
+            return None
+
+        songs, etag, last_modified = result
+        if not self.put(chart_type, songs, etag, last_modified):
+            self._count("revalidated_unchanged")
+            self.logger.info(f"{chart_type} content unchanged, snapshot revalidated")
+        return songs
+
+    def _refresh_in_background(self, chart_type: str, snapshot: ChartSnapshot, refresh) -> None:
+        """Start one background refresh per chart; later stale hits reuse the running one."""
+        with self._lock:
+            if chart_type in self._refreshing:
+                return
+            self._refreshing.add(chart_type)
+
+        def run():
+            try:
+                self._refresh(chart_type, snapshot, refresh)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(chart_type)
+
+        threading.Thread(target=run, name=f"chart-cache-refresh-{chart_type}", daemon=True).start()
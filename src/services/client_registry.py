@@ -0,0 +1,180 @@
+import logging
+import threading
+from typing import Optional
+import requests
+from openai import OpenAI
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import Config
+from services.gpt_cache import GPTResponseCache
+from services.gpt_operations import GPTOperations
+from services.spotify_operations.async_spotify_client import SPOTIFY_API_BASE
+from services.spotify_operations.spotify_auth import SpotifyAuth
+
+# 5xx responses are retried with exponential backoff. Unlike spotipy's own sessions, 429s are not: they
+# reach the caller with their Retry-After header, which TrackResolver and SpotifyPlaylistMaker honour.
+# POST is not retried here either: a playlist add is not idempotent, so SpotifyPlaylistMaker retries it
+# itself after checking the playlist's snapshot_id.
+SPOTIFY_RETRY_STATUSES = (500, 502, 503, 504)
+SPOTIFY_RETRY_METHODS = frozenset(['GET', 'PUT', 'DELETE'])
+SPOTIFY_RETRY_BACKOFF = 0.3
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+def get_client_registry() -> "ClientRegistry":
+    """
+    Return the process-wide ClientRegistry, creating it on first use.
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ClientRegistry()
+        return _default_registry
+
+class ClientRegistry:
+    def __init__(self, config: Optional[Config] = None):
+        """
+        One set of API clients per process, shared by every service.
+
+        The Spotify Web API is reached through a single requests session with a pooled keep-alive
+        adapter (used by spotipy and by token refreshes), one SpotifyAuth, and that auth's pooled
+        async/blocking clients. OpenAI is reached through one client. Clients are built lazily;
+        call start() at startup to build them eagerly and open a warm connection, and close() at shutdown.
+
+        :param config: Config to read pool sizes, timeouts and retries from (default a new Config).
+        """
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[ClientRegistry]: %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+        self.config = config or Config()
+        self._lock = threading.RLock()
+        self._spotify_session = None
+        self._spotify_auth = None
+        self._openai_client = None
+        self._gpt_cache = None
+        self._gpt_operations = None
+
+    def get_spotify_session(self) -> requests.Session:
+        """
+        Return the shared requests session for the Spotify Web API and accounts service.
+        """
+        with self._lock:
+            if self._spotify_session is None:
+                pool_size = self.config.get_spotify_http_pool_size()
+                retries = self.config.get_spotify_http_retries()
+                retry = Retry(
+                    total=retries,
+                    connect=None,
+                    read=False,
+                    allowed_methods=SPOTIFY_RETRY_METHODS,
+                    status=retries,
+                    backoff_factor=SPOTIFY_RETRY_BACKOFF,
+                    status_forcelist=SPOTIFY_RETRY_STATUSES,
+                    # Hand the last response to spotipy, which raises it with its real status and headers
+                    raise_on_status=False
+                )
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._spotify_session = session
+            return self._spotify_session
+
+    def get_spotify_auth(self) -> SpotifyAuth:
+        """
+        Return the shared SpotifyAuth, so the process has one token and one set of Spotify clients.
+        """
+        with self._lock:
+            if self._spotify_auth is None:
+                timeout = self.config.get_spotify_http_timeout()
+                self._spotify_auth = SpotifyAuth(
+                    requests_session=self.get_spotify_session(),
+                    requests_timeout=timeout,
+                    client_options={"max_connections": self.config.get_spotify_http_pool_size(), "timeout": timeout}
+                )
+            return self._spotify_auth
+
+    def get_openai_client(self) -> OpenAI:
+        """
+        Return the shared OpenAI client.
+        """
+        with self._lock:
+            if self._openai_client is None:
+                self._openai_client = OpenAI(
+                    api_key=self.config.get_gpt_key(),
+                    timeout=self.config.get_openai_timeout(),
+                    max_retries=self.config.get_openai_max_retries()
+                )
+            return self._openai_client
+
+    def get_gpt_cache(self) -> GPTResponseCache:
+        """
+        Return the shared GPT response cache.
+        """
+        with self._lock:
+            if self._gpt_cache is None:
+                self._gpt_cache = GPTResponseCache(
+                    self.config.get_gpt_cache_path(),
+                    ttl=self.config.get_gpt_cache_ttl(),
+                    similarity_threshold=self.config.get_gpt_cache_similarity()
+                )
+            return self._gpt_cache
+
+    def get_gpt_operations(self) -> GPTOperations:
+        """
+        Return the shared GPTOperations, built on the shared OpenAI client and GPT response cache.
+        """
+        with self._lock:
+            if self._gpt_operations is None:
+                self._gpt_operations = GPTOperations(client=self.get_openai_client(), cache=self.get_gpt_cache())
+            return self._gpt_operations
+
+    def start(self, warm_up: bool = True) -> None:
+        """
+        Build every client now instead of on the first request.
+
+        :param warm_up: Also load the cached Spotify token (refreshing it if due) and open a pooled
+            connection to the Spotify API, so the first request skips the TLS handshake (default True).
+            Warm-up failures are logged and ignored.
+        """
+        auth = self.get_spotify_auth()
+        self.get_gpt_operations()
+        self.logger.info("Clients started")
+        if not warm_up:
+            return
+
+        try:
+            if auth.token_cache.get_cached_token() is not None:
+                auth.get_access_token()
+            self.get_spotify_session().head(SPOTIFY_API_BASE, timeout=self.config.get_spotify_http_timeout())
+            self.logger.info("Warmed up the Spotify connection")
+        except Exception as e:
+            self.logger.warning(f"Could not warm up the Spotify connection: {str(e)}")
+
+    def close(self) -> None:
+        """
+        Close every client that was built. The registry builds fresh clients if it is used again.
+        """
+        with self._lock:
+            auth, self._spotify_auth = self._spotify_auth, None
+            session, self._spotify_session = self._spotify_session, None
+            openai_client, self._openai_client = self._openai_client, None
+            gpt_cache, self._gpt_cache = self._gpt_cache, None
+            self._gpt_operations = None
+
+        for name, close in (("Spotify clients", auth.close if auth else None),
+                            ("Spotify session", session.close if session else None),
+                            ("OpenAI client", openai_client.close if openai_client else None),
+                            ("GPT response cache", gpt_cache.close if gpt_cache else None)):
+            if close is None:
+                continue
+            try:
+                close()
+            except Exception as e:
+                self.logger.warning(f"Failed to close the {name}: {str(e)}")
+        self.logger.info("Clients closed")
@@ -0,0 +1,221 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional
+
+DEFAULT_GPT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 5000
+
+# Hits only rewrite last_used when it is older than this, so reads rarely take the write lock
+LRU_TOUCH_INTERVAL = 3600
+
+# Expired and least recently used entries are pruned once every this many writes
+PRUNE_EVERY = 50
+
+# Most recently used prompts compared when looking for a similar one
+SIMILARITY_CANDIDATES = 500
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt into the cache key: Unicode-normalized, case-folded, whitespace collapsed and
+    surrounding punctuation dropped, so "Workout" and " workout! " share an entry.
+    """
+    folded = " ".join(unicodedata.normalize("NFKC", prompt).casefold().split())
+    return folded.strip(" .,;:!?'\"")
+
+def _prompt_tokens(prompt: str) -> set:
+    return set(re.findall(r"\w+", prompt.replace("'", "")))
+
+def _numeric_tokens(tokens: set) -> set:
+    return {token for token in tokens if any(char.isdigit() for char in token)}
+
+def prompt_similarity(a: str, b: str) -> float:
+    """
+    Similarity of two normalized prompts, 0-1: the share of words they have in common (Dice
+    coefficient), ignoring word order and repeated words.
+
+    Words with digits carry the meaning of prompts like "90s hip hop" or "top 10 workout songs"
+    while changing a single character, so prompts whose numeric words differ score 0.
+    """
+    tokens_a, tokens_b = _prompt_tokens(a), _prompt_tokens(b)
+    if not tokens_a or not tokens_b:
+        return 0.0
+    if _numeric_tokens(tokens_a) != _numeric_tokens(tokens_b):
+        return 0.0
+    return 2 * len(tokens_a & tokens_b) / (len(tokens_a) + len(tokens_b))
+
+class GPTResponseCache:
+    def __init__(self, db_path: str = "gpt_cache.sqlite3", ttl: float = DEFAULT_GPT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, similarity_threshold: float = 0.0):
+        """
+        Initialize a persistent cache of parsed GPT song lists.
+
+        Entries are keyed by endpoint, normalized prompt, model and temperature. With a similarity
+        threshold, a prompt with no exact entry can also be served by the most similar cached prompt
+        for the same endpoint, model and temperature.
+
+        :param db_path: Path of the SQLite database file (':memory:' for a private in-process cache).
+        :param ttl: Seconds a song list stays cached (default 7 days).
+        :param max_entries: Entries kept before the least recently used are evicted (default 5000).
+        :param similarity_threshold: Minimum prompt similarity (0-1) for a reworded prompt to hit; 0 disables
+            similarity matching (default 0).
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._evictions = 0
+        self._endpoints: Dict[str, dict] = {}
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                endpoint TEXT NOT NULL,
+                model TEXT NOT NULL,
+                temperature REAL NOT NULL,
+                prompt_key TEXT NOT NULL,
+                songs_json TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (endpoint, model, temperature, prompt_key)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+        """)
+        self._conn.commit()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[GPTResponseCache] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def get(self, endpoint: str, prompt: str, model: str, temperature: float) -> Optional[List[dict]]:
+        """
+        Look up the songs GPT returned for a prompt.
+
+        :param endpoint: The GPTOperations method the prompt was sent from, e.g. "fetch_songs".
+        :return: The cached list of {"title", "artist"} dicts, or None on a miss or an expired entry.
+        """
+        key = (endpoint, model, temperature, normalize_prompt(prompt))
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT prompt_key, songs_json, last_used FROM responses "
+                "WHERE endpoint = ? AND model = ? AND temperature = ? AND prompt_key = ? AND fetched_at > ?",
+                (*key, now - self.ttl)
+            ).fetchone()
+            outcome = "hits"
+            if row is None and self.similarity_threshold > 0:
+                row = self._most_similar(key, now)
+                outcome = "similar_hits"
+            if row is None:
+                self._count(endpoint, "misses")
+                return None
+
+            prompt_key, songs_json, last_used = row
+            self._count(endpoint, outcome)
+            if now - last_used >= LRU_TOUCH_INTERVAL:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE responses SET last_used = ? "
+                        "WHERE endpoint = ? AND model = ? AND temperature = ? AND prompt_key = ?",
+                        (now, endpoint, model, temperature, prompt_key)
+                    )
+        if outcome == "similar_hits":
+            self.logger.info(f"Serving '{prompt}' from the cached response to '{prompt_key}'")
+        return json.loads(songs_json)
+
+    def _most_similar(self, key: tuple, now: float) -> Optional[tuple]:
+        endpoint, model, temperature, prompt_key = key
+        rows = self._conn.execute(
+            "SELECT prompt_key, songs_json, last_used FROM responses "
+            "WHERE endpoint = ? AND model = ? AND temperature = ? AND fetched_at > ? "
+            "ORDER BY last_used DESC LIMIT ?",
+            (endpoint, model, temperature, now - self.ttl, SIMILARITY_CANDIDATES)
+        ).fetchall()
+        best, best_score = None, self.similarity_threshold
+        for row in rows:
+            score = prompt_similarity(prompt_key, row[0])
+            if score >= best_score:
+                best, best_score = row, score
+        return best
+
+    def put(self, endpoint: str, prompt: str, model: str, temperature: float, songs: List[dict]) -> None:
+        """
+        Store the parsed songs for a prompt.
+
+        :param songs: List of {"title", "artist"} dicts.
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses "
+                    "(endpoint, model, temperature, prompt_key, songs_json, fetched_at, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (endpoint, model, temperature, normalize_prompt(prompt), json.dumps(songs), now, now)
+                )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def prune(self) -> int:
+        """
+        Delete expired entries, then the least recently used ones above max_entries.
+
+        :return: The number of entries deleted.
+        """
+        with self._lock:
+            return self._prune(time.time())
+
+    def _prune(self, now: float) -> int:
+        with self._conn:
+            deleted = self._conn.execute("DELETE FROM responses WHERE fetched_at <= ?", (now - self.ttl,)).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                deleted += self._conn.execute(
+                    "DELETE FROM responses WHERE (endpoint, model, temperature, prompt_key) IN "
+                    "(SELECT endpoint, model, temperature, prompt_key FROM responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+        self._evictions += deleted
+        if deleted:
+            self.logger.info(f"Pruned {deleted} GPT cache entries")
+        return deleted
+
+    def _count(self, endpoint: str, outcome: str) -> None:
+        counters = self._endpoints.setdefault(endpoint, {"hits": 0, "similar_hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+    def metrics(self) -> dict:
+        """Return this process's hit and miss counters and hit rate per endpoint, evictions and the entry count."""
+        with self._lock:
+            endpoints = {endpoint: dict(counters) for endpoint, counters in self._endpoints.items()}
+            metrics = {
+                "entries": self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0],
+                "evictions": self._evictions
+            }
+        for counters in endpoints.values():
+            served = counters["hits"] + counters["similar_hits"]
+            lookups = served + counters["misses"]
+            counters["hit_rate"] = served / lookups if lookups else 0.0
+        metrics["endpoints"] = endpoints
+        metrics["api_calls_saved"] = sum(c["hits"] + c["similar_hits"] for c in endpoints.values())
+        return metrics
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
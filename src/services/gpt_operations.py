@@ -1,12 +1,26 @@
 from openai import OpenAI
 import json
 import logging
+from typing import Iterator, List, Optional
 from config import Config
 from model.song import Song
 from model.songs import Songs
+from services.gpt_cache import GPTResponseCache, normalize_prompt
+from services.single_flight import get_single_flight
+from services.song_stream_parser import SongStreamParser
+
+# Sampling temperature of every song request; part of the response cache key
+GPT_TEMPERATURE = 0.7
+
+# Concurrent identical song requests in this process share one completion
+_gpt_flight = get_single_flight("gpt")
 
 class GPTOperations:
-    def __init__(self):
+    def __init__(self, client: Optional[OpenAI] = None, cache: Optional[GPTResponseCache] = None):
+        """
+        :param client: Shared OpenAI client, e.g. from the ClientRegistry; a new one is created if omitted
+        :param cache: GPTResponseCache that song requests are served from and stored in, optional
+        """
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         handler = logging.StreamHandler()
@@ -15,37 +29,36 @@ class GPTOperations:
         self.logger.addHandler(handler)
         
         self.config = Config()
-        self.client = OpenAI(api_key=self.config.get_gpt_key())
+        self.client = client or OpenAI(api_key=self.config.get_gpt_key())
         self.model = self.config.get_gpt_model()
+        self.cache = cache
 
     def fetch_songs(self, prompt: str) -> Songs:
         """
         Fetch songs based on the user's prompt using the OpenAI API.
         Returns a Songs object containing Song objects with title and artist information.
+        Concurrent calls with the same normalized prompt share one request.
         """
+        return _gpt_flight.do(("fetch_songs", self.model, normalize_prompt(prompt)), lambda: self._fetch_songs(prompt))
+
+    def _fetch_songs(self, prompt: str) -> Songs:
         try:
             self.logger.info(f"Fetching songs for prompt: {prompt}")
-            
-            formatted_prompt = f"""
-            Based on this request: "{prompt}"
-            Return a list of relevant songs in JSON format:
-            [{{"title": "Song Name", "artist": "Artist Name"}}, ...]
-            Provide exactly 5 songs that best match the request.
-            """
+            cached = self._cached_songs("fetch_songs", prompt)
+            if cached is not None:
+                return cached
             
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a music recommendation system. Respond only with valid JSON arrays containing song information."},
-                    {"role": "user", "content": formatted_prompt}
-                ],
-                temperature=0.7
+                messages=self._prompt_messages(prompt),
+                temperature=GPT_TEMPERATURE
             )
             
             response_text = response.choices[0].message.content
             self.logger.info("Successfully received response from OpenAI")
             
             song_list = self._parse_response(response_text)
+            self._store_songs("fetch_songs", prompt, song_list)
             songs_obj = Songs([Song(title=song['title'], artist=song['artist']) for song in song_list])
             self.logger.info(f"Successfully created Songs object with {len(song_list)} songs")
             
@@ -55,6 +68,102 @@ class GPTOperations:
             self.logger.error(f"Error fetching songs: {str(e)}")
             return Songs([])  # Return empty Songs object in case of error
 
+    def stream_songs(self, prompt: str) -> Iterator[Song]:
+        """
+        Like fetch_songs, but the completion is streamed and each Song is yielded as soon as the
+        model has finished writing it, so callers can start on the first songs while the rest are
+        still being generated. Errors are logged and end the stream. Concurrent streams of the same
+        normalized prompt follow one completion.
+        """
+        return self._stream_songs("fetch_songs", prompt, self._prompt_messages(prompt))
+
+    def stream_songs_by_mood_or_activity(self, mood_or_activity: str) -> Iterator[Song]:
+        """
+        Like fetch_songs_by_mood_or_activity, but yields each Song as soon as it is generated (see stream_songs).
+        """
+        return self._stream_songs("fetch_songs_by_mood_or_activity", mood_or_activity,
+                                  self._mood_or_activity_messages(mood_or_activity))
+
+    def _stream_songs(self, endpoint: str, prompt: str, messages: List[dict]) -> Iterator[Song]:
+        return _gpt_flight.stream((f"stream_{endpoint}", self.model, normalize_prompt(prompt)),
+                                  lambda: self._generate_songs(endpoint, prompt, messages))
+
+    def _generate_songs(self, endpoint: str, prompt: str, messages: List[dict]) -> Iterator[Song]:
+        cached = self._cached_songs(endpoint, prompt)
+        if cached is not None:
+            yield from cached.songs
+            return
+
+        self.logger.info(f"Streaming songs for: {prompt}")
+        parser = SongStreamParser()
+        song_list = []
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=GPT_TEMPERATURE,
+                stream=True
+            )
+            for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                for song in parser.feed(chunk.choices[0].delta.content):
+                    song_list.append(song)
+                    yield Song(title=song['title'], artist=song['artist'])
+        except Exception as e:
+            self.logger.error(f"Error streaming songs: {str(e)}")
+            return
+
+        if parser.skipped:
+            self.logger.warning(f"Skipped {parser.skipped} songs in an invalid format")
+        self.logger.info(f"Streamed {len(song_list)} songs")
+        # Only complete responses are cached
+        if parser.finished:
+            self._store_songs(endpoint, prompt, song_list)
+
+    def _prompt_messages(self, prompt: str) -> List[dict]:
+        formatted_prompt = f"""
+            Based on this request: "{prompt}"
+            Return a list of relevant songs in JSON format:
+            [{{"title": "Song Name", "artist": "Artist Name"}}, ...]
+            Provide exactly 5 songs that best match the request.
+            """
+        return [
+            {"role": "system", "content": "You are a music recommendation system. Respond only with valid JSON arrays containing song information."},
+            {"role": "user", "content": formatted_prompt}
+        ]
+
+    def _mood_or_activity_messages(self, mood_or_activity: str) -> List[dict]:
+        prompt = f"""
+            Suggest 10 songs that fit the mood or activity: '{mood_or_activity}'.
+            Return the results in JSON format:
+            [{{"title": "Song Name", "artist": "Artist Name"}}, ...]
+            Ensure the songs are diverse and suitable for this context.
+            """
+        return [
+            {"role": "system", "content": "You are a music recommendation engine."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def _cached_songs(self, endpoint: str, prompt: str) -> Optional[Songs]:
+        """
+        Return the cached songs for a prompt sent from endpoint, or None when there is no cache or no entry.
+        """
+        if self.cache is None:
+            return None
+        song_list = self.cache.get(endpoint, prompt, self.model, GPT_TEMPERATURE)
+        if song_list is None:
+            return None
+        self.logger.info(f"Serving {len(song_list)} cached songs for: {prompt}")
+        return Songs([Song(title=song['title'], artist=song['artist']) for song in song_list])
+
+    def _store_songs(self, endpoint: str, prompt: str, song_list: list) -> None:
+        """
+        Cache a parsed song list. Empty lists (unparseable responses) are not cached.
+        """
+        if self.cache is not None and song_list:
+            self.cache.put(endpoint, prompt, self.model, GPT_TEMPERATURE, song_list)
+
     def _parse_response(self, response_text: str) -> list:
         """
         Parse the GPT response text to extract song information.
@@ -98,30 +207,29 @@ class GPTOperations:
             mood_or_activity (str): The mood or activity (e.g., "Workout", "Relaxation").
         Returns:
             Songs: A Songs object containing Song instances.
+        Concurrent calls for the same normalized mood or activity share one request.
         """
+        return _gpt_flight.do(("fetch_songs_by_mood_or_activity", self.model, normalize_prompt(mood_or_activity)),
+                              lambda: self._fetch_songs_by_mood_or_activity(mood_or_activity))
+
+    def _fetch_songs_by_mood_or_activity(self, mood_or_activity: str) -> Songs:
         try:
             self.logger.info(f"Fetching songs for mood/activity: {mood_or_activity}")
-            
-            prompt = f"""
-            Suggest 10 songs that fit the mood or activity: '{mood_or_activity}'.
-            Return the results in JSON format:
-            [{{"title": "Song Name", "artist": "Artist Name"}}, ...]
-            Ensure the songs are diverse and suitable for this context.
-            """
+            cached = self._cached_songs("fetch_songs_by_mood_or_activity", mood_or_activity)
+            if cached is not None:
+                return cached
             
             response = self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a music recommendation engine."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7
+                messages=self._mood_or_activity_messages(mood_or_activity),
+                temperature=GPT_TEMPERATURE
             )
             
             response_text = response.choices[0].message.content
             self.logger.info("Received response from GPT.")
             
             song_list = self._parse_response(response_text)
+            self._store_songs("fetch_songs_by_mood_or_activity", mood_or_activity, song_list)
             return Songs([Song(title=s['title'], artist=s['artist']) for s in song_list])
         except Exception as e:
             self.logger.error(f"Error fetching songs for mood/activity: {str(e)}")
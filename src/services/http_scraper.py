@@ -0,0 +1,132 @@
+import logging
+import threading
+from typing import List, Optional
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from model.chart_tags import ChartTags
+
+DEFAULT_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9"
+}
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def get_shared_session() -> requests.Session:
+    """
+    Return the process-wide requests session used for chart pages, creating it on first use.
+
+    Keeping one session alive lets repeated scrapes reuse pooled keep-alive connections.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _shared_session = session
+        return _shared_session
+
+def _element_text(element) -> Optional[str]:
+    """Return the element's text with whitespace collapsed the way innerText renders it."""
+    if element is None:
+        return None
+    return " ".join(element.get_text(" ").split())
+
+def parse_chart_html(html: str, tags: ChartTags) -> List[list]:
+    """
+    Parse a server-rendered chart page with the same selectors the Playwright path uses.
+
+    :param html: The chart page HTML.
+    :param tags: ChartTags with the row, title and artist selectors.
+    :return: [title, artist] rows in chart order, shaped like the EXTRACT_ROWS_SCRIPT output
+        (empty when no row matches).
+    """
+    soup = BeautifulSoup(html, "lxml")
+    rows = []
+    for item in soup.select(tags.chart_item):
+        rows.append([_element_text(item.select_one(tags.title)), _element_text(item.select_one(tags.artist))])
+    return rows
+
+class HttpFetchResult:
+    def __init__(self, rows: List[list], etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 not_modified: bool = False, url: Optional[str] = None):
+        """
+        Outcome of a (possibly conditional) chart page request.
+
+        :param rows: [title, artist] rows; empty when not_modified.
+        :param etag: ETag header of the response, if any.
+        :param last_modified: Last-Modified header of the response, if any.
+        :param not_modified: True when the server answered 304 Not Modified.
+        :param url: Final URL of the response after redirects, if known.
+        """
+        self.rows = rows
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+        self.url = url
+
+class HttpChartFetcher:
+    def __init__(self, session: Optional[requests.Session] = None, timeout: float = 30):
+        """
+        Initialize the HttpChartFetcher, which scrapes charts without a browser.
+
+        :param session: requests session to use (default the shared pooled session).
+        :param timeout: Request timeout in seconds (default 30).
+        """
+        self.session = session or get_shared_session()
+        self.timeout = timeout
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[HttpChartFetcher] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def fetch(self, url: str, tags: ChartTags) -> List[list]:
+        """
+        Download a chart page and extract its rows.
+
+        :param url: The chart URL.
+        :param tags: ChartTags with the row, title and artist selectors.
+        :return: [title, artist] rows in chart order.
+        :raises requests.RequestException: If the page could not be downloaded.
+        """
+        return self.fetch_conditional(url, tags).rows
+
+    def fetch_conditional(self, url: str, tags: ChartTags, etag: Optional[str] = None,
+                          last_modified: Optional[str] = None) -> HttpFetchResult:
+        """
+        Download a chart page unless it is unchanged since the given validators.
+
+        :param url: The chart URL.
+        :param tags: ChartTags with the row, title and artist selectors.
+        :param etag: ETag from the previous response, sent as If-None-Match.
+        :param last_modified: Last-Modified from the previous response, sent as If-Modified-Since.
+        :return: An HttpFetchResult; not_modified is set on HTTP 304.
+        :raises requests.RequestException: If the page could not be downloaded.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        self.logger.info(f"Fetching chart page over HTTP: {url}")
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            self.logger.info(f"Chart page not modified: {url}")
+            return HttpFetchResult([], etag, last_modified, not_modified=True, url=response.url)
+        response.raise_for_status()
+
+        rows = parse_chart_html(response.text, tags)
+        self.logger.info(f"Parsed {len(rows)} rows from {url}")
+        return HttpFetchResult(rows, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                               url=response.url)
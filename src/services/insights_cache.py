@@ -0,0 +1,105 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+class PlaylistInsights:
+    def __init__(self, playlist_id: str, snapshot_id: str, insights: dict, fetched_at: Optional[float] = None):
+        """
+        Collaborator insights computed for one version of a playlist.
+
+        :param playlist_id: The playlist the insights describe.
+        :param snapshot_id: The playlist's snapshot_id when the insights were computed.
+        :param insights: playlist_name, description and collaborator_stats, as served by the API.
+        :param fetched_at: Unix time the insights were stored (default now).
+        """
+        self.playlist_id = playlist_id
+        self.snapshot_id = snapshot_id
+        self.insights = insights
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+class InsightsCache:
+    def __init__(self, db_path: str = "insights_cache.sqlite3"):
+        """
+        Persistent cache of playlist collaborator insights, keyed by playlist and validated by snapshot_id.
+
+        An entry stays valid for as long as the playlist's snapshot_id is unchanged; PlaylistManager
+        checks that with a request for the snapshot_id alone. The database runs in WAL mode so
+        several worker processes can share one file.
+
+        :param db_path: Path of the SQLite database file (':memory:' for a private in-process cache).
+        """
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "full_refreshes": 0
+        }
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS playlist_insights (
+                playlist_id TEXT PRIMARY KEY,
+                snapshot_id TEXT NOT NULL,
+                insights_json TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[InsightsCache] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def get(self, playlist_id: str) -> Optional[PlaylistInsights]:
+        """Return the stored insights for a playlist, whatever its snapshot, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT snapshot_id, insights_json, fetched_at "
+                "FROM playlist_insights WHERE playlist_id = ?",
+                (playlist_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        snapshot_id, insights_json, fetched_at = row
+        return PlaylistInsights(playlist_id, snapshot_id, json.loads(insights_json), fetched_at)
+
+    def put(self, entry: PlaylistInsights) -> None:
+        """Store the insights for a playlist, replacing any earlier snapshot's."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlist_insights "
+                "(playlist_id, snapshot_id, insights_json, fetched_at) VALUES (?, ?, ?, ?)",
+                (entry.playlist_id, entry.snapshot_id, json.dumps(entry.insights), entry.fetched_at)
+            )
+            self._conn.commit()
+
+    def record(self, outcome: str) -> None:
+        """Count a lookup outcome: hits, misses or full_refreshes."""
+        with self._lock:
+            self._metrics[outcome] += 1
+
+    def metrics(self) -> dict:
+        """Return this process's counters, the full playlist fetches saved and the number of cached playlists."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = self._conn.execute("SELECT COUNT(*) FROM playlist_insights").fetchone()[0]
+        lookups = metrics["hits"] + metrics["misses"] + metrics["full_refreshes"]
+        metrics["full_fetches_saved"] = metrics["hits"]
+        metrics["hit_rate"] = metrics["hits"] / lookups if lookups else 0.0
+        return metrics
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
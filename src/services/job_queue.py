@@ -0,0 +1,524 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Running jobs whose progress has not been updated for this long are presumed lost and requeued
+DEFAULT_STALE_AFTER = 15 * 60
+# Runners mark their running jobs as alive this often, so only jobs of a dead runner go stale
+DEFAULT_HEARTBEAT_INTERVAL = 60
+# The progress stage a handler reports once it has created a playlist; see requeue_interrupted
+PLAYLIST_CREATED = "playlist_created"
+# The stage of the event recorded when a job finishes; it is always a job's last event
+DONE = "done"
+# The stage of the event that ends a followed event stream when the job cannot finish it
+ERROR = "error"
+# A followed job that records no event for this long is given up on
+DEFAULT_FOLLOW_IDLE_TIMEOUT = 5 * 60
+# No event stream is followed for longer than this
+DEFAULT_FOLLOW_MAX_DURATION = 60 * 60
+# Finished jobs are deleted after this long
+DEFAULT_JOB_RETENTION = 7 * 24 * 3600
+
+# A handler receives the job's params and a progress callback and returns the job's result
+JobHandler = Callable[[dict, Callable[[dict], None]], dict]
+
+class JobQueueFull(Exception):
+    """Raised by JobRunner.submit when max_pending jobs are already waiting or running in this process."""
+
+class Job:
+    def __init__(self, job_id: str, kind: str, params: dict, status: str = QUEUED, progress: Optional[dict] = None,
+                 result: Optional[dict] = None, error: Optional[str] = None, created_at: Optional[float] = None,
+                 started_at: Optional[float] = None, finished_at: Optional[float] = None):
+        """
+        A unit of background work and its persisted state.
+
+        :param job_id: Unique job ID.
+        :param kind: Name of the handler that runs the job.
+        :param params: JSON-serializable arguments for the handler.
+        :param status: One of QUEUED, RUNNING, SUCCEEDED or FAILED.
+        :param progress: The latest progress event reported by the handler.
+        :param result: The handler's result, once finished.
+        :param error: Why the job failed, if it did.
+        """
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = status
+        self.progress = progress or {}
+        self.result = result
+        self.error = error
+        self.created_at = created_at if created_at is not None else time.time()
+        self.started_at = started_at
+        self.finished_at = finished_at
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class JobStore:
+    def __init__(self, db_path: str = "jobs.sqlite3"):
+        """
+        Persistent SQLite store of jobs and their status, progress events and results.
+
+        Several worker processes can share one file (WAL mode with a busy timeout). A job is claimed
+        atomically when it starts, so a queued job runs at most once even when several runners see it.
+
+        :param db_path: Path of the SQLite database file (':memory:' for a private in-process store).
+        """
+        self.db_path = db_path
+        # Identifies this process as the runner of the jobs it claims
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+        self._lock = threading.Lock()
+        # Notified whenever this process records an event, so waiting readers wake without polling
+        self._events_recorded = threading.Condition()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                params_json TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress_json TEXT,
+                result_json TEXT,
+                error TEXT,
+                owner TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                updated_at REAL NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+
+            CREATE TABLE IF NOT EXISTS job_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                event_json TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS job_events_job ON job_events (job_id, seq);
+        """)
+        self._conn.commit()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[JobStore] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def create(self, kind: str, params: dict) -> Job:
+        """Store a new queued job."""
+        job = Job(uuid.uuid4().hex, kind, params)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO jobs (id, kind, params_json, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (job.id, kind, json.dumps(params), QUEUED, job.created_at, job.created_at)
+                )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job, or None if there is no such job."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, kind, params_json, status, progress_json, result_json, error, created_at, started_at, "
+                "finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        return self._to_job(row) if row else None
+
+    def queued(self) -> List[Job]:
+        """Return the queued jobs, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind, params_json, status, progress_json, result_json, error, created_at, started_at, "
+                "finished_at FROM jobs WHERE status = ? ORDER BY created_at",
+                (QUEUED,)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def claim(self, job_id: str) -> bool:
+        """
+        Mark a queued job as running in this process.
+
+        :return: False if the job was already claimed (or finished) by another runner.
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, started_at = ?, updated_at = ? WHERE id = ? AND status = ?",
+                    (RUNNING, self.owner, now, now, job_id, QUEUED)
+                ).rowcount
+        return claimed == 1
+
+    def update_progress(self, job_id: str, progress: dict) -> None:
+        """
+        Record a progress event: it is appended to the job's event log and becomes the job's latest
+        progress, which also marks the job as alive.
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute("UPDATE jobs SET progress_json = ?, updated_at = ? WHERE id = ?",
+                                   (json.dumps(progress), now, job_id))
+                self._append_event(job_id, progress, now)
+        self._notify_events()
+
+    def finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        """
+        Record a job's outcome: SUCCEEDED or FAILED, with its result and error. A DONE event carrying the
+        outcome closes the job's event log.
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, result_json = ?, error = ?, finished_at = ?, updated_at = ? WHERE id = ?",
+                    (status, json.dumps(result) if result is not None else None, error, now, now, job_id)
+                )
+                self._append_event(job_id, {"stage": DONE, "status": status, "result": result, "error": error}, now)
+        self._notify_events()
+
+    def events(self, job_id: str, after: int = 0, timeout: float = 0) -> List[Tuple[int, dict]]:
+        """
+        Return a job's events recorded after sequence number `after`, oldest first.
+
+        :param job_id: The job ID.
+        :param after: Sequence number of the last event already seen (default 0, all events).
+        :param timeout: Seconds to wait for a new event when there is none yet. Events recorded by this
+            process wake the wait at once; events from other processes are seen within timeout.
+        :return: (sequence number, event) pairs.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._events_recorded:
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT seq, event_json FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                        (job_id, after)
+                    ).fetchall()
+                remaining = deadline - time.monotonic()
+                if rows or remaining <= 0:
+                    return [(seq, json.loads(event_json)) for seq, event_json in rows]
+                self._events_recorded.wait(remaining)
+
+    def follow(self, job_id: str, after: int = 0, wait: float = 1.0,
+               idle_timeout: float = DEFAULT_FOLLOW_IDLE_TIMEOUT,
+               max_duration: float = DEFAULT_FOLLOW_MAX_DURATION) -> Iterator[Optional[Tuple[Optional[int], dict]]]:
+        """
+        Follow a job's events until its DONE event.
+
+        Yields None after every `wait` seconds without a new event, so callers can send keep-alives.
+        The stream always ends: when the job is gone or finished without a DONE event, when no event
+        arrives for idle_timeout seconds (e.g. its runner died) or after max_duration seconds, a final
+        (None, {"stage": ERROR, "message": ...}) is yielded instead.
+
+        :param job_id: The job ID.
+        :param after: Sequence number of the last event already seen (default 0, all events).
+        :return: An iterator of (sequence number, event) pairs, and None while idle.
+        """
+        started = last_event = time.monotonic()
+        while True:
+            events = self.events(job_id, after=after, timeout=wait)
+            for seq, event in events:
+                yield seq, event
+                after = seq
+                if event["stage"] == DONE:
+                    return
+            now = time.monotonic()
+            if events:
+                last_event = now
+                if now - started < max_duration:
+                    continue
+
+            job = self.get(job_id)
+            if job is None or job.status not in (QUEUED, RUNNING):
+                message = "The job is no longer running"
+            elif now - last_event >= idle_timeout:
+                message = f"No progress for {idle_timeout:.0f} seconds"
+            elif now - started >= max_duration:
+                message = f"Stopped following the job after {max_duration:.0f} seconds"
+            else:
+                yield None
+                continue
+            # A job may finish between reading its events and its row; its DONE event wins
+            for seq, event in self.events(job_id, after=after):
+                yield seq, event
+                if event["stage"] == DONE:
+                    return
+            self.logger.warning(f"Stopped following job {job_id}: {message}")
+            yield None, {"stage": ERROR, "message": message}
+            return
+
+    def requeue_interrupted(self, stale_after: float = DEFAULT_STALE_AFTER) -> int:
+        """
+        Put running jobs back in the queue when their runner is gone: a process on this host that no
+        longer exists (e.g. before a restart), or any runner that has not marked the job alive for
+        stale_after seconds (see heartbeat).
+
+        A job that had already created its playlist (a PLAYLIST_CREATED event with a playlist_id) is
+        requeued with that ID as params["playlist_id"], so its handler syncs the half-filled playlist
+        instead of creating a second one.
+
+        :return: The number of jobs requeued.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, params_json, owner, updated_at FROM jobs WHERE status = ?", (RUNNING,)
+            ).fetchall()
+            lost = [(job_id, json.loads(params_json)) for job_id, params_json, owner, updated_at in rows
+                    if now - updated_at > stale_after or not self._owner_alive(owner)]
+            for job_id, params in lost:
+                playlist_id = self._created_playlist_id(job_id)
+                if playlist_id is not None:
+                    params["playlist_id"] = playlist_id
+                    self.logger.info(f"Job {job_id} resumes by syncing playlist {playlist_id}")
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE jobs SET status = ?, params_json = ?, owner = NULL, updated_at = ? WHERE id = ? AND status = ?",
+                    [(QUEUED, json.dumps(params), now, job_id, RUNNING) for job_id, params in lost]
+                )
+        if lost:
+            self.logger.info(f"Requeued {len(lost)} interrupted jobs")
+        return len(lost)
+
+    def heartbeat(self) -> int:
+        """
+        Mark every job this process is running as alive.
+
+        :return: The number of running jobs touched.
+        """
+        with self._lock:
+            with self._conn:
+                return self._conn.execute("UPDATE jobs SET updated_at = ? WHERE status = ? AND owner = ?",
+                                          (time.time(), RUNNING, self.owner)).rowcount
+
+    def prune(self, max_age: float = DEFAULT_JOB_RETENTION) -> int:
+        """
+        Delete finished jobs older than max_age seconds.
+
+        :return: The number of jobs deleted.
+        """
+        cutoff = time.time() - max_age
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "DELETE FROM job_events WHERE job_id IN "
+                    "(SELECT id FROM jobs WHERE status IN (?, ?) AND finished_at < ?)",
+                    (SUCCEEDED, FAILED, cutoff)
+                )
+                return self._conn.execute(
+                    "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                    (SUCCEEDED, FAILED, cutoff)
+                ).rowcount
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of stored jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)} | dict(rows)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _append_event(self, job_id: str, event: dict, now: float) -> None:
+        self._conn.execute("INSERT INTO job_events (job_id, event_json, created_at) VALUES (?, ?, ?)",
+                           (job_id, json.dumps(event), now))
+
+    def _notify_events(self) -> None:
+        with self._events_recorded:
+            self._events_recorded.notify_all()
+
+    def _created_playlist_id(self, job_id: str) -> Optional[str]:
+        """Return the playlist_id of the job's last PLAYLIST_CREATED event, or None. Call with the lock held."""
+        rows = self._conn.execute("SELECT event_json FROM job_events WHERE job_id = ? ORDER BY seq DESC",
+                                  (job_id,)).fetchall()
+        for (event_json,) in rows:
+            event = json.loads(event_json)
+            if event.get("stage") == PLAYLIST_CREATED and event.get("playlist_id"):
+                return event["playlist_id"]
+        return None
+
+    def _owner_alive(self, owner: Optional[str]) -> bool:
+        host, _, pid = (owner or "").rpartition(":")
+        if host != socket.gethostname() or not pid.isdigit():
+            # Another host's runner: only the stale check applies
+            return True
+        if int(pid) == os.getpid():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass
+        return True
+
+    def _to_job(self, row: tuple) -> Job:
+        job_id, kind, params_json, status, progress_json, result_json, error, created_at, started_at, finished_at = row
+        return Job(job_id, kind, json.loads(params_json), status,
+                   json.loads(progress_json) if progress_json else None,
+                   json.loads(result_json) if result_json else None,
+                   error, created_at, started_at, finished_at)
+
+class JobRunner:
+    def __init__(self, store: JobStore, handlers: Dict[str, JobHandler], max_workers: int = 2,
+                 max_pending: int = 50, heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL):
+        """
+        Run stored jobs on a bounded pool of background threads.
+
+        :param store: JobStore holding the jobs.
+        :param handlers: Handler per job kind. A handler is called as handler(params, progress_callback)
+            and returns the job's result. A result with "status": "error", or an exception, fails the job.
+        :param max_workers: Jobs run at once in this process (default 2).
+        :param max_pending: Jobs waiting or running in this process before submit raises JobQueueFull (default 50).
+        :param heartbeat_interval: Seconds between marking this process's running jobs as alive, which keeps
+            long jobs from being requeued as stale while they still run (default 60).
+        """
+        self.store = store
+        self.handlers = handlers
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._metrics = {"submitted": 0, "succeeded": 0, "failed": 0, "rejected": 0, "requeued": 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-runner")
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._beat, args=(heartbeat_interval,),
+                                           name="job-runner-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[JobRunner] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def start(self) -> None:
+        """
+        Requeue jobs whose runner is gone and schedule every queued job, e.g. work accepted before a restart.
+        """
+        self.store.prune()
+        requeued = self.store.requeue_interrupted()
+        jobs = self.store.queued()
+        with self._lock:
+            self._metrics["requeued"] += requeued
+            self._pending += len(jobs)
+        for job in jobs:
+            self._executor.submit(self._run, job.id)
+        if jobs:
+            self.logger.info(f"Resuming {len(jobs)} queued jobs")
+
+    def submit(self, kind: str, params: dict) -> Job:
+        """
+        Store a job and schedule it.
+
+        :raises ValueError: If there is no handler for kind.
+        :raises JobQueueFull: If max_pending jobs are already waiting or running in this process.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._metrics["rejected"] += 1
+                raise JobQueueFull(f"{self._pending} jobs are already pending")
+            self._pending += 1
+            self._metrics["submitted"] += 1
+        try:
+            job = self.store.create(kind, params)
+            self._executor.submit(self._run, job.id)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        self.logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    def _run(self, job_id: str) -> None:
+        try:
+            if not self.store.claim(job_id):
+                return
+            job = self.store.get(job_id)
+            self.logger.info(f"Running {job.kind} job {job_id}")
+            self._report(job_id, {"stage": "started"})
+            try:
+                result = self.handlers[job.kind](job.params, lambda progress: self._report(job_id, progress))
+            except Exception as e:
+                self.logger.error(f"Job {job_id} failed: {str(e)}")
+                self._finish(job_id, FAILED, None, str(e))
+                return
+            if isinstance(result, dict) and result.get("status") == "error":
+                self._finish(job_id, FAILED, result, result.get("message"))
+            else:
+                self._finish(job_id, SUCCEEDED, result, None)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _beat(self, interval: float) -> None:
+        while not self._stopped.wait(interval):
+            try:
+                self.store.heartbeat()
+            except Exception as e:
+                self.logger.warning(f"Could not mark running jobs as alive: {str(e)}")
+
+    def _report(self, job_id: str, progress: dict) -> None:
+        try:
+            self.store.update_progress(job_id, progress)
+        except Exception as e:
+            # Progress is informational; a failed write must not fail the job
+            self.logger.warning(f"Could not record progress for job {job_id}: {str(e)}")
+
+    def _finish(self, job_id: str, status: str, result: Optional[dict], error: Optional[str]) -> None:
+        self.store.finish(job_id, status, result, error)
+        with self._lock:
+            self._metrics[status] += 1
+        self.logger.info(f"Job {job_id} {status}")
+
+    def metrics(self) -> dict:
+        """Return this process's job counters and pending jobs, and the stored jobs per status."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["pending"] = self._pending
+        metrics["stored"] = self.store.counts()
+        return metrics
+
+    def close(self) -> None:
+        """
+        Stop taking jobs. Queued jobs not yet started stay queued in the store and run after the next start().
+        """
+        self._stopped.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
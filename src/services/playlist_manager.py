@@ -1,29 +1,87 @@
+import itertools
 import logging
+import queue
+import threading
+from datetime import date
+from typing import Callable, Iterable, Iterator, Optional
+from model.song import Song
 from model.songs import Songs
-from services.scraper import Scraper
+from services.browser_pool import BrowserPool
+from services.chart_archive import ChartArchive
+from services.insights_cache import InsightsCache, PlaylistInsights
+from services.chart_cache import ChartCache
+from services.gpt_operations import GPTOperations
+from services.scraper import Scraper, chart_week
+from services.spotify_operations.spotify_auth import SpotifyAuth
 from services.spotify_operations.spotify_playlist_maker import SpotifyPlaylistMaker
+from services.spotify_operations.track_cache import TrackCache
+from services.spotify_operations.track_index import TrackIndex
+from services.spotify_operations.track_resolver import TokenBucket, TrackResolver, FOUND
 from spotipy.exceptions import SpotifyException
 
+# Marks the end of a prefetched song stream
+_END_OF_SONGS = object()
+
 class PlaylistManager:
-    def __init__(self):
+    def __init__(self, browser_pool: Optional[BrowserPool] = None, chart_cache: Optional[ChartCache] = None,
+                 chart_archive: Optional[ChartArchive] = None, track_cache: Optional[TrackCache] = None,
+                 rate_limiter: Optional[TokenBucket] = None, search_concurrency: int = 8,
+                 use_async_client: bool = False, spotify_auth: Optional[SpotifyAuth] = None,
+                 gpt_operations: Optional[GPTOperations] = None, track_index: Optional[TrackIndex] = None,
+                 insights_cache: Optional[InsightsCache] = None):
+        """
+        Initialize the PlaylistManager.
+
+        :param browser_pool: Shared BrowserPool handed to every Scraper this manager creates, optional
+        :param chart_cache: ChartCache that chart scrapes read through, optional
+        :param chart_archive: ChartArchive consulted and filled for past chart weeks, optional
+        :param track_cache: TrackCache that Spotify track searches read through, optional
+        :param rate_limiter: TokenBucket shared by all Spotify track searches; a private one is created if omitted
+        :param search_concurrency: Maximum number of Spotify track searches run at once (default 8)
+        :param use_async_client: Make hot-path Spotify calls through the pooled asyncio client (default False)
+        :param spotify_auth: Shared SpotifyAuth from the ClientRegistry; a new one is created if omitted
+        :param gpt_operations: Shared GPTOperations used for mood and activity playlists, optional
+        :param track_index: TrackIndex that resolves songs locally before searching Spotify, optional
+        :param insights_cache: InsightsCache that collaborator insights are served from while a playlist is unchanged, optional
+        """
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         handler = logging.StreamHandler()
         formatter = logging.Formatter('[PlaylistManager]: %(asctime)s - %(name)s - %(levelname)s - %(message)s')
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
-        self.spotify_maker = SpotifyPlaylistMaker()
+        self.rate_limiter = rate_limiter or TokenBucket()
+        self.spotify_maker = SpotifyPlaylistMaker(track_cache=track_cache, rate_limiter=self.rate_limiter,
+                                                  use_async_client=use_async_client, auth=spotify_auth,
+                                                  track_index=track_index)
+        self.gpt_operations = gpt_operations
+        self.search_concurrency = search_concurrency
+        self.browser_pool = browser_pool
+        self.chart_cache = chart_cache
+        self.chart_archive = chart_archive
+        self.insights_cache = insights_cache
 
     def create_playlist(self, chart_type: str = None, songs_data: Songs = None, 
                    playlist_name: str = None, public: bool = True, 
-                   cover_image_path: str = None):
+                   cover_image_path: str = None, bypass_cache: bool = False,
+                   chart_date: Optional[date] = None, playlist_id: Optional[str] = None,
+                   song_stream: Optional[Iterable[Song]] = None,
+                   progress_callback: Optional[Callable[[dict], None]] = None):
         """
         Create a Spotify playlist based on either a chart type or provided Songs object.
+        With playlist_id, sync that existing playlist to the songs instead of creating a new one.
 
         :param chart_type: The type of chart to scrape (e.g., "billboard_hot_100"), optional
         :param songs_data: Songs object containing the songs to add, optional
         :param playlist_name: Custom name for the playlist, optional
-        :return: dict with status and message
+        :param bypass_cache: Scrape the chart even if a fresh cached snapshot exists
+        :param chart_date: Build the playlist from the chart week containing this date instead of the latest chart
+        :param playlist_id: Existing playlist to update with only the adds, removes and moves needed, optional
+        :param song_stream: Songs that arrive over time, e.g. GPTOperations.stream_songs(); searches start on
+            the first song while the rest are still being produced, optional
+        :param progress_callback: Called with a progress event dict ("stage" plus counts) as the
+            playlist is created, searched and filled, optional
+        :return: dict with status and message (and the sync summary in sync mode)
         """
         try:
             self.logger.info("Starting playlist creation")
@@ -31,26 +89,40 @@ class PlaylistManager:
             # Get songs either from scraper or provided Songs object
             if songs_data is None and chart_type:
                 # Initialize the scraper and get chart data
-                scraper = Scraper(headless=True, chart_type=chart_type)
+                scraper = Scraper(headless=True, chart_type=chart_type, browser_pool=self.browser_pool,
+                                  chart_cache=self.chart_cache, progress_callback=progress_callback)
                 self.logger.info(f"Initialized scraper for {chart_type}")
-                songs_data = scraper.get_latest_chart()
+                if chart_date is not None:
+                    songs = iter(self._get_chart_for_date(scraper, chart_date, progress_callback).songs)
+                    playlist_name = playlist_name or f"{chart_type.replace('_', ' ').title()} {chart_week(chart_date)} Playlist"
+                else:
+                    # Stream the chart so the playlist is created and searches start while it is still being scraped
+                    songs = self._prefetch(scraper.iter_latest_chart(bypass_cache=bypass_cache))
                 # Use chart type for playlist name if not provided
                 playlist_name = playlist_name or f"{chart_type.replace('_', ' ').title()} Playlist"
             elif songs_data is not None:
                 # Use provided Songs object
+                songs = iter(songs_data.songs)
+                playlist_name = playlist_name or "Custom Generated Playlist"
+            elif song_stream is not None:
+                songs = self._prefetch(song_stream)
                 playlist_name = playlist_name or "Custom Generated Playlist"
             else:
-                raise ValueError("Either chart_type or songs_data must be provided")
+                raise ValueError("Either chart_type, songs_data or song_stream must be provided")
 
-            if not songs_data.songs:
+            first_song = next(songs, None)
+            if first_song is None:
                 self.logger.error("No songs found.")
                 return {"status": "error", "message": "No songs found."}
 
-            self.logger.info(f"Processing {len(songs_data.songs)} songs")
+            self.logger.info("Processing songs as they arrive")
+
+            if playlist_id is not None:
+                return self._sync_playlist(playlist_id, itertools.chain([first_song], songs), progress_callback)
 
             # Get current user's Spotify ID
             try:
-                user = self.spotify_maker.sp.current_user()
+                user = self.spotify_maker.api.current_user()
                 user_id = user['id']
                 self.logger.info(f"Authenticated as Spotify user: {user['display_name']}")
             except SpotifyException as e:
@@ -60,7 +132,7 @@ class PlaylistManager:
             # Create a Spotify playlist
             playlist_description = f"Automatically generated playlist: {playlist_name}"
             try:
-                playlist_id = self.spotify_maker.create_playlist(
+                playlist_id, snapshot_id = self.spotify_maker.create_playlist(
                 user_id=user_id,
                 playlist_name=playlist_name,
                 description=playlist_description,
@@ -68,26 +140,20 @@ class PlaylistManager:
                 cover_image_path=cover_image_path
             )
                 self.logger.info(f"Created playlist '{playlist_name}' with ID {playlist_id}")
+                self._report(progress_callback, stage="playlist_created", playlist_id=playlist_id)
             except SpotifyException as e:
                 self.logger.error(f"Failed to create playlist: {str(e)}")
                 return {"status": "error", "message": "Failed to create Spotify playlist."}
 
-            # Search and collect Spotify URIs for the songs
-            track_uris = []
-            for song in songs_data.songs:
-                try:
-                    uri = self.spotify_maker.search_song(artist=song.artist, track=song.title)
-                    if uri:
-                        track_uris.append(uri)
-                    else:
-                        self.logger.warning(f"Could not find '{song.title}' by {song.artist} on Spotify")
-                except Exception as e:
-                    self.logger.error(f"Error searching for '{song.title}' by {song.artist}: {str(e)}")
+            # Search and collect Spotify URIs for the songs, in chart order
+            track_uris = self._resolve_track_uris(itertools.chain([first_song], songs), progress_callback)
 
             # Add tracks to the playlist
             if track_uris:
                 try:
-                    self.spotify_maker.add_tracks_to_playlist(playlist_id, track_uris)
+                    self._report(progress_callback, stage="adding", playlist_id=playlist_id, tracks=len(track_uris))
+                    self.spotify_maker.add_tracks_to_playlist(playlist_id, track_uris, snapshot_id=snapshot_id,
+                                                              progress_callback=self._forward(progress_callback))
                     self.logger.info(f"Successfully added {len(track_uris)} songs to the Spotify playlist.")
                     return {"status": "success", "message": f"Created playlist with {len(track_uris)} songs."}
                 except SpotifyException as e:
@@ -101,70 +167,197 @@ class PlaylistManager:
             self.logger.error(f"An unexpected error occurred: {str(e)}")
             return {"status": "error", "message": "An unexpected error occurred while creating the playlist."}
     
+    def _sync_playlist(self, playlist_id: str, songs: Iterable[Song],
+                       progress_callback: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Resolve the songs and apply only the difference to an existing playlist.
+        """
+        track_uris = self._resolve_track_uris(songs, progress_callback)
+        if not track_uris:
+            # Never empty a playlist because every search failed
+            self.logger.error("No songs were found on Spotify, leaving the playlist unchanged.")
+            return {"status": "error", "message": "No songs were found on Spotify to sync to the playlist."}
+
+        try:
+            self._report(progress_callback, stage="syncing", playlist_id=playlist_id, tracks=len(track_uris))
+            sync = self.spotify_maker.sync_playlist(playlist_id, track_uris)
+        except SpotifyException as e:
+            self.logger.error(f"Failed to sync playlist {playlist_id}: {str(e)}")
+            return {"status": "error", "message": "Failed to sync Spotify playlist."}
+
+        return {
+            "status": "success",
+            "message": f"Synced playlist with {len(track_uris)} songs: {sync['added']} added, "
+                       f"{sync['removed']} removed, {sync['moved']} moved in {sync['api_calls']} requests.",
+            "playlist_id": playlist_id,
+            "sync": sync
+        }
+
+    def _resolve_track_uris(self, songs: Iterable[Song],
+                            progress_callback: Optional[Callable[[dict], None]] = None) -> list:
+        """
+        Search Spotify for the songs concurrently and return the URIs found, in song order.
+        Songs that were not found or whose search failed are logged by the resolver and skipped.
+        A "resolving" event is reported as each search completes, in song order.
+        """
+        resolver = TrackResolver(self.spotify_maker.search_song, rate_limiter=self.rate_limiter,
+                                 max_workers=self.search_concurrency)
+        track_uris = []
+        for searched, result in enumerate(resolver.iter_resolve(songs), start=1):
+            if result.status == FOUND:
+                track_uris.append(result.uri)
+            self._report(progress_callback, stage="resolving", searched=searched, found=len(track_uris))
+        return track_uris
+
+    def _report(self, progress_callback: Optional[Callable[[dict], None]], **event) -> None:
+        """
+        Send a progress event to progress_callback, if any. A failing callback is logged and never
+        interrupts the playlist being built.
+        """
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(event)
+        except Exception as e:
+            self.logger.warning(f"Progress callback failed: {str(e)}")
+
+    def _forward(self, progress_callback: Optional[Callable[[dict], None]]) -> Optional[Callable[[dict], None]]:
+        """Wrap progress_callback for a collaborator, so its events go through _report."""
+        if progress_callback is None:
+            return None
+        return lambda event: self._report(progress_callback, **event)
+
+    def _prefetch(self, songs: Iterable[Song]) -> Iterator[Song]:
+        """
+        Drain a song stream on a producer thread and yield its songs from a queue, so the source
+        keeps producing while the caller works on the songs already received.
+
+        Exceptions raised by the source are re-raised in the consuming thread.
+        """
+        buffer = queue.Queue()
+
+        def produce():
+            try:
+                for song in songs:
+                    buffer.put(song)
+            except Exception as e:
+                buffer.put(e)
+            finally:
+                buffer.put(_END_OF_SONGS)
+
+        threading.Thread(target=produce, name="playlist-song-prefetch", daemon=True).start()
+
+        while True:
+            item = buffer.get()
+            if item is _END_OF_SONGS:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _get_chart_for_date(self, scraper: Scraper, chart_date: date,
+                            progress_callback: Optional[Callable[[dict], None]] = None) -> Songs:
+        """
+        Read a past chart week from the archive, scraping and archiving it on a miss.
+        """
+        if self.chart_archive is not None:
+            songs = self.chart_archive.get_chart(scraper.chart_type, chart_date)
+            if songs is not None:
+                self.logger.info(f"Loaded {scraper.chart_type} for {chart_week(chart_date)} from the archive")
+                self._report(progress_callback, stage="scraped", rows=len(songs.songs))
+                return songs
+
+        songs = scraper.get_chart_for_date(chart_date)
+        if self.chart_archive is not None and songs.songs:
+            self.chart_archive.store(scraper.chart_type, chart_date, songs)
+        return songs
+
     def get_collaborator_insights(self, playlist_id: str):
         """
         Analyze collaborator contributions for a playlist.
+
+        With an insights cache, a request for the playlist's snapshot_id alone decides whether the
+        cached insights still hold; any change reads the whole playlist again.
         """
         try:
-            playlist_details = self.spotify_maker.get_playlist_details(playlist_id)
-            collaborator_stats = {}
-
-            for song in playlist_details['songs']:
-                contributor = song['added_by']
-                if contributor not in collaborator_stats:
-                    collaborator_stats[contributor] = {"songs_added": 0}
-                collaborator_stats[contributor]["songs_added"] += 1
-
-            return {
-                "playlist_name": playlist_details["name"],
-                "description": playlist_details["description"],
-                "collaborator_stats": collaborator_stats
-            }
+            if self.insights_cache is None:
+                return self._compute_insights(self.spotify_maker.get_playlist_details(playlist_id))
+
+            cached = self.insights_cache.get(playlist_id)
+            if cached is not None:
+                if self.spotify_maker.get_playlist_snapshot_id(playlist_id) == cached.snapshot_id:
+                    self.insights_cache.record("hits")
+                    return cached.insights
+
+            details = self.spotify_maker.get_playlist_details(playlist_id)
+            insights = self._compute_insights(details)
+            self.insights_cache.put(PlaylistInsights(playlist_id, details["snapshot_id"], insights))
+            self.insights_cache.record("misses" if cached is None else "full_refreshes")
+            return insights
         except Exception as e:
             self.logger.error(f"Error analyzing playlist: {str(e)}")
             return {"error": "Failed to analyze playlist"}
-    
-    def create_mood_or_activity_playlist(self, mood_or_activity: str, playlist_name: str = None, public: bool = True):
+
+    def _compute_insights(self, playlist_details: dict, collaborator_stats: Optional[dict] = None) -> dict:
+        """
+        Count the songs each collaborator added, on top of collaborator_stats when given.
+        """
+        collaborator_stats = {user: dict(stats) for user, stats in (collaborator_stats or {}).items()}
+        for song in playlist_details['songs']:
+            contributor = song['added_by']
+            if contributor not in collaborator_stats:
+                collaborator_stats[contributor] = {"songs_added": 0}
+            collaborator_stats[contributor]["songs_added"] += 1
+
+        return {
+            "playlist_name": playlist_details["name"],
+            "description": playlist_details["description"],
+            "collaborator_stats": collaborator_stats
+        }
+
+    def create_mood_or_activity_playlist(self, mood_or_activity: str, playlist_name: str = None, public: bool = True,
+                                         progress_callback: Optional[Callable[[dict], None]] = None):
         """
         Create a playlist for a specific mood or activity.
         Args:
             mood_or_activity (str): Mood or activity (e.g., "Workout", "Relaxation").
             playlist_name (str): Optional custom playlist name.
             public (bool): Whether the playlist is public.
+            progress_callback (callable): Optional, called with progress event dicts as in create_playlist.
         Returns:
             dict: Status and message of the operation.
         """
         try:
             self.logger.info(f"Creating playlist for mood/activity: {mood_or_activity}")
             
-            # Fetch songs from GPT
-            gpt_operations = GPTOperations()
-            songs = gpt_operations.fetch_songs_by_mood_or_activity(mood_or_activity)
-            
-            if not songs.songs:
+            # Stream songs from GPT; searches start on the first song while the rest are generated
+            gpt_operations = self.gpt_operations or GPTOperations()
+            songs = self._prefetch(gpt_operations.stream_songs_by_mood_or_activity(mood_or_activity))
+            first_song = next(songs, None)
+
+            if first_song is None:
                 return {"status": "error", "message": "No songs generated for the selected mood or activity."}
 
             # Generate playlist name if not provided
             playlist_name = playlist_name or f"{mood_or_activity.title()} Playlist"
 
             # Create the playlist
-            user = self.spotify_maker.sp.current_user()
-            playlist_id = self.spotify_maker.create_playlist(
+            user = self.spotify_maker.api.current_user()
+            playlist_id, snapshot_id = self.spotify_maker.create_playlist(
                 user_id=user['id'],
                 playlist_name=playlist_name,
                 description=f"A playlist tailored for {mood_or_activity}.",
                 public=public
             )
+            self._report(progress_callback, stage="playlist_created", playlist_id=playlist_id)
             
             # Add songs to the playlist
-            track_uris = []
-            for song in songs.songs:
-                uri = self.spotify_maker.search_song(artist=song.artist, track=song.title)
-                if uri:
-                    track_uris.append(uri)
+            track_uris = self._resolve_track_uris(itertools.chain([first_song], songs), progress_callback)
 
             if track_uris:
-                self.spotify_maker.add_tracks_to_playlist(playlist_id, track_uris)
+                self._report(progress_callback, stage="adding", playlist_id=playlist_id, tracks=len(track_uris))
+                self.spotify_maker.add_tracks_to_playlist(playlist_id, track_uris, snapshot_id=snapshot_id,
+                                                          progress_callback=self._forward(progress_callback))
                 self.logger.info(f"Successfully created {playlist_name} with {len(track_uris)} songs.")
                 return {"status": "success", "message": f"Playlist '{playlist_name}' created with {len(track_uris)} songs."}
             else:
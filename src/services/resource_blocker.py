@@ -0,0 +1,119 @@
+import fnmatch
+import re
+from typing import Dict, Iterable, Optional
+
+# Rough typical transfer size of one request per Playwright resource type, used to estimate the
+# bytes an aborted request would have cost (its real size is never known, since it is not sent)
+ESTIMATED_BYTES_BY_TYPE = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "stylesheet": 20_000,
+    "script": 30_000,
+    "xhr": 5_000,
+    "fetch": 5_000
+}
+# Estimate for resource types missing from ESTIMATED_BYTES_BY_TYPE
+DEFAULT_ESTIMATED_BYTES = 10_000
+
+class ResourceBlocker:
+    def __init__(self, block_resource_types: Iterable[str] = (), block_url_patterns: Iterable[str] = (),
+                 allow_url_patterns: Iterable[str] = (), estimated_bytes_by_type: Optional[Dict[str, int]] = None):
+        """
+        Initialize a request-interception layer for a Playwright page.
+
+        Allow patterns win over everything else; otherwise a request is blocked when its URL matches
+        a deny pattern or its resource type is in block_resource_types.
+
+        :param block_resource_types: Playwright resource types to abort (e.g. 'image', 'font').
+        :param block_url_patterns: Glob patterns of URLs to abort (e.g. '*doubleclick.net*').
+        :param allow_url_patterns: Glob patterns of URLs that are always loaded.
+        :param estimated_bytes_by_type: Bytes one blocked request of each resource type is assumed to
+            save (default ESTIMATED_BYTES_BY_TYPE).
+        """
+        self.block_resource_types = frozenset(block_resource_types)
+        self.block_url_patterns = list(block_url_patterns)
+        self.allow_url_patterns = list(allow_url_patterns)
+        self.estimated_bytes_by_type = dict(ESTIMATED_BYTES_BY_TYPE if estimated_bytes_by_type is None
+                                            else estimated_bytes_by_type)
+        self._block_url_regex = self._compile(self.block_url_patterns)
+        self._allow_url_regex = self._compile(self.allow_url_patterns)
+        self.reset_stats()
+
+    @classmethod
+    def from_config(cls, network_config: dict) -> "ResourceBlocker":
+        """
+        Build a ResourceBlocker from a chart's "network" configuration.
+
+        :param network_config: Dict with optional block_resource_types, block_url_patterns and allow_url_patterns lists.
+        """
+        return cls(
+            block_resource_types=network_config.get("block_resource_types", ()),
+            block_url_patterns=network_config.get("block_url_patterns", ()),
+            allow_url_patterns=network_config.get("allow_url_patterns", ())
+        )
+
+    @staticmethod
+    def _compile(patterns) -> Optional[re.Pattern]:
+        if not patterns:
+            return None
+        return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """Return True when a request of this resource type and URL should be aborted."""
+        if self._allow_url_regex and self._allow_url_regex.match(url):
+            return False
+        if self._block_url_regex and self._block_url_regex.match(url):
+            return True
+        return resource_type in self.block_resource_types
+
+    def attach(self, page) -> None:
+        """
+        Start intercepting the requests of a Playwright page (or browser context).
+
+        :param page: A sync Playwright Page or BrowserContext.
+        """
+        page.route("**/*", self._handle_route)
+        page.on("response", self._handle_response)
+
+    def reset_stats(self) -> None:
+        """Clear the request counters."""
+        self.requests_blocked = 0
+        self.requests_allowed = 0
+        self.bytes_loaded = 0
+        self.bytes_saved = 0
+        self.blocked_by_type = {}
+
+    def summary(self) -> dict:
+        """
+        Return the request counters collected since the last reset.
+
+        requests_blocked is the number of requests saved. bytes_loaded adds up the Content-Length
+        of the responses that were let through. bytes_saved is an estimate: each blocked request
+        counts the typical size of its resource type (see ESTIMATED_BYTES_BY_TYPE), since aborted
+        requests are never sent. `benchmarks/bench_scraper.py --live` measures the real figure by
+        comparing bytes_loaded with an unblocked run.
+        """
+        return {
+            "requests_blocked": self.requests_blocked,
+            "requests_allowed": self.requests_allowed,
+            "bytes_loaded": self.bytes_loaded,
+            "bytes_saved": self.bytes_saved,
+            "blocked_by_type": dict(self.blocked_by_type)
+        }
+
+    def _handle_route(self, route) -> None:
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.requests_blocked += 1
+            self.blocked_by_type[request.resource_type] = self.blocked_by_type.get(request.resource_type, 0) + 1
+            self.bytes_saved += self.estimated_bytes_by_type.get(request.resource_type, DEFAULT_ESTIMATED_BYTES)
+            route.abort()
+        else:
+            self.requests_allowed += 1
+            route.continue_()
+
+    def _handle_response(self, response) -> None:
+        content_length = response.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            self.bytes_loaded += int(content_length)
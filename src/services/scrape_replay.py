@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Optional
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from services.http_scraper import get_shared_session
+
+# Supported modes:
+#   "record" - scrape the live site and save each chart page to the snapshot directory
+#   "replay" - serve chart pages from the snapshot directory and never touch the network
+RECORD = "record"
+REPLAY = "replay"
+REPLAY_MODES = (RECORD, REPLAY)
+
+INDEX_FILE = "index.json"
+
+class ScrapeReplay:
+    def __init__(self, directory: str, mode: str = REPLAY):
+        """
+        Initialize a record/replay harness for chart pages.
+
+        Snapshots are stored as one HTML file per URL plus an index.json mapping URLs to files. The
+        same snapshot is served to the HTTP engine (through a requests transport adapter) and to
+        Playwright (through request routing), so both engines can run offline.
+
+        :param directory: Snapshot directory; created when recording.
+        :param mode: RECORD or REPLAY (default REPLAY).
+        """
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Replay mode '{mode}' is not supported.")
+
+        self.directory = directory
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[ScrapeReplay] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def _load_index(self) -> dict:
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return {}
+        with open(index_path, encoding="utf-8") as index_file:
+            return json.load(index_file)
+
+    def save(self, url: str, html: str) -> str:
+        """
+        Save a chart page snapshot.
+
+        :param url: The URL the page was loaded from.
+        :param html: The page HTML.
+        :return: The path of the snapshot file.
+        """
+        filename = hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".html"
+        path = os.path.join(self.directory, filename)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as snapshot:
+                snapshot.write(html)
+            self._index[url] = filename
+            with open(os.path.join(self.directory, INDEX_FILE), "w", encoding="utf-8") as index_file:
+                json.dump(self._index, index_file, indent=4, sort_keys=True)
+        self.logger.info(f"Recorded {url} to {path}")
+        return path
+
+    def load(self, url: str) -> Optional[str]:
+        """Return the recorded HTML for a URL, or None if it was never recorded."""
+        with self._lock:
+            filename = self._index.get(url)
+        if filename is None:
+            return None
+        with open(os.path.join(self.directory, filename), encoding="utf-8") as snapshot:
+            return snapshot.read()
+
+    def session(self) -> requests.Session:
+        """
+        Return a requests session for the HTTP engine.
+
+        In replay mode every request is answered from disk. In record mode requests go to the
+        network through the shared session and successful responses are saved.
+        """
+        if self.mode == REPLAY:
+            session = requests.Session()
+            adapter = ReplayAdapter(self)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+
+        session = RecordingSession(self)
+        session.headers.update(get_shared_session().headers)
+        return session
+
+    def attach(self, page) -> None:
+        """
+        In replay mode, route a Playwright page so recorded URLs are served from disk and all
+        other requests are aborted. Does nothing in record mode.
+
+        Register this after any other "**/*" route so it takes precedence.
+        """
+        if self.mode == REPLAY:
+            page.route("**/*", self._handle_route)
+
+    def after_load(self, page, url: str) -> None:
+        """In record mode, save the rendered page once its chart rows have loaded."""
+        if self.mode == RECORD:
+            self.save(url, page.content())
+
+    def _handle_route(self, route) -> None:
+        html = self.load(route.request.url)
+        if html is None:
+            route.abort()
+        else:
+            route.fulfill(status=200, content_type="text/html; charset=utf-8", body=html)
+
+class RecordingSession(requests.Session):
+    def __init__(self, replay: ScrapeReplay):
+        """
+        requests session that saves every successful response to a ScrapeReplay snapshot directory.
+
+        A redirected page is saved under the URL that was requested as well as the final URL, since
+        replay looks pages up by the URL the scraper asks for. (Response hooks cannot do this: they
+        run before requests follows redirects and fills in response.history.)
+
+        :param replay: The ScrapeReplay to record into.
+        """
+        super().__init__()
+        self.replay = replay
+
+    def send(self, request, **kwargs) -> requests.Response:
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            # Redirect hops are sent through here too, so the final URL is saved by its own hop
+            self.replay.save(request.url, response.text)
+        return response
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, replay: ScrapeReplay):
+        """
+        requests transport adapter answering every request from a ScrapeReplay snapshot directory.
+
+        :param replay: The ScrapeReplay holding the snapshots.
+        """
+        super().__init__()
+        self.replay = replay
+
+    def send(self, request, **kwargs) -> requests.Response:
+        html = self.replay.load(request.url)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if html is None:
+            response.status_code = 404
+            response.reason = "Not Recorded"
+            response._content = b""
+        else:
+            response.status_code = 200
+            response.reason = "OK"
+            response._content = html.encode("utf-8")
+            response.encoding = "utf-8"
+            response.headers = CaseInsensitiveDict({"Content-Type": "text/html; charset=utf-8"})
+        return response
+
+    def close(self) -> None:
+        pass
@@ -1,29 +1,129 @@
 import logging
-from typing import List
+import queue
+import threading
+from datetime import date, timedelta
+from typing import Callable, Iterator, List, Optional
 from playwright.sync_api import sync_playwright 
 from model.song import Song
 from model.songs import Songs
 from model.chart_tags import ChartTags
-from music_chart_scraper_config import MUSIC_CHART_SCRAPER_CONFIG  # Assuming ChartTags is also in the model
+from music_chart_scraper_config import (  # Assuming ChartTags is also in the model
+    MUSIC_CHART_SCRAPER_CONFIG, DEFAULT_NETWORK_CONFIG, DEFAULT_CHART_CACHE_TTL
+)
+from services.browser_pool import BrowserPool
+from services.chart_cache import ChartCache, NOT_MODIFIED
+from services.http_scraper import HttpChartFetcher
+from services.resource_blocker import ResourceBlocker
+from services.scrape_replay import ScrapeReplay
+from services.single_flight import get_single_flight
+
+# Supported row extraction modes:
+#   "evaluate"    - one in-page evaluation returns every row's title and artist
+#   "per_element" - query and read each row element over Playwright (one IPC round trip per call)
+EXTRACTION_MODES = ("evaluate", "per_element")
+
+# Supported scraper engines, selected per chart with the "engine" key in MUSIC_CHART_SCRAPER_CONFIG:
+#   "playwright" - render the page in Chromium
+#   "http"       - fetch the server-rendered HTML and parse it, falling back to Playwright on zero rows
+ENGINES = ("playwright", "http")
+
+# Runs inside the page; receives the matched chart rows and the [title, artist] selectors, plus an
+# optional [start, end) slice of rows to read.
+EXTRACT_ROWS_SCRIPT = """
+(items, [titleSelector, artistSelector, start = 0, end = items.length]) => items.slice(start, end).map((item) => {
+    const title = item.querySelector(titleSelector);
+    const artist = item.querySelector(artistSelector);
+    return [
+        title ? title.innerText.trim() : null,
+        artist ? artist.innerText.trim() : null,
+    ];
+})
+"""
+
+# Rows read per in-page evaluation when streaming a chart with Playwright
+STREAM_BATCH_SIZE = 10
+
+# Marks the end of a streamed chart on the producer queue
+_END_OF_CHART = object()
+
+# Concurrent requests for the same latest chart in this process share one fetch
+_latest_chart_flight = get_single_flight("latest_chart")
+
+def chart_week(chart_date: date) -> date:
+    """
+    Return the week-ending date (Saturday) of the chart week containing chart_date.
+
+    :param chart_date: Any day of the week.
+    :return: The Saturday on or after chart_date, which is how Billboard dates its weekly charts.
+    """
+    return chart_date + timedelta(days=(5 - chart_date.weekday()) % 7)
+
+def rows_to_songs(rows: List[list]) -> List[Song]:
+    """
+    Convert extracted [title, artist] rows into Song objects.
+
+    :param rows: Rows as returned by EXTRACT_ROWS_SCRIPT; missing cells are None.
+    :return: A list of Song objects in chart order.
+    """
+    return [
+        Song(title if title is not None else "Unknown Title",
+             artist if artist is not None else "Unknown Artist")
+        for title, artist in rows
+    ]
 
 class Scraper:
-    def __init__(self, headless: bool = True, chart_type: str = "billboard_hot_100"):
+    def __init__(self, headless: bool = True, chart_type: str = "billboard_hot_100",
+                 extraction_mode: str = "evaluate", browser_pool: Optional[BrowserPool] = None,
+                 engine: Optional[str] = None, block_resources: bool = True,
+                 chart_cache: Optional[ChartCache] = None, replay: Optional[ScrapeReplay] = None,
+                 progress_callback: Optional[Callable[[dict], None]] = None):
         """
         Initialize the Scraper class.
 
         :param headless: Whether to run the browser in headless mode (default True).
+            Ignored when a browser_pool is given; the pool decides.
         :param chart_type: The type of chart to scrape (default 'billboard_hot_100').
+        :param extraction_mode: How chart rows are read from the page, one of EXTRACTION_MODES (default 'evaluate').
+        :param browser_pool: Shared BrowserPool to lease pages from instead of launching Chromium per scrape.
+        :param engine: Scraper engine, one of ENGINES (default the chart's configured engine, else 'playwright').
+        :param block_resources: Whether to abort requests matched by the chart's network rules (default True).
+        :param chart_cache: ChartCache that get_latest_chart reads through, optional.
+        :param replay: ScrapeReplay that records chart pages to disk or serves them from disk, optional.
+        :param progress_callback: Called with {"stage": "scraping", "rows": n} as rows are streamed and
+            {"stage": "scraped", "rows": n} once the chart is complete, optional.
         """
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Extraction mode '{extraction_mode}' is not supported.")
+
         self.chart_type = chart_type
+        self.extraction_mode = extraction_mode
+        self.browser_pool = browser_pool
+        self.http_fetcher = None
+        self.block_resources = block_resources
+        self.chart_cache = chart_cache
+        self.replay = replay
+        self.progress_callback = progress_callback
+        # Request counters from the most recent Playwright scrape, see ResourceBlocker.summary()
+        self.last_network_stats = None
+        # Final URL of the most recently loaded chart page, after any redirects
+        self.last_page_url = None
         self.config = MUSIC_CHART_SCRAPER_CONFIG.get(chart_type)
         
         if not self.config:
             raise ValueError(f"Chart type '{chart_type}' is not supported.")
         
+        self.engine = engine or self.config.get('engine', 'playwright')
+        if self.engine not in ENGINES:
+            raise ValueError(f"Scraper engine '{self.engine}' is not supported.")
+        if self.engine == "http":
+            self.http_fetcher = HttpChartFetcher(session=replay.session() if replay else None)
+
         tags = self.config['tags']
         # Use the ChartTags model to store tag configuration
         self.tags = ChartTags(tags["chart_item"], tags["title"], tags["artist"])
         self.base_url = self.config['url']
+        self.network_config = {**DEFAULT_NETWORK_CONFIG, **self.config.get('network', {})}
+        self.cache_ttl = self.config.get('cache_ttl', DEFAULT_CHART_CACHE_TTL)
         self.headless = headless
         
         # Set up logging with a prefix
@@ -34,58 +134,361 @@ class Scraper:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
 
-        self.logger.info(f"Initialized Scraper with headless={self.headless} and chart_type={self.chart_type}")
+        self.logger.info(f"Initialized Scraper with headless={self.headless}, chart_type={self.chart_type}, "
+                         f"engine={self.engine} and extraction_mode={self.extraction_mode}")
 
     def _scrape_chart(self, url: str) -> Songs:
         """Scrapes the configured chart for the latest songs."""
 
         self.logger.info(f"Starting to scrape chart from {url}")
 
-        try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=self.headless)
-                self.logger.info("Browser launched")
-
-                page = browser.new_page()
-                self.logger.info(f"Navigating to URL: {url}")
-                page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        if self.engine == "http":
+            songs = self._scrape_http(url)
+            if songs:
+                return Songs(songs)
+            self.logger.warning("HTTP engine found no chart rows, falling back to Playwright")
 
-                # Wait for the chart rows to load using the tag configuration from the ChartTags model
-                self.logger.info("Waiting for the chart rows to load")
-                page.wait_for_selector(self.tags.chart_item, timeout=60000)
+        return self._scrape_with_browser(url)
 
-                # Extract song titles and artists using the tag configuration from the ChartTags model
-                chart_items = page.query_selector_all(self.tags.chart_item)
-                songs = []
-                for idx, item in enumerate(chart_items, start=1):
-                    # Extract song title
-                    title_element = item.query_selector(self.tags.title)
-                    title = title_element.inner_text().strip() if title_element else "Unknown Title"
-
-                    # Extract artist
-                    artist_element = item.query_selector(self.tags.artist)
-                    artist = artist_element.inner_text().strip() if artist_element else "Unknown Artist"
-
-                    songs.append(Song(title, artist))
-                    self.logger.info(f"Extracted #{idx}: {title} by {artist}")
+    def _scrape_with_browser(self, url: str) -> Songs:
+        """Scrape the chart with Playwright, using the browser pool when one is set."""
+        try:
+            if self.browser_pool is not None:
+                songs = self.browser_pool.run(lambda page: self._scrape_page(page, url))
+            else:
+                with sync_playwright() as p:
+                    browser = p.chromium.launch(headless=self.headless)
+                    self.logger.info("Browser launched")
 
-                self.logger.info(f"Successfully scraped {len(songs)} songs from the chart")
-                browser.close()
+                    page = browser.new_page()
+                    songs = self._scrape_page(page, url)
+                    browser.close()
 
+            self.logger.info(f"Successfully scraped {len(songs)} songs from the chart")
             return Songs(songs)
 
         except Exception as e:
             self.logger.error(f"An error occurred while scraping Billboard chart: {e}")
             return Songs([])
 
-    def get_latest_chart(self) -> Songs:
+    def _scrape_http(self, url: str) -> List[Song]:
+        """
+        Scrape the chart without a browser.
+
+        :param url: The chart URL to fetch.
+        :return: A list of Song objects, empty when the request failed or the selectors matched nothing.
+        """
+        try:
+            result = self.http_fetcher.fetch_conditional(url, self.tags)
+        except Exception as e:
+            self.logger.warning(f"HTTP engine failed for {url}: {e}")
+            return []
+
+        self.last_page_url = result.url
+        songs = rows_to_songs(result.rows)
+        for idx, song in enumerate(songs, start=1):
+            self.logger.info(f"Extracted #{idx}: {song.title} by {song.artist}")
+        if songs:
+            self.logger.info(f"Successfully scraped {len(songs)} songs from the chart")
+        return songs
+
+    def _scrape_page(self, page, url: str) -> List[Song]:
+        """
+        Load the chart in the given page and extract its songs.
+
+        :param page: A Playwright page, either freshly launched or leased from the browser pool.
+        :param url: The chart URL to load.
+        :return: A list of Song objects in chart order.
+        """
+        blocker = self._load_page(page, url)
+
+        # Extract song titles and artists using the tag configuration from the ChartTags model
+        songs = self._extract_songs(page)
+
+        self._record_network_stats(blocker)
+        return songs
+
+    def _stream_page(self, page, url: str, emit) -> None:
+        """
+        Load the chart in the given page and hand its rows to emit in batches as they are read.
+
+        :param page: A Playwright page, either freshly launched or leased from the browser pool.
+        :param url: The chart URL to load.
+        :param emit: Called with each batch of [title, artist] rows, in chart order.
+        """
+        blocker = self._load_page(page, url)
+
+        if self.extraction_mode == "evaluate":
+            start = 0
+            while True:
+                rows = page.eval_on_selector_all(
+                    self.tags.chart_item,
+                    EXTRACT_ROWS_SCRIPT,
+                    [self.tags.title, self.tags.artist, start, start + STREAM_BATCH_SIZE]
+                )
+                if rows:
+                    emit(rows)
+                if len(rows) < STREAM_BATCH_SIZE:
+                    break
+                start += STREAM_BATCH_SIZE
+        else:
+            for item in page.query_selector_all(self.tags.chart_item):
+                emit([self._read_row(item)])
+
+        self._record_network_stats(blocker)
+
+    def _load_page(self, page, url: str) -> Optional[ResourceBlocker]:
+        """
+        Navigate to the chart and wait for its rows.
+
+        :return: The ResourceBlocker attached to the page, or None when blocking is disabled.
+        """
+        blocker = None
+        if self.block_resources:
+            blocker = ResourceBlocker.from_config(self.network_config)
+            blocker.attach(page)
+        if self.replay is not None:
+            self.replay.attach(page)
+
+        self.logger.info(f"Navigating to URL: {url}")
+        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        self.last_page_url = page.url
+
+        # Wait for the chart rows to load using the tag configuration from the ChartTags model
+        self.logger.info("Waiting for the chart rows to load")
+        page.wait_for_selector(self.tags.chart_item, timeout=60000)
+        if self.replay is not None:
+            self.replay.after_load(page, url)
+        return blocker
+
+    def _record_network_stats(self, blocker: Optional[ResourceBlocker]) -> None:
+        if blocker is not None:
+            self.last_network_stats = blocker.summary()
+            self.logger.info(f"Blocked {blocker.requests_blocked} requests {blocker.blocked_by_type}, "
+                             f"(about {blocker.bytes_saved} bytes saved), loaded {blocker.requests_allowed} requests "
+                             f"({blocker.bytes_loaded} bytes)")
+
+    def _read_row(self, item) -> list:
+        """Read one chart row element over Playwright as a [title, artist] row."""
+        title_element = item.query_selector(self.tags.title)
+        artist_element = item.query_selector(self.tags.artist)
+        return [
+            title_element.inner_text().strip() if title_element else None,
+            artist_element.inner_text().strip() if artist_element else None
+        ]
+
+    def _extract_songs(self, page) -> List[Song]:
         """
-        Get the latest available chart.
+        Extract the songs from a loaded chart page using the configured extraction mode.
 
+        :param page: A Playwright page with the chart rows already rendered.
+        :return: A list of Song objects in chart order.
+        """
+        if self.extraction_mode == "evaluate":
+            rows = page.eval_on_selector_all(
+                self.tags.chart_item,
+                EXTRACT_ROWS_SCRIPT,
+                [self.tags.title, self.tags.artist]
+            )
+        else:
+            rows = [self._read_row(item) for item in page.query_selector_all(self.tags.chart_item)]
+
+        songs = rows_to_songs(rows)
+        for idx, song in enumerate(songs, start=1):
+            self.logger.info(f"Extracted #{idx}: {song.title} by {song.artist}")
+        return songs
+
+    def get_latest_chart(self, bypass_cache: bool = False) -> Songs:
+        """
+        Get the latest available chart. Concurrent calls for the same chart in this process share
+        one fetch (see SingleFlight).
+
+        :param bypass_cache: Scrape even when the chart cache holds a fresh snapshot (default False).
+            The result still replaces the cached snapshot.
         :return: A Songs object containing a list of Song objects.
         """
+        songs = _latest_chart_flight.do((self.chart_type, bypass_cache), lambda: self._get_latest_chart(bypass_cache))
+        self._report(stage="scraped", rows=len(songs.songs))
+        return songs
+
+    def _get_latest_chart(self, bypass_cache: bool) -> Songs:
         self.logger.info(f"Fetching the most recent chart from {self.base_url}")
-        return self._scrape_chart(self.base_url)
+        if self.chart_cache is None:
+            return self._scrape_chart(self.base_url)
+
+        if bypass_cache:
+            self.chart_cache.record_bypass()
+            songs = self._scrape_chart(self.base_url)
+            if songs.songs:
+                self.chart_cache.put(self.chart_type, songs)
+            return songs
+
+        return self.chart_cache.get(self.chart_type, self.cache_ttl, self._refresh_snapshot)
+
+    def iter_latest_chart(self, bypass_cache: bool = False) -> Iterator[Song]:
+        """
+        Stream the latest available chart, yielding each Song as soon as its row is extracted.
+
+        Only the Playwright engine streams: the page is read in batches of STREAM_BATCH_SIZE rows on a
+        producer thread, so callers can work on early rows while later ones are still being extracted.
+        The HTTP engine (the default for most charts) parses the whole page before yielding its first
+        song, so for it this is get_latest_chart delivered as an iterator.
+
+        Either way the chart is read through the chart cache like get_latest_chart: fresh and stale
+        snapshots are replayed, a streamed scrape is stored only once it has completed, and a scrape
+        that fails before its first song falls back to the expired snapshot (see ChartCache.stream).
+        A scrape that fails midway raises after the songs it already yielded.
+
+        Concurrent streams of the same chart in this process follow one scrape, which starts right away
+        on its own thread (see SingleFlight.stream).
+
+        :param bypass_cache: Scrape even when the chart cache holds a fresh snapshot (default False).
+        :return: An iterator of Song objects in chart order.
+        """
+        songs = _latest_chart_flight.stream((self.chart_type, bypass_cache),
+                                            lambda: self._iter_latest_chart(bypass_cache))
+        return songs if self.progress_callback is None else self._report_rows(songs)
+
+    def _report_rows(self, songs: Iterator[Song]) -> Iterator[Song]:
+        """Pass the songs through, reporting the rows received so far and the total once the stream ends."""
+        rows = 0
+        for song in songs:
+            rows += 1
+            self._report(stage="scraping", rows=rows)
+            yield song
+        self._report(stage="scraped", rows=rows)
+
+    def _report(self, **event) -> None:
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event)
+        except Exception as e:
+            # Progress is informational; a failing callback must not break the scrape
+            self.logger.warning(f"Progress callback failed: {str(e)}")
+
+    def _iter_latest_chart(self, bypass_cache: bool) -> Iterator[Song]:
+        if self.engine == "http":
+            # The page is parsed in one go, so reading it through get keeps the ETag/Last-Modified
+            # revalidation and stale fallbacks of the cache
+            yield from self._get_latest_chart(bypass_cache).songs
+            return
+
+        self.logger.info(f"Streaming the most recent chart from {self.base_url}")
+        if self.chart_cache is None:
+            yield from self._iter_with_browser(self.base_url)
+            return
+
+        if bypass_cache:
+            self.chart_cache.record_bypass()
+            songs = []
+            for song in self._iter_with_browser(self.base_url):
+                songs.append(song)
+                yield song
+            if songs:
+                self.chart_cache.put(self.chart_type, Songs(songs))
+            return
+
+        yield from self.chart_cache.stream(self.chart_type, self.cache_ttl, self._refresh_snapshot,
+                                           lambda: self._iter_with_browser(self.base_url))
+
+    def _iter_with_browser(self, url: str) -> Iterator[Song]:
+        """
+        Stream the chart with Playwright. The page is driven on a producer thread (or the pool's
+        worker) that puts row batches on a queue; this generator turns them into songs.
+
+        :raises: Whatever the scrape raised, after the songs extracted before it.
+        """
+        batches = queue.Queue()
+
+        def produce():
+            try:
+                if self.browser_pool is not None:
+                    self.browser_pool.run(lambda page: self._stream_page(page, url, batches.put))
+                else:
+                    with sync_playwright() as p:
+                        browser = p.chromium.launch(headless=self.headless)
+                        self.logger.info("Browser launched")
+
+                        page = browser.new_page()
+                        self._stream_page(page, url, batches.put)
+                        browser.close()
+            except Exception as e:
+                self.logger.error(f"An error occurred while scraping Billboard chart: {e}")
+                batches.put(e)
+            finally:
+                batches.put(_END_OF_CHART)
+
+        threading.Thread(target=produce, name=f"scraper-stream-{self.chart_type}", daemon=True).start()
+
+        count = 0
+        while True:
+            rows = batches.get()
+            if rows is _END_OF_CHART:
+                break
+            if isinstance(rows, Exception):
+                # Ending the stream quietly would pass a partial chart off as complete
+                raise rows
+            for song in rows_to_songs(rows):
+                count += 1
+                self.logger.info(f"Extracted #{count}: {song.title} by {song.artist}")
+                yield song
+        self.logger.info(f"Successfully scraped {count} songs from the chart")
+
+    def get_chart_for_date(self, chart_date: date) -> Songs:
+        """
+        Get the chart for a past week.
+
+        Billboard answers unknown weeks by redirecting to another chart or to the latest one, so a page
+        whose final URL does not name the requested week is discarded.
+
+        :param chart_date: Any day of the wanted chart week.
+        :return: A Songs object containing a list of Song objects (empty when another week was served).
+        :raises ValueError: If the chart has no dated URL configured.
+        """
+        date_url = self.config.get('date_url')
+        if not date_url:
+            raise ValueError(f"Chart type '{self.chart_type}' does not support dated charts.")
+
+        week = chart_week(chart_date).isoformat()
+        url = date_url.format(date=week)
+        self.logger.info(f"Fetching the chart for the week of {week} from {url}")
+        self.last_page_url = None
+        songs = self._scrape_chart(url)
+        if songs.songs and self.last_page_url and week not in self.last_page_url:
+            self.logger.warning(f"Requested the chart for the week of {week} but {self.last_page_url} "
+                                f"was served, discarding it")
+            songs = Songs([])
+        self._report(stage="scraped", rows=len(songs.songs))
+        return songs
+
+    def _refresh_snapshot(self, snapshot):
+        """
+        Refresh callback for the chart cache.
+
+        The HTTP engine revalidates with the snapshot's ETag/Last-Modified; otherwise the chart is
+        scraped again and the cache compares content hashes.
+
+        :param snapshot: The cached ChartSnapshot, or None.
+        :return: NOT_MODIFIED, or a (songs, etag, last_modified) tuple.
+        """
+        if self.engine == "http":
+            try:
+                result = self.http_fetcher.fetch_conditional(
+                    self.base_url,
+                    self.tags,
+                    etag=snapshot.etag if snapshot else None,
+                    last_modified=snapshot.last_modified if snapshot else None
+                )
+                if result.not_modified:
+                    return NOT_MODIFIED
+                if result.rows:
+                    return Songs(rows_to_songs(result.rows)), result.etag, result.last_modified
+                self.logger.warning("HTTP engine found no chart rows, falling back to Playwright")
+            except Exception as e:
+                self.logger.warning(f"HTTP engine failed for {self.base_url}: {e}")
+
+        return self._scrape_with_browser(self.base_url), None, None
 
     def display_songs(self, songs: Songs) -> None:
         """
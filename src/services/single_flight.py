@@ -0,0 +1,163 @@
+import logging
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+_groups: Dict[str, "SingleFlight"] = {}
+_groups_lock = threading.Lock()
+
+def get_single_flight(name: str) -> "SingleFlight":
+    """
+    Return the process-wide SingleFlight group with this name, creating it on first use.
+    """
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+def single_flight_metrics() -> dict:
+    """
+    Return the coalescing counters of every SingleFlight group, by name.
+    """
+    with _groups_lock:
+        groups = dict(_groups)
+    return {name: group.metrics() for name, group in groups.items()}
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class _Stream:
+    def __init__(self):
+        self.items = []
+        self.finished = False
+        self.error = None
+        self.condition = threading.Condition()
+
+class SingleFlight:
+    def __init__(self, name: str):
+        """
+        Coalesce concurrent identical work within one process.
+
+        While a call for a key is in flight, later callers with the same key wait for it and share
+        its result (or its exception) instead of running the work again. Once it completes, the next
+        caller starts a new call, so nothing is cached beyond the in-flight window.
+
+        :param name: Name the group's counters are reported under.
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._streams: Dict[Hashable, _Stream] = {}
+        self._metrics = {"calls": 0, "executions": 0, "coalesced": 0, "failures": 0}
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[SingleFlight] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run fn for key, or wait for the call already running for key and return its result.
+
+        :raises: Whatever fn raised, in the caller that ran it and in every caller that waited on it.
+        """
+        with self._lock:
+            self._metrics["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._metrics["executions"] += 1
+            else:
+                self._metrics["coalesced"] += 1
+
+        if not leader:
+            self.logger.info(f"Joining the in-flight {self.name} call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._metrics["failures"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stream(self, key: Hashable, fn: Callable[[], Iterable[T]]) -> Iterator[T]:
+        """
+        Iterate fn() for key, or follow the stream already running for key.
+
+        The source is drained on its own thread, which starts immediately. Every caller gets every
+        item from the start, in order, as soon as it is produced. Followers that join late first
+        replay the items produced so far. An exception from the source is raised in every caller after
+        the items produced before it.
+        """
+        with self._lock:
+            self._metrics["calls"] += 1
+            flight = self._streams.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._streams[key] = _Stream()
+                self._metrics["executions"] += 1
+            else:
+                self._metrics["coalesced"] += 1
+
+        if leader:
+            threading.Thread(target=self._produce, args=(key, flight, fn),
+                             name=f"single-flight-{self.name}", daemon=True).start()
+        else:
+            self.logger.info(f"Following the in-flight {self.name} stream for {key}")
+        return self._follow(flight)
+
+    def _produce(self, key: Hashable, flight: _Stream, fn: Callable[[], Iterable[T]]) -> None:
+        try:
+            for item in fn():
+                with flight.condition:
+                    flight.items.append(item)
+                    flight.condition.notify_all()
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._metrics["failures"] += 1
+        finally:
+            with self._lock:
+                del self._streams[key]
+            with flight.condition:
+                flight.finished = True
+                flight.condition.notify_all()
+
+    def _follow(self, flight: _Stream) -> Iterator[T]:
+        position = 0
+        while True:
+            with flight.condition:
+                flight.condition.wait_for(lambda: position < len(flight.items) or flight.finished)
+                items = flight.items[position:]
+                finished = flight.finished
+            position += len(items)
+            yield from items
+            if finished:
+                if flight.error is not None:
+                    raise flight.error
+                return
+
+    def metrics(self) -> dict:
+        """Return calls, executions, coalesced calls, failures, the share of calls coalesced and calls in flight."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["in_flight"] = len(self._calls) + len(self._streams)
+        metrics["coalesce_rate"] = metrics["coalesced"] / metrics["calls"] if metrics["calls"] else 0.0
+        return metrics
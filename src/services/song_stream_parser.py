@@ -0,0 +1,79 @@
+import json
+from typing import List, Optional
+
+class SongStreamParser:
+    def __init__(self):
+        """
+        Incremental parser for a JSON array of {"title", "artist"} objects that arrives in fragments,
+        e.g. the tokens of a streamed completion.
+
+        Text before the opening '[' (prose, a Markdown fence) is skipped. Each object is returned by
+        feed() as soon as its closing brace arrives; only the object being read is buffered. Objects
+        that are not valid JSON or lack a title or artist are skipped and counted in `skipped`.
+        """
+        self.skipped = 0
+        self._object: List[str] = []
+        self._in_array = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def finished(self) -> bool:
+        """Whether the array's closing ']' has been read."""
+        return self._finished
+
+    def feed(self, text: str) -> List[dict]:
+        """
+        Consume the next fragment.
+
+        :return: The songs completed by this fragment, as {"title", "artist"} dicts, in order.
+        """
+        songs = []
+        for char in text:
+            if self._finished:
+                break
+            if not self._in_array:
+                self._in_array = char == '['
+                continue
+            if self._depth == 0:
+                # Between objects: only an opening brace or the end of the array matters
+                if char == '{':
+                    self._depth = 1
+                    self._object = [char]
+                elif char == ']':
+                    self._finished = True
+                continue
+
+            self._object.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    song = self._parse_song("".join(self._object))
+                    self._object = []
+                    if song is not None:
+                        songs.append(song)
+        return songs
+
+    def _parse_song(self, text: str) -> Optional[dict]:
+        try:
+            song = json.loads(text)
+        except json.JSONDecodeError:
+            self.skipped += 1
+            return None
+        if not isinstance(song, dict) or 'title' not in song or 'artist' not in song:
+            self.skipped += 1
+            return None
+        return {'title': song['title'], 'artist': song['artist']}
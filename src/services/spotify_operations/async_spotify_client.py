@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import threading
+from typing import Callable, List, Optional
+import httpx
+from spotipy.exceptions import SpotifyException
+
+SPOTIFY_API_BASE = "https://api.spotify.com/v1/"
+
+def _spotify_id(value: str) -> str:
+    """Return the bare ID of a Spotify ID or URI (spotify:playlist:<id>)."""
+    return value.split(":")[-1]
+
+class AsyncSpotifyClient:
+    def __init__(self, token_provider: Callable[[], str], base_url: str = SPOTIFY_API_BASE,
+                 max_connections: int = 20, http2: bool = True, http1: bool = True, timeout: float = 10.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Asyncio client for the Spotify Web API endpoints ChartSync uses.
+
+        Method names, arguments and return values mirror spotipy's, and HTTP errors are raised as
+        spotipy's SpotifyException (with the response headers, so 429 Retry-After handling works
+        unchanged). Requests share one pooled httpx connection pool and negotiate HTTP/2 over TLS,
+        which multiplexes concurrent requests over a single connection.
+
+        An instance is bound to the event loop it is first used on; SpotifyAuth hands out one per loop.
+
+        :param token_provider: Returns a valid access token; called in a worker thread before every request.
+        :param base_url: API root (default the public Spotify API).
+        :param max_connections: Size of the connection pool (default 20).
+        :param http2: Negotiate HTTP/2 with servers that support it (default True).
+        :param http1: Allow HTTP/1.1 (default True); disable it to speak HTTP/2 to plain-HTTP servers.
+        :param timeout: Per-request timeout in seconds (default 10).
+        :param transport: Custom httpx transport, e.g. for tests, optional.
+        """
+        self.token_provider = token_provider
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            http2=http2,
+            http1=http1,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+
+    async def _request(self, method: str, path: str, **kwargs) -> Optional[dict]:
+        headers = kwargs.pop("headers", {})
+        # A token refresh blocks on the OAuth endpoint, so it must not run on the event loop thread
+        token = await asyncio.to_thread(self.token_provider)
+        headers["Authorization"] = f"Bearer {token}"
+        response = await self._client.request(method, path, headers=headers, **kwargs)
+        if response.status_code >= 400:
+            try:
+                message = response.json()["error"]["message"]
+            except Exception:
+                message = response.text or "error"
+            raise SpotifyException(response.status_code, -1, f"{response.request.url}:\n {message}",
+                                   headers=response.headers)
+        if not response.content:
+            return None
+        return response.json()
+
+    async def search(self, q: str, limit: int = 10, offset: int = 0, type: str = "track",
+                     market: Optional[str] = None) -> dict:
+        params = {"q": q, "limit": limit, "offset": offset, "type": type}
+        if market:
+            params["market"] = market
+        return await self._request("GET", "search", params=params)
+
+    async def current_user(self) -> dict:
+        return await self._request("GET", "me")
+
+    async def user_playlist_create(self, user: str, name: str, public: bool = True, collaborative: bool = False,
+                                   description: str = "") -> dict:
+        return await self._request("POST", f"users/{user}/playlists", json={
+            "name": name,
+            "public": public,
+            "collaborative": collaborative,
+            "description": description
+        })
+
+    async def playlist_add_items(self, playlist_id: str, items: List[str], position: Optional[int] = None) -> dict:
+        """Add track URIs to a playlist (at most 100 per call, as with the Web API)."""
+        payload = {"uris": items}
+        if position is not None:
+            payload["position"] = position
+        return await self._request("POST", f"playlists/{_spotify_id(playlist_id)}/tracks", json=payload)
+
+    async def playlist_replace_items(self, playlist_id: str, items: List[str]) -> dict:
+        """Replace every item of a playlist with up to 100 track URIs."""
+        return await self._request("PUT", f"playlists/{_spotify_id(playlist_id)}/tracks", json={"uris": items})
+
+    async def playlist_remove_all_occurrences_of_items(self, playlist_id: str, items: List[str],
+                                                       snapshot_id: Optional[str] = None) -> dict:
+        """Remove every occurrence of up to 100 track URIs from a playlist."""
+        payload = {"tracks": [{"uri": uri} for uri in items]}
+        if snapshot_id:
+            payload["snapshot_id"] = snapshot_id
+        return await self._request("DELETE", f"playlists/{_spotify_id(playlist_id)}/tracks", json=payload)
+
+    async def playlist_reorder_items(self, playlist_id: str, range_start: int, insert_before: int,
+                                     range_length: int = 1, snapshot_id: Optional[str] = None) -> dict:
+        """Move range_length items starting at range_start to before the item at insert_before."""
+        payload = {"range_start": range_start, "insert_before": insert_before, "range_length": range_length}
+        if snapshot_id:
+            payload["snapshot_id"] = snapshot_id
+        return await self._request("PUT", f"playlists/{_spotify_id(playlist_id)}/tracks", json=payload)
+
+    async def playlist_items(self, playlist_id: str, fields: Optional[str] = None, limit: int = 100,
+                             offset: int = 0, market: Optional[str] = None, additional_types=("track",)) -> dict:
+        params = {"limit": limit, "offset": offset, "additional_types": ",".join(additional_types)}
+        if fields:
+            params["fields"] = fields
+        if market:
+            params["market"] = market
+        return await self._request("GET", f"playlists/{_spotify_id(playlist_id)}/tracks", params=params)
+
+    async def playlist(self, playlist_id: str, fields: Optional[str] = None, market: Optional[str] = None,
+                       additional_types=("track",)) -> dict:
+        params = {"additional_types": ",".join(additional_types)}
+        if fields:
+            params["fields"] = fields
+        if market:
+            params["market"] = market
+        return await self._request("GET", f"playlists/{_spotify_id(playlist_id)}", params=params)
+
+    async def playlist_upload_cover_image(self, playlist_id: str, image_b64: str) -> None:
+        """Replace a playlist's cover with a Base64-encoded JPEG."""
+        return await self._request("PUT", f"playlists/{_spotify_id(playlist_id)}/images",
+                                   content=image_b64, headers={"Content-Type": "image/jpeg"})
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self._client.aclose()
+
+class BlockingSpotifyClient:
+    def __init__(self, token_provider: Callable[[], str], **client_options):
+        """
+        Synchronous facade over AsyncSpotifyClient for sync call sites.
+
+        The async client runs on a private event loop in a background thread, so requests made
+        from many threads at once share its connection pool (and HTTP/2 streams) instead of each
+        holding its own connection. Method signatures match AsyncSpotifyClient and spotipy.
+
+        :param token_provider: Returns a valid access token; called before every request.
+        :param client_options: Passed on to AsyncSpotifyClient.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[BlockingSpotifyClient]: %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="spotify-client-loop", daemon=True)
+        self._thread.start()
+        self.client = AsyncSpotifyClient(token_provider, **client_options)
+        self.logger.info("Started the Spotify client event loop")
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def search(self, q: str, limit: int = 10, offset: int = 0, type: str = "track",
+               market: Optional[str] = None) -> dict:
+        return self._run(self.client.search(q, limit=limit, offset=offset, type=type, market=market))
+
+    def current_user(self) -> dict:
+        return self._run(self.client.current_user())
+
+    def user_playlist_create(self, user: str, name: str, public: bool = True, collaborative: bool = False,
+                             description: str = "") -> dict:
+        return self._run(self.client.user_playlist_create(user, name, public=public, collaborative=collaborative,
+                                                          description=description))
+
+    def playlist_add_items(self, playlist_id: str, items: List[str], position: Optional[int] = None) -> dict:
+        return self._run(self.client.playlist_add_items(playlist_id, items, position=position))
+
+    def playlist_replace_items(self, playlist_id: str, items: List[str]) -> dict:
+        return self._run(self.client.playlist_replace_items(playlist_id, items))
+
+    def playlist_remove_all_occurrences_of_items(self, playlist_id: str, items: List[str],
+                                                 snapshot_id: Optional[str] = None) -> dict:
+        return self._run(self.client.playlist_remove_all_occurrences_of_items(playlist_id, items,
+                                                                              snapshot_id=snapshot_id))
+
+    def playlist_reorder_items(self, playlist_id: str, range_start: int, insert_before: int,
+                               range_length: int = 1, snapshot_id: Optional[str] = None) -> dict:
+        return self._run(self.client.playlist_reorder_items(playlist_id, range_start, insert_before,
+                                                            range_length=range_length, snapshot_id=snapshot_id))
+
+    def playlist_items(self, playlist_id: str, fields: Optional[str] = None, limit: int = 100, offset: int = 0,
+                       market: Optional[str] = None, additional_types=("track",)) -> dict:
+        return self._run(self.client.playlist_items(playlist_id, fields=fields, limit=limit, offset=offset,
+                                                    market=market, additional_types=additional_types))
+
+    def playlist(self, playlist_id: str, fields: Optional[str] = None, market: Optional[str] = None,
+                 additional_types=("track",)) -> dict:
+        return self._run(self.client.playlist(playlist_id, fields=fields, market=market,
+                                              additional_types=additional_types))
+
+    def playlist_upload_cover_image(self, playlist_id: str, image_b64: str) -> None:
+        return self._run(self.client.playlist_upload_cover_image(playlist_id, image_b64))
+
+    def close(self) -> None:
+        """Close the connection pool and stop the event loop thread."""
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self.logger.info("Stopped the Spotify client event loop")
@@ -0,0 +1,196 @@
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set
+
+# Kinds of PlaylistEdit, each one Web API request
+REMOVE = "remove"
+REORDER = "reorder"
+ADD = "add"
+REPLACE = "replace"
+
+# Strategies a SyncPlan can use
+DIFF = "diff"
+FULL_REPLACE = "replace"
+
+# The Web API accepts at most this many URIs per add, remove or replace request
+PLAYLIST_EDIT_LIMIT = 100
+# A diff needing more requests than this (and than a rewrite) is replaced by a rewrite
+DEFAULT_MAX_DIFF_CALLS = 50
+
+class PlaylistEdit:
+    def __init__(self, kind: str, uris: Optional[List[str]] = None, position: Optional[int] = None,
+                 range_start: Optional[int] = None, range_length: int = 1, insert_before: Optional[int] = None):
+        """
+        One playlist write request.
+
+        :param kind: REMOVE, REORDER, ADD or REPLACE.
+        :param uris: Track URIs removed, added or written (not used by REORDER).
+        :param position: Index ADD inserts at; None appends.
+        :param range_start: Index of the first item REORDER moves.
+        :param range_length: Number of items REORDER moves.
+        :param insert_before: Index (before the move) of the item REORDER puts the range in front of.
+        """
+        self.kind = kind
+        self.uris = uris or []
+        self.position = position
+        self.range_start = range_start
+        self.range_length = range_length
+        self.insert_before = insert_before
+
+    def __repr__(self) -> str:
+        if self.kind == REORDER:
+            return f"PlaylistEdit({self.kind}, {self.range_start}+{self.range_length} -> {self.insert_before})"
+        return f"PlaylistEdit({self.kind}, {len(self.uris)} uris, position={self.position})"
+
+class SyncPlan:
+    def __init__(self, strategy: str, edits: List[PlaylistEdit], added: int = 0, removed: int = 0, moved: int = 0):
+        """
+        The write requests that turn a playlist's current tracks into the target tracks.
+
+        :param strategy: DIFF for targeted edits, FULL_REPLACE to rewrite the playlist.
+        :param edits: The requests, in the order they must be sent.
+        :param added: Tracks added.
+        :param removed: Tracks removed.
+        :param moved: Tracks kept but moved.
+        """
+        self.strategy = strategy
+        self.edits = edits
+        self.added = added
+        self.removed = removed
+        self.moved = moved
+
+    @property
+    def api_calls(self) -> int:
+        return len(self.edits)
+
+    def to_dict(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "added": self.added,
+            "removed": self.removed,
+            "moved": self.moved,
+            "api_calls": self.api_calls
+        }
+
+def plan_playlist_sync(current: Sequence[Optional[str]], target: Sequence[str],
+                       max_diff_calls: int = DEFAULT_MAX_DIFF_CALLS) -> SyncPlan:
+    """
+    Plan the requests that make a playlist's tracks equal target, in order.
+
+    The diff removes tracks that left the chart, keeps the longest run of remaining tracks that is
+    already in target order where it is, moves the other remaining tracks and inserts the new ones.
+    Contiguous moves and inserts are batched into single requests. Tracks the diff does not touch
+    keep their "date added", so it is used unless it needs more than max_diff_calls requests and
+    more than rewriting the playlist with replace and append requests would.
+
+    Remove requests drop every occurrence of a URI, so a track duplicated in the playlist is removed
+    and re-added. A playlist with unavailable (None) tracks is always rewritten.
+
+    :param current: The playlist's track URIs, in playlist order.
+    :param target: The track URIs the playlist should hold; later duplicates are ignored.
+    :param max_diff_calls: Request budget for the diff (default DEFAULT_MAX_DIFF_CALLS).
+    :return: The SyncPlan.
+    """
+    target = list(dict.fromkeys(target))
+    replace = _replace_plan(current, target)
+    if any(uri is None for uri in current):
+        return replace
+    diff = _diff_plan(current, target)
+    if diff.api_calls > max(max_diff_calls, replace.api_calls):
+        return replace
+    return diff
+
+def _replace_plan(current: Sequence[Optional[str]], target: List[str]) -> SyncPlan:
+    edits = [PlaylistEdit(REPLACE, uris=target[:PLAYLIST_EDIT_LIMIT])]
+    edits += [PlaylistEdit(ADD, uris=target[i:i + PLAYLIST_EDIT_LIMIT])
+              for i in range(PLAYLIST_EDIT_LIMIT, len(target), PLAYLIST_EDIT_LIMIT)]
+    kept = set(current) & set(target)
+    return SyncPlan(FULL_REPLACE, edits, added=len(set(target) - kept), removed=len(set(current) - kept))
+
+def _diff_plan(current: Sequence[str], target: List[str]) -> SyncPlan:
+    target_index = {uri: index for index, uri in enumerate(target)}
+    counts = Counter(current)
+    removed = [uri for uri in counts if uri not in target_index or counts[uri] > 1]
+    removed_set = set(removed)
+    edits = [PlaylistEdit(REMOVE, uris=removed[i:i + PLAYLIST_EDIT_LIMIT])
+             for i in range(0, len(removed), PLAYLIST_EDIT_LIMIT)]
+
+    # What the playlist holds after the removals
+    state = [uri for uri in current if uri not in removed_set]
+    in_state = set(state)
+    anchors = _longest_increasing_run(state, target_index)
+
+    # The anchor each target track must end up in front of (None: the end of the playlist)
+    next_anchor: List[Optional[str]] = [None] * len(target)
+    following = None
+    for index in range(len(target) - 1, -1, -1):
+        next_anchor[index] = following
+        if target[index] in anchors:
+            following = target[index]
+
+    added = moved = 0
+    index = 0
+    while index < len(target):
+        uri = target[index]
+        if uri in anchors:
+            index += 1
+            continue
+        anchor = next_anchor[index]
+        if uri in in_state:
+            # Move a run of tracks that sits together in the playlist in one request
+            start = state.index(uri)
+            length = 1
+            while (index + length < len(target) and start + length < len(state)
+                   and target[index + length] not in anchors and state[start + length] == target[index + length]):
+                length += 1
+            insert_before = state.index(anchor) if anchor is not None else len(state)
+            if insert_before != start + length:
+                edits.append(PlaylistEdit(REORDER, range_start=start, range_length=length,
+                                          insert_before=insert_before))
+                block = state[start:start + length]
+                del state[start:start + length]
+                at = insert_before - length if insert_before > start else insert_before
+                state[at:at] = block
+                moved += length
+        else:
+            # Insert a run of new tracks in one request
+            length = 1
+            while (index + length < len(target) and length < PLAYLIST_EDIT_LIMIT
+                   and target[index + length] not in in_state):
+                length += 1
+            position = state.index(anchor) if anchor is not None else len(state)
+            block = target[index:index + length]
+            edits.append(PlaylistEdit(ADD, uris=block, position=position))
+            state[position:position] = block
+            added += length
+        index += length
+
+    return SyncPlan(DIFF, edits, added=added, removed=len(removed_set - set(target)), moved=moved)
+
+def _longest_increasing_run(state: List[str], target_index: Dict[str, int]) -> Set[str]:
+    """
+    The largest set of tracks in state whose playlist order already matches their target order
+    (a longest increasing subsequence of their target indexes), found in O(n log n).
+    """
+    positions = [target_index[uri] for uri in state]
+    tails: List[int] = []  # tails[k]: index in state ending the best subsequence of length k + 1
+    previous: List[Optional[int]] = [None] * len(positions)
+    for i, value in enumerate(positions):
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if positions[tails[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        previous[i] = tails[low - 1] if low else None
+        if low == len(tails):
+            tails.append(i)
+        else:
+            tails[low] = i
+
+    run = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        run.add(state[i])
+        i = previous[i]
+    return run
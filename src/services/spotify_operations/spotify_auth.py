@@ -1,10 +1,23 @@
+import asyncio
+import threading
+import weakref
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 from config import Config
+from services.spotify_operations.async_spotify_client import AsyncSpotifyClient, BlockingSpotifyClient
+from services.spotify_operations.token_cache import LockedFileCacheHandler
 import logging
+from typing import Optional
+import requests
 
 class SpotifyAuth:
-    def __init__(self):
+    def __init__(self, requests_session: Optional[requests.Session] = None, requests_timeout: float = 5,
+                 client_options: Optional[dict] = None):
+        """
+        :param requests_session: requests session for spotipy and token requests; each gets its own if omitted
+        :param requests_timeout: Timeout in seconds for spotipy and token requests (default 5)
+        :param client_options: Options passed to the async and blocking clients, e.g. max_connections, timeout
+        """
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         handler = logging.StreamHandler()
@@ -14,6 +27,15 @@ class SpotifyAuth:
 
         self.config = Config()
         self.sp = None
+        self.requests_session = requests_session
+        self.requests_timeout = requests_timeout
+        self.client_options = client_options or {}
+        # In-memory token shared with spotipy, backed by a file all worker processes use
+        self.token_cache = LockedFileCacheHandler(self.config.get_spotify_token_cache_path())
+        self._refresh_lock = threading.Lock()
+        self._clients_lock = threading.Lock()
+        self._async_clients = weakref.WeakKeyDictionary()
+        self._blocking_client = None
         self.authenticate()
 
     def authenticate(self):
@@ -27,8 +49,13 @@ class SpotifyAuth:
                     client_id=self.config.get_client_id(),
                     client_secret=self.config.get_client_secret(),
                     redirect_uri=self.config.get_redirect_uri(),
-                    scope='playlist-modify-public user-read-private user-read-email'
-                )
+                    scope='playlist-modify-public user-read-private user-read-email',
+                    cache_handler=self.token_cache,
+                    requests_session=self.requests_session or True,
+                    requests_timeout=self.requests_timeout
+                ),
+                requests_session=self.requests_session or True,
+                requests_timeout=self.requests_timeout
             )
             self.logger.info("Successfully authenticated with Spotify")
         except Exception as e:
@@ -46,15 +73,77 @@ class SpotifyAuth:
 
     def refresh_token_if_expired(self):
         """
-        Check if the current token is expired and refresh if necessary
+        Make sure the token is valid, refreshing it shortly before it expires.
+        While the in-memory token is fresh this is a timestamp comparison, with no I/O and no logging.
         """
         try:
-            if self.sp.auth_manager.is_token_expired(self.sp.auth_manager.get_cached_token()):
-                self.logger.info("Token expired. Refreshing...")
-                self.sp.auth_manager.refresh_access_token(self.sp.auth_manager.get_cached_token()['refresh_token'])
-                self.logger.info("Token refreshed successfully")
-            else:
-                self.logger.info("Token is still valid")
+            self.get_access_token()
         except Exception as e:
             self.logger.error(f"Error checking/refreshing token: {str(e)}")
-            raise
\ No newline at end of file
+            raise
+
+    def get_access_token(self) -> str:
+        """
+        Return a valid access token from memory, refreshing it first when it is about to expire
+        """
+        token_info = self.token_cache.get_cached_token()
+        if self.token_cache.is_fresh(token_info):
+            return token_info['access_token']
+        return self._refresh_access_token()
+
+    def _refresh_access_token(self) -> str:
+        """
+        Refresh an expiring token exactly once: threads queue on a lock, processes on the cache file's
+        lock, and each re-checks the token after acquiring it in case it was refreshed meanwhile.
+        """
+        with self._refresh_lock:
+            token_info = self.token_cache.get_cached_token()
+            if self.token_cache.is_fresh(token_info):
+                return token_info['access_token']
+
+            with self.token_cache.refresh_lock():
+                token_info = self.token_cache.reload()
+                if self.token_cache.is_fresh(token_info):
+                    self.logger.info("Using the token refreshed by another process")
+                    return token_info['access_token']
+
+                if token_info is None:
+                    # Nothing cached yet: run the OAuth authorization flow
+                    return self.sp.auth_manager.get_access_token(as_dict=False)
+
+                self.logger.info("Token expires soon. Refreshing...")
+                token_info = self.sp.auth_manager.refresh_access_token(token_info['refresh_token'])
+                self.logger.info("Token refreshed successfully")
+                return token_info['access_token']
+
+    def get_async_spotify_client(self) -> AsyncSpotifyClient:
+        """
+        Return the AsyncSpotifyClient for the running event loop, creating it on first use.
+        Must be called from a coroutine; each event loop gets its own pooled client.
+        """
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._async_clients.get(loop)
+            if client is None:
+                client = AsyncSpotifyClient(self.get_access_token, **self.client_options)
+                self._async_clients[loop] = client
+                self.logger.info("Created async Spotify client")
+            return client
+
+    def get_blocking_spotify_client(self) -> BlockingSpotifyClient:
+        """
+        Return the shared BlockingSpotifyClient, the sync facade over the async client
+        """
+        with self._clients_lock:
+            if self._blocking_client is None:
+                self._blocking_client = BlockingSpotifyClient(self.get_access_token, **self.client_options)
+            return self._blocking_client
+
+    def close(self):
+        """
+        Close the shared blocking client, if one was started
+        """
+        with self._clients_lock:
+            client, self._blocking_client = self._blocking_client, None
+        if client is not None:
+            client.close()
@@ -1,10 +1,48 @@
+from services.spotify_operations.playlist_sync import (
+    PlaylistEdit, plan_playlist_sync, REMOVE, REORDER, ADD, REPLACE, DEFAULT_MAX_DIFF_CALLS
+)
 from services.spotify_operations.spotify_auth import SpotifyAuth
+from services.single_flight import get_single_flight
+from services.spotify_operations.track_cache import TrackCache, MISS, normalize_track_key
+from services.spotify_operations.track_index import TrackIndex
+from services.spotify_operations.track_matcher import TrackMatcher
+from services.spotify_operations.track_resolver import TokenBucket, retry_after_seconds
+from spotipy.exceptions import SpotifyException
 import logging
 import base64
-from typing import Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# The Web API accepts at most this many items per playlist add request
+PLAYLIST_ADD_LIMIT = 100
+# Retries per chunk, with exponential backoff starting at ADD_TRACKS_BACKOFF seconds (or the 429's Retry-After)
+ADD_TRACKS_MAX_RETRIES = 4
+ADD_TRACKS_BACKOFF = 0.5
+# Tracks read per request when listing a playlist's contents
+PLAYLIST_PAGE_SIZE = 100
+# Playlist pages fetched at once by get_playlist_details once the track total is known
+PLAYLIST_FETCH_CONCURRENCY = 4
+# Only the item fields get_playlist_details uses (uri and popularity feed the track index)
+PLAYLIST_ITEM_FIELDS = 'items(added_at,added_by(id),track(uri,name,artists(name),popularity))'
+
+# Concurrent searches for the same song in this process (e.g. two builds of one chart) share one lookup
+_search_flight = get_single_flight("track_search")
 
 class SpotifyPlaylistMaker:
-    def __init__(self):
+    def __init__(self, track_cache: Optional[TrackCache] = None, rate_limiter: Optional[TokenBucket] = None,
+                 use_async_client: bool = False, auth: Optional[SpotifyAuth] = None,
+                 track_index: Optional[TrackIndex] = None):
+        """
+        Args:
+            track_cache: TrackCache consulted before every Spotify track search (optional)
+            rate_limiter: Shared TokenBucket that track searches take a token from before calling Spotify (optional)
+            use_async_client: Send searches, playlist creation, track adds, playlist reads and cover uploads
+                through the pooled asyncio client instead of spotipy (default False)
+            auth: Shared SpotifyAuth, e.g. from the ClientRegistry; a new one is created if omitted
+            track_index: Local TrackIndex searched before Spotify and filled from search results and
+                playlist reads (optional)
+        """
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         handler = logging.StreamHandler()
@@ -12,8 +50,14 @@ class SpotifyPlaylistMaker:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
 
-        self.auth = SpotifyAuth()
+        self.auth = auth or SpotifyAuth()
         self.sp = self.auth.get_spotify_client()
+        # Client for the hot-path calls; both expose the same spotipy-style methods
+        self.api = self.auth.get_blocking_spotify_client() if use_async_client else self.sp
+        self.track_cache = track_cache
+        self.rate_limiter = rate_limiter
+        self.track_index = track_index
+        self.matcher = TrackMatcher(self._search_tracks)
 
     def create_playlist(
         self, 
@@ -22,7 +66,7 @@ class SpotifyPlaylistMaker:
         description: str,
         public: bool = True,
         cover_image_path: Optional[str] = None
-    ) -> str:
+    ) -> Tuple[str, Optional[str]]:
         """
         Create a Spotify playlist with customization options.
         
@@ -34,13 +78,14 @@ class SpotifyPlaylistMaker:
             cover_image_path: Path to JPEG image file for playlist cover (optional)
             
         Returns:
-            str: Playlist ID
+            tuple: The playlist ID and its snapshot_id, to pass on to add_tracks_to_playlist
+                (None when a cover was uploaded, which may change it)
         """
         try:
             self.auth.refresh_token_if_expired()
             
             # Create the playlist
-            playlist = self.sp.user_playlist_create(
+            playlist = self.api.user_playlist_create(
                 user=user_id,
                 name=playlist_name,
                 public=public,
@@ -48,48 +93,243 @@ class SpotifyPlaylistMaker:
             )
             
             playlist_id = playlist['id']
+            snapshot_id = playlist.get('snapshot_id')
             self.logger.info(f"Created playlist '{playlist_name}' with ID {playlist_id}")
 
             # Upload cover image if provided
             if cover_image_path:
                 self._upload_playlist_cover(playlist_id, cover_image_path)
+                snapshot_id = None
                 
-            return playlist_id
+            return playlist_id, snapshot_id
             
         except Exception as e:
             self.logger.error(f"Failed to create playlist '{playlist_name}': {str(e)}")
             raise
 
-    def add_tracks_to_playlist(self, playlist_id: str, track_uris: list):
+    def add_tracks_to_playlist(self, playlist_id: str, track_uris: list, snapshot_id: Optional[str] = None,
+                               progress_callback: Optional[Callable[[dict], None]] = None) -> Optional[str]:
         """
         Add a list of tracks Spotify URIs to the playlist.
+
+        The URIs are sent in order, in chunks of PLAYLIST_ADD_LIMIT, back to back. Chunks are not sent
+        concurrently: Spotify does not guarantee the order in which parallel adds are applied.
+        A chunk that fails with a 429, a 5xx or a network error is retried with backoff. Before
+        retrying an ambiguous failure, the playlist's snapshot_id is compared with the one returned
+        by the previous chunk, so a chunk that was applied is not added twice. Without a snapshot_id
+        (e.g. from create_playlist) it is read once before the first chunk.
+
+        Args:
+            playlist_id: Spotify playlist ID
+            track_uris: Track URIs in the order they should appear
+            snapshot_id: The playlist's current snapshot_id, if known (optional)
+            progress_callback: Called after each chunk with {"stage": "added_chunk", "chunk": k,
+                "chunks": n, "tracks": tracks added so far} (optional)
+
+        Returns:
+            str: The playlist's snapshot_id after the last chunk
         """
         try:
             self.auth.refresh_token_if_expired()
-            self.sp.playlist_add_items(playlist_id, track_uris)
-            self.logger.info(f"Added {len(track_uris)} tracks to the playlist with ID {playlist_id}.")
+            chunks = [track_uris[i:i + PLAYLIST_ADD_LIMIT] for i in range(0, len(track_uris), PLAYLIST_ADD_LIMIT)]
+            if snapshot_id is None and chunks:
+                # The baseline that tells an applied chunk from a lost one
+                snapshot_id = self.api.playlist(playlist_id, fields='snapshot_id')['snapshot_id']
+            added = 0
+            for index, chunk in enumerate(chunks, start=1):
+                snapshot_id = self._add_chunk(playlist_id, chunk, snapshot_id)
+                added += len(chunk)
+                if progress_callback is not None:
+                    progress_callback({"stage": "added_chunk", "chunk": index, "chunks": len(chunks), "tracks": added})
+            self.logger.info(f"Added {len(track_uris)} tracks to the playlist with ID {playlist_id} "
+                             f"in {len(chunks)} requests.")
+            return snapshot_id
         except Exception as e:
             self.logger.error(f"Failed to add tracks to playlist {playlist_id}: {str(e)}")
             raise
 
+    def _add_chunk(self, playlist_id: str, chunk: List[str], snapshot_id: Optional[str]) -> Optional[str]:
+        """
+        Add one chunk of track URIs, retrying throttled and transient failures.
+
+        Returns:
+            str: The playlist's snapshot_id after the chunk was added
+        """
+        for attempt in range(ADD_TRACKS_MAX_RETRIES + 1):
+            try:
+                result = self.api.playlist_add_items(playlist_id, chunk)
+                return result.get('snapshot_id') if result else None
+            except SpotifyException as e:
+                if attempt == ADD_TRACKS_MAX_RETRIES or (e.http_status < 500 and e.http_status != 429):
+                    raise
+                if e.http_status == 429:
+                    # A throttled request was not applied
+                    delay = retry_after_seconds(e)
+                else:
+                    applied_snapshot = self._applied_snapshot(playlist_id, snapshot_id)
+                    if applied_snapshot:
+                        return applied_snapshot
+                    delay = ADD_TRACKS_BACKOFF * 2 ** attempt
+                error = e
+            except Exception as e:
+                if attempt == ADD_TRACKS_MAX_RETRIES:
+                    raise
+                applied_snapshot = self._applied_snapshot(playlist_id, snapshot_id)
+                if applied_snapshot:
+                    return applied_snapshot
+                delay = ADD_TRACKS_BACKOFF * 2 ** attempt
+                error = e
+
+            self.logger.warning(f"Adding {len(chunk)} tracks to {playlist_id} failed ({str(error)}), "
+                                f"retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+    def _applied_snapshot(self, playlist_id: str, snapshot_id: Optional[str]) -> Optional[str]:
+        """
+        Return the playlist's new snapshot_id if it changed since snapshot_id (meaning a request that
+        failed ambiguously was in fact applied), otherwise None.
+        """
+        if snapshot_id is None:
+            return None
+        try:
+            current = self.api.playlist(playlist_id, fields='snapshot_id')['snapshot_id']
+        except Exception as e:
+            self.logger.warning(f"Could not read the snapshot of playlist {playlist_id}: {str(e)}")
+            return None
+        if current != snapshot_id:
+            self.logger.info(f"Playlist {playlist_id} changed despite the error, not re-sending the chunk")
+            return current
+        return None
+
+    def get_playlist_track_uris(self, playlist_id: str) -> Tuple[List[Optional[str]], Optional[str]]:
+        """
+        Read a playlist's track URIs in playlist order, with only the fields needed for that.
+
+        Args:
+            playlist_id: Spotify playlist ID
+
+        Returns:
+            tuple: The URIs (None for unavailable tracks) and the playlist's snapshot_id
+        """
+        playlist = self.api.playlist(playlist_id, fields='snapshot_id,tracks(items(track(uri)),next)')
+        page = playlist['tracks']
+        uris = []
+        while True:
+            uris.extend(item['track']['uri'] if item.get('track') else None for item in page['items'])
+            if not page.get('next'):
+                return uris, playlist.get('snapshot_id')
+            page = self.api.playlist_items(playlist_id, fields='items(track(uri)),next',
+                                           limit=PLAYLIST_PAGE_SIZE, offset=len(uris))
+
+    def sync_playlist(self, playlist_id: str, track_uris: List[str],
+                      max_diff_calls: int = DEFAULT_MAX_DIFF_CALLS) -> dict:
+        """
+        Make an existing playlist hold exactly track_uris, in order, with as few writes as possible.
+
+        The playlist's current tracks are read, diffed against track_uris (see plan_playlist_sync),
+        and only the resulting removes, moves and inserts are sent, chained by snapshot_id.
+
+        Args:
+            playlist_id: Spotify playlist ID
+            track_uris: Track URIs in the order they should appear
+            max_diff_calls: Largest number of diff requests before the playlist is rewritten instead
+
+        Returns:
+            dict: The plan's strategy, added, removed and moved counts, api_calls (writes) and the final snapshot_id
+        """
+        try:
+            self.auth.refresh_token_if_expired()
+            current, snapshot_id = self.get_playlist_track_uris(playlist_id)
+            plan = plan_playlist_sync(current, track_uris, max_diff_calls=max_diff_calls)
+            for edit in plan.edits:
+                snapshot_id = self._apply_edit(playlist_id, edit, snapshot_id) or snapshot_id
+            self.logger.info(f"Synced playlist {playlist_id} by {plan.strategy}: {plan.added} added, "
+                             f"{plan.removed} removed, {plan.moved} moved in {plan.api_calls} requests")
+            return {**plan.to_dict(), "snapshot_id": snapshot_id}
+        except Exception as e:
+            self.logger.error(f"Failed to sync playlist {playlist_id}: {str(e)}")
+            raise
+
+    def _apply_edit(self, playlist_id: str, edit: PlaylistEdit, snapshot_id: Optional[str]) -> Optional[str]:
+        """
+        Send one planned edit, waiting out 429s (a throttled request is not applied).
+        Other errors are raised: moves and inserts are positional and not safe to resend blindly.
+
+        Returns:
+            str: The playlist's snapshot_id after the edit
+        """
+        for attempt in range(ADD_TRACKS_MAX_RETRIES + 1):
+            try:
+                if edit.kind == REMOVE:
+                    result = self.api.playlist_remove_all_occurrences_of_items(playlist_id, edit.uris,
+                                                                               snapshot_id=snapshot_id)
+                elif edit.kind == REORDER:
+                    result = self.api.playlist_reorder_items(playlist_id, edit.range_start, edit.insert_before,
+                                                             range_length=edit.range_length, snapshot_id=snapshot_id)
+                elif edit.kind == ADD:
+                    result = self.api.playlist_add_items(playlist_id, edit.uris, position=edit.position)
+                elif edit.kind == REPLACE:
+                    result = self.api.playlist_replace_items(playlist_id, edit.uris)
+                else:
+                    raise ValueError(f"Unknown playlist edit: {edit.kind}")
+                return result.get('snapshot_id') if result else None
+            except SpotifyException as e:
+                if e.http_status != 429 or attempt == ADD_TRACKS_MAX_RETRIES:
+                    raise
+                delay = retry_after_seconds(e)
+                self.logger.warning(f"Playlist {edit.kind} on {playlist_id} throttled, retrying in {delay:.1f}s")
+                time.sleep(delay)
+
     def search_song(self, artist: str, track: str) -> str:
         """
         Search Spotify for a track by its artist and title.
-        Returns the Spotify URI for the first match found.
+        Returns the Spotify URI of the best-ranked candidate (see TrackMatcher), or None.
+        Results, including "no match", are served from and stored in the track cache when one is set.
+        A confident match in the local track index is used without searching Spotify.
+        Concurrent searches for the same normalized artist and title share one lookup.
         """
+        return _search_flight.do(normalize_track_key(artist, track), lambda: self._search_song(artist, track))
+
+    def _search_song(self, artist: str, track: str) -> str:
+        if self.track_cache is not None:
+            cached = self.track_cache.get(artist, track)
+            if cached is not MISS:
+                return cached
+
         try:
-            self.auth.refresh_token_if_expired()
-            query = f"artist:{artist} track:{track}"
-            result = self.sp.search(q=query, type='track', limit=1)
-            if result['tracks']['items']:
-                self.logger.info(f"Found match for '{track}' by {artist}")
-                return result['tracks']['items'][0]['uri']
-            self.logger.warning(f"No match found for {artist} - {track}")
-            return None
+            match = self.track_index.lookup(artist, track) if self.track_index is not None else None
+            if match is None:
+                match = self.matcher.match(artist, track)
+            if match is not None:
+                self.logger.info(f"Found match for '{track}' by {artist} ({match.strategy}, score {match.score:.0f})")
+                uri = match.uri
+            else:
+                self.logger.warning(f"No match found for {artist} - {track}")
+                uri = None
         except Exception as e:
             self.logger.error(f"Error searching for track '{track}' by artist '{artist}': {str(e)}")
             raise
 
+        if self.track_cache is not None:
+            self.track_cache.put(artist, track, uri)
+        return uri
+
+    def _search_tracks(self, query: str, limit: int) -> List[dict]:
+        """
+        Run one Spotify track search, taking a token from the shared rate limiter first.
+
+        Returns:
+            list: Spotify track objects
+        """
+        self.auth.refresh_token_if_expired()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        result = self.api.search(q=query, type='track', limit=limit)
+        tracks = result['tracks']['items']
+        if self.track_index is not None:
+            self.track_index.add(tracks)
+        return tracks
+
     def _upload_playlist_cover(self, playlist_id: str, image_path: str) -> None:
         """
         Upload a cover image for a playlist.
@@ -103,7 +343,7 @@ class SpotifyPlaylistMaker:
             with open(image_path, 'rb') as image_file:
                 encoded_image = base64.b64encode(image_file.read()).decode('utf-8')
                 
-            self.sp.playlist_upload_cover_image(playlist_id, encoded_image)
+            self.api.playlist_upload_cover_image(playlist_id, encoded_image)
             self.logger.info(f"Successfully uploaded cover image for playlist {playlist_id}")
             
         except Exception as e:
@@ -152,34 +392,104 @@ class SpotifyPlaylistMaker:
         except Exception as e:
             self.logger.error(f"Failed to update playlist {playlist_id}: {str(e)}")
             raise
-    def get_playlist_details(self, playlist_id: str) -> dict:
+    def get_playlist_details(self, playlist_id: str, concurrency: int = PLAYLIST_FETCH_CONCURRENCY) -> dict:
         """
-        Fetch details of a Spotify playlist, including tracks and their contributors.
+        Fetch details of a Spotify playlist, including all of its tracks and their contributors.
+
+        The first request returns the playlist's name, description, snapshot_id, track total and first
+        page, with only the fields used here. The remaining pages are then fetched in parallel by offset.
+
+        Args:
+            playlist_id: Spotify playlist ID
+            concurrency: Pages fetched at once after the first (default PLAYLIST_FETCH_CONCURRENCY)
+
+        Returns:
+            dict: name, description, snapshot_id, total (items, unavailable tracks included), collaborators
+                and songs (title, artist, added_by, uri, added_at) in playlist order
         """
         try:
             self.auth.refresh_token_if_expired()
-            playlist = self.sp.playlist(playlist_id)
-            
-            collaborators = []
-            songs = []
-            
-            for item in playlist['tracks']['items']:
-                track = item['track']
-                added_by = item['added_by']['id'] if 'added_by' in item and item['added_by'] else "unknown"
-                songs.append({
-                    "title": track['name'],
-                    "artist": ", ".join([artist['name'] for artist in track['artists']]),
-                    "added_by": added_by
-                })
-                if added_by not in collaborators:
-                    collaborators.append(added_by)
+            playlist = self.api.playlist(
+                playlist_id, fields=f'name,description,snapshot_id,tracks(total,{PLAYLIST_ITEM_FIELDS})'
+            )
+            first_page = playlist['tracks']['items']
+            total = playlist['tracks'].get('total') or 0
+            offsets = range(len(first_page), total, PLAYLIST_PAGE_SIZE)
 
+            songs = self._songs_from_items(first_page)
+            if offsets:
+                with ThreadPoolExecutor(max_workers=max(1, concurrency),
+                                        thread_name_prefix="playlist-pages") as executor:
+                    # map keeps offset order, so songs stay in playlist order
+                    for page in executor.map(lambda offset: self._playlist_page(playlist_id, offset), offsets):
+                        songs.extend(self._songs_from_items(page['items']))
+
+            collaborators = list(dict.fromkeys(song['added_by'] for song in songs))
             return {
                 "name": playlist['name'],
                 "description": playlist['description'],
+                "snapshot_id": playlist.get('snapshot_id'),
+                "total": total,
                 "collaborators": collaborators,
                 "songs": songs
             }
         except Exception as e:
             self.logger.error(f"Failed to fetch playlist details: {str(e)}")
             raise
+
+    def get_playlist_snapshot_id(self, playlist_id: str) -> Optional[str]:
+        """
+        Read only a playlist's snapshot_id, which changes whenever the playlist does.
+        """
+        self.auth.refresh_token_if_expired()
+        return self.api.playlist(playlist_id, fields='snapshot_id').get('snapshot_id')
+
+    def iter_playlist_pages(self, playlist_id: str) -> Iterator[List[dict]]:
+        """
+        Stream a playlist's songs one page at a time, in playlist order, so memory stays flat for
+        very large playlists. Pages are fetched one after another as they are consumed.
+
+        Args:
+            playlist_id: Spotify playlist ID
+
+        Yields:
+            list: Up to PLAYLIST_PAGE_SIZE songs (title, artist, added_by, uri, added_at)
+        """
+        self.auth.refresh_token_if_expired()
+        offset = 0
+        while True:
+            page = self._playlist_page(playlist_id, offset, fields=f'{PLAYLIST_ITEM_FIELDS},next')
+            if page['items']:
+                yield self._songs_from_items(page['items'])
+            offset += len(page['items'])
+            if not page.get('next') or not page['items']:
+                return
+
+    def _playlist_page(self, playlist_id: str, offset: int, fields: str = PLAYLIST_ITEM_FIELDS) -> dict:
+        """Fetch one page of playlist items, taking a token from the shared rate limiter first."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return self.api.playlist_items(playlist_id, fields=fields, limit=PLAYLIST_PAGE_SIZE, offset=offset)
+
+    def _songs_from_items(self, items: List[dict]) -> List[dict]:
+        """
+        Turn playlist items into songs, skipping unavailable tracks, and add the tracks to the track index.
+        """
+        tracks = []
+        songs = []
+        for item in items:
+            track = item.get('track')
+            if not track:
+                continue
+            tracks.append(track)
+            added_by = item['added_by']['id'] if item.get('added_by') else "unknown"
+            songs.append({
+                "title": track['name'],
+                "artist": ", ".join([artist['name'] for artist in track['artists']]),
+                "added_by": added_by,
+                "uri": track.get('uri'),
+                "added_at": item.get('added_at')
+            })
+        if self.track_index is not None:
+            self.track_index.add(tracks)
+        return songs
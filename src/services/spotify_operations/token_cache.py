@@ -0,0 +1,93 @@
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Iterator, Optional
+from spotipy.cache_handler import CacheHandler
+
+try:
+    import fcntl
+except ImportError:  # Windows: refreshes are only serialized within the process
+    fcntl = None
+
+# Seconds before expiry at which a token counts as due for refresh
+TOKEN_REFRESH_MARGIN = 300
+
+class LockedFileCacheHandler(CacheHandler):
+    def __init__(self, cache_path: str = ".cache", refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        """
+        spotipy token cache that keeps the token in memory and shares it between processes through a file.
+
+        get_cached_token() is served from memory until the token is within refresh_margin of expiring,
+        so spotipy's per-request token lookup does no file I/O. The file is replaced atomically on save,
+        and refresh_lock() holds an exclusive lock on a sidecar lock file so that only one process
+        (e.g. one gunicorn worker) refreshes an expiring token while the others pick up its result.
+
+        :param cache_path: Path of the JSON token file (spotipy's default is .cache).
+        :param refresh_margin: Seconds before expiry at which the token is treated as due for refresh.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[LockedFileCacheHandler]: %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+        self.cache_path = cache_path
+        self.lock_path = f"{cache_path}.lock"
+        self.refresh_margin = refresh_margin
+        self._token_info = None
+        self._process_lock = threading.Lock()
+
+    def is_fresh(self, token_info: Optional[dict]) -> bool:
+        """Whether the token is valid for longer than the refresh margin."""
+        return token_info is not None and token_info.get("expires_at", 0) - time.time() > self.refresh_margin
+
+    def get_cached_token(self) -> Optional[dict]:
+        token_info = self._token_info
+        if self.is_fresh(token_info):
+            return token_info
+        # Expiring or not loaded yet: another process may have stored a newer token
+        return self.reload()
+
+    def reload(self) -> Optional[dict]:
+        """Read the token file into memory and return its token (None if there is none yet)."""
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                token_info = json.load(f)
+        except FileNotFoundError:
+            return self._token_info
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Couldn't read the token cache at {self.cache_path}: {str(e)}")
+            return self._token_info
+        self._token_info = token_info
+        return token_info
+
+    def save_token_to_cache(self, token_info: dict) -> None:
+        self._token_info = token_info
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".token-")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(token_info, f)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            self.logger.warning(f"Couldn't write the token cache at {self.cache_path}: {str(e)}")
+
+    @contextlib.contextmanager
+    def refresh_lock(self) -> Iterator[None]:
+        """Hold the refresh lock, shared by every thread and process using this cache file."""
+        with self._process_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
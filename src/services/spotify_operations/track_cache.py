@@ -0,0 +1,177 @@
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Optional, Tuple
+
+# Sentinel TrackCache.get returns when it has no usable entry; a cached "not on Spotify" is None
+MISS = object()
+
+DEFAULT_TRACK_TTL = 30 * 24 * 3600
+DEFAULT_NEGATIVE_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+
+# Hits only rewrite last_used when it is older than this, so reads rarely take the write lock
+LRU_TOUCH_INTERVAL = 3600
+
+# Expired and least recently used entries are pruned once every this many writes
+PRUNE_EVERY = 100
+
+def normalize_track_key(artist: str, title: str) -> Tuple[str, str]:
+    """
+    Normalize an (artist, title) pair into the cache key.
+
+    :return: The artist and title, Unicode-normalized, case-folded and with whitespace collapsed.
+    """
+    def normalize(value: str) -> str:
+        return " ".join(unicodedata.normalize("NFKC", value).casefold().split())
+    return normalize(artist), normalize(title)
+
+class TrackCache:
+    def __init__(self, db_path: str = "track_cache.sqlite3", ttl: float = DEFAULT_TRACK_TTL,
+                 negative_ttl: float = DEFAULT_NEGATIVE_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize a persistent cache of Spotify track search results.
+
+        Several processes (e.g. gunicorn workers) can share one database file: it runs in WAL mode
+        so readers never block the writer, and writers wait on a busy timeout instead of failing.
+
+        :param db_path: Path of the SQLite database file (':memory:' for a private in-process cache).
+        :param ttl: Seconds a found track URI stays cached (default 30 days).
+        :param negative_ttl: Seconds a "no match" result stays cached (default 1 day).
+        :param max_entries: Entries kept before the least recently used are evicted (default 50000).
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._metrics = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0
+        }
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                artist_key TEXT NOT NULL,
+                title_key TEXT NOT NULL,
+                uri TEXT,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (artist_key, title_key)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS tracks_last_used ON tracks (last_used);
+        """)
+        self._conn.commit()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[TrackCache] %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def get(self, artist: str, title: str):
+        """
+        Look up a track.
+
+        :return: The cached Spotify URI, None for a cached "no match", or MISS when the track is not
+            cached or its entry expired.
+        """
+        key = normalize_track_key(artist, title)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uri, fetched_at, last_used FROM tracks WHERE artist_key = ? AND title_key = ?", key
+            ).fetchone()
+            if row is None:
+                self._metrics["misses"] += 1
+                return MISS
+
+            uri, fetched_at, last_used = row
+            ttl = self.ttl if uri is not None else self.negative_ttl
+            if now - fetched_at >= ttl:
+                self._metrics["expired"] += 1
+                self._metrics["misses"] += 1
+                return MISS
+
+            self._metrics["hits" if uri is not None else "negative_hits"] += 1
+            if now - last_used >= LRU_TOUCH_INTERVAL:
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE tracks SET last_used = ? WHERE artist_key = ? AND title_key = ?", (now, *key)
+                    )
+        return uri
+
+    def put(self, artist: str, title: str, uri: Optional[str]) -> None:
+        """
+        Store a search result.
+
+        :param uri: The Spotify URI found, or None when the search had no match.
+        """
+        key = normalize_track_key(artist, title)
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO tracks (artist_key, title_key, uri, fetched_at, last_used) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (artist_key, title_key) DO UPDATE SET "
+                    "uri = excluded.uri, fetched_at = excluded.fetched_at, last_used = excluded.last_used",
+                    (*key, uri, now, now)
+                )
+            self._writes += 1
+            if self._writes % PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def prune(self) -> int:
+        """
+        Delete expired entries, then the least recently used ones above max_entries.
+
+        :return: The number of entries deleted.
+        """
+        with self._lock:
+            return self._prune(time.time())
+
+    def _prune(self, now: float) -> int:
+        with self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM tracks WHERE (uri IS NOT NULL AND fetched_at < ?) OR (uri IS NULL AND fetched_at < ?)",
+                (now - self.ttl, now - self.negative_ttl)
+            ).rowcount
+            count = self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+            if count > self.max_entries:
+                deleted += self._conn.execute(
+                    "DELETE FROM tracks WHERE (artist_key, title_key) IN "
+                    "(SELECT artist_key, title_key FROM tracks ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+        self._metrics["evictions"] += deleted
+        if deleted:
+            self.logger.info(f"Pruned {deleted} track cache entries")
+        return deleted
+
+    def metrics(self) -> dict:
+        """Return this process's hit and miss counters, the Spotify searches they saved and the entry count."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+        metrics["api_calls_saved"] = metrics["hits"] + metrics["negative_hits"]
+        lookups = metrics["api_calls_saved"] + metrics["misses"]
+        metrics["hit_rate"] = metrics["api_calls_saved"] / lookups if lookups else 0.0
+        return metrics
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
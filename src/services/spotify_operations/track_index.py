@@ -0,0 +1,160 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional
+from services.spotify_operations.track_matcher import (
+    TrackMatch, clean_title, normalize_text, rank_candidates, split_artists
+)
+
+# A local match must score at least this (0-100) to be trusted without asking Spotify; stricter than
+# TrackMatcher's threshold because nothing re-checks it
+LOCAL_MATCH_THRESHOLD = 90.0
+# Candidates read from the full-text index per lookup, best bm25 rank first
+LOCAL_CANDIDATES = 20
+# Joins a track's artist names in the artists column
+ARTIST_DELIMITER = "; "
+
+class TrackIndex:
+    def __init__(self, db_path: str = "track_index.sqlite3", threshold: float = LOCAL_MATCH_THRESHOLD):
+        """
+        Local full-text index (SQLite FTS5) of every Spotify track seen in search results and playlists.
+
+        Lookups find candidates by title and artist tokens (diacritics folded by the unicode61
+        tokenizer), then rank them with the same fuzzy scoring as TrackMatcher. A confident match
+        resolves a song without a Spotify round trip. Token lookups use FTS5's inverted index, so
+        they stay around a millisecond with millions of tracks.
+
+        :param db_path: Path of the SQLite database file (':memory:' for a private in-process index).
+        :param threshold: Score (0-100) a local match needs to be returned (default LOCAL_MATCH_THRESHOLD).
+        """
+        self.db_path = db_path
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._metrics = {"lookups": 0, "hits": 0, "misses": 0, "indexed": 0}
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS tracks (
+                uri TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                artists TEXT NOT NULL,
+                popularity INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS tracks_fts USING fts5(
+                title, artists, content='tracks', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS tracks_fts_insert AFTER INSERT ON tracks BEGIN
+                INSERT INTO tracks_fts (rowid, title, artists) VALUES (new.rowid, new.title, new.artists);
+            END;
+            CREATE TRIGGER IF NOT EXISTS tracks_fts_delete AFTER DELETE ON tracks BEGIN
+                INSERT INTO tracks_fts (tracks_fts, rowid, title, artists)
+                VALUES ('delete', old.rowid, old.title, old.artists);
+            END;
+            CREATE TRIGGER IF NOT EXISTS tracks_fts_update AFTER UPDATE OF title, artists ON tracks BEGIN
+                INSERT INTO tracks_fts (tracks_fts, rowid, title, artists)
+                VALUES ('delete', old.rowid, old.title, old.artists);
+                INSERT INTO tracks_fts (rowid, title, artists) VALUES (new.rowid, new.title, new.artists);
+            END;
+        """)
+        self._conn.commit()
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[TrackIndex]: %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def add(self, tracks: Iterable[dict]) -> int:
+        """
+        Index Spotify track objects (as returned by search and playlist endpoints). Tracks already
+        indexed are updated; local files and tracks without a URI are skipped.
+
+        :return: The number of tracks written.
+        """
+        now = time.time()
+        rows = [
+            (track["uri"], track.get("name") or "",
+             ARTIST_DELIMITER.join(artist["name"] for artist in track.get("artists") or []),
+             track.get("popularity") or 0, now)
+            for track in tracks
+            if track and (track.get("uri") or "").startswith("spotify:track:")
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO tracks (uri, title, artists, popularity, updated_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (uri) DO UPDATE SET title = excluded.title, artists = excluded.artists, "
+                    "popularity = excluded.popularity, updated_at = excluded.updated_at",
+                    rows
+                )
+            self._metrics["indexed"] += len(rows)
+        return len(rows)
+
+    def lookup(self, artist: str, title: str) -> Optional[TrackMatch]:
+        """
+        Find a chart song in the index.
+
+        :param artist: The chart's artist credit.
+        :param title: The chart's title.
+        :return: A TrackMatch (strategy "local_index") when a candidate scores at least the threshold, else None.
+        """
+        title_clean = clean_title(title)
+        artists = split_artists(artist)
+        title_tokens = normalize_text(title_clean).split()
+        artist_tokens = normalize_text(artists[0]).split()
+        if not title_tokens or not artist_tokens:
+            return None
+
+        # Every lead-artist token and any title token; the fuzzy ranking below decides
+        query = (f"artists : ({' AND '.join(_quote(token) for token in artist_tokens)}) AND "
+                 f"title : ({' OR '.join(_quote(token) for token in title_tokens)})")
+        with self._lock:
+            self._metrics["lookups"] += 1
+            rows = self._conn.execute(
+                "SELECT tracks.uri, tracks.title, tracks.artists, tracks.popularity FROM tracks_fts "
+                "JOIN tracks ON tracks.rowid = tracks_fts.rowid "
+                "WHERE tracks_fts MATCH ? ORDER BY bm25(tracks_fts) LIMIT ?",
+                (query, LOCAL_CANDIDATES)
+            ).fetchall()
+
+        candidates = [{
+            "uri": uri,
+            "name": name,
+            "artists": [{"name": name} for name in artist_names.split(ARTIST_DELIMITER)],
+            "popularity": popularity
+        } for uri, name, artist_names, popularity in rows]
+        match = rank_candidates(title_clean, [artist] + artists, candidates, "local_index", chart_title=title)
+        hit = match is not None and match.score >= self.threshold
+        with self._lock:
+            self._metrics["hits" if hit else "misses"] += 1
+        return match if hit else None
+
+    def metrics(self) -> dict:
+        """Return this process's lookup counters, tracks indexed and the index size."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["entries"] = self._conn.execute("SELECT COUNT(*) FROM tracks").fetchone()[0]
+        metrics["api_calls_saved"] = metrics["hits"]
+        metrics["hit_rate"] = metrics["hits"] / metrics["lookups"] if metrics["lookups"] else 0.0
+        return metrics
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+def _quote(token: str) -> str:
+    """Quote a token as an FTS5 string so words like AND/OR/NOT are not read as operators."""
+    return '"' + token.replace('"', '""') + '"'
@@ -0,0 +1,243 @@
+import difflib
+import logging
+import re
+import threading
+import unicodedata
+from typing import Callable, Dict, List, Optional, Set
+
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # Scores fall back to difflib, one pair at a time
+    fuzz = process = None
+
+# A candidate is accepted when its weighted score reaches MATCH_THRESHOLD and neither the title nor the
+# artist score is below its minimum (so a cover by another artist or a different song by the artist loses)
+MATCH_THRESHOLD = 80.0
+MIN_TITLE_SCORE = 70.0
+MIN_ARTIST_SCORE = 60.0
+TITLE_WEIGHT = 0.55
+ARTIST_WEIGHT = 0.45
+# Taken off a candidate whose name marks a version (remix, live, ...) the chart title does not, which on
+# its own drops a perfect title and artist match below MATCH_THRESHOLD
+VERSION_PENALTY = 30.0
+
+# Chart credits that introduce featured artists, in titles and artist strings
+_FEATURING = r"(?:featuring|feat\.?|ft\.?|with)"
+# Outside brackets only explicit credits count: "with" is common inside real titles
+_FEATURING_IN_TITLE = re.compile(r"\s+\b(?:featuring|feat\.?|ft\.?)\s+[^(\[]*", re.IGNORECASE)
+_ARTIST_SEPARATORS = re.compile(rf"\s*(?:,|&|/|;|\+|\s[xX]\s|\svs\.?\s|\b{_FEATURING}\s)\s*", re.IGNORECASE)
+# "(From the Movie)", "[Remix]", "- Remastered 2011", "- Live at ..."
+_PARENTHETICALS = re.compile(r"\s*[(\[][^)\]]*[)\]]")
+_VERSION_SUFFIX = re.compile(r"\s+-\s+.*\b(?:remaster(?:ed)?|remix|version|edit|live|mono|stereo|from)\b.*$",
+                             re.IGNORECASE)
+_NON_WORD = re.compile(r"[^\w\s]")
+# Words in a parenthetical or version suffix that make a recording a different version of the song
+_VERSION_MARKERS = re.compile(r"\b(?:remix|live|sped up|slowed|reverb|nightcore|karaoke|demo|instrumental|acoustic)\b")
+
+def normalize_text(value: str) -> str:
+    """
+    Fold a title or artist for comparison: strip diacritics, case-fold, spell out "&" and drop punctuation.
+    """
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    folded = stripped.casefold().replace("&", " and ")
+    return " ".join(_NON_WORD.sub(" ", folded).split())
+
+def clean_title(title: str) -> str:
+    """
+    Remove featuring credits, parentheticals and version suffixes from a title, keeping the original if
+    nothing would be left.
+    """
+    cleaned = _FEATURING_IN_TITLE.sub("", title)
+    cleaned = _PARENTHETICALS.sub("", cleaned)
+    cleaned = _VERSION_SUFFIX.sub("", cleaned).strip(" -")
+    return cleaned or title.strip()
+
+def version_markers(title: str) -> Set[str]:
+    """
+    Return the version markers ("remix", "live", "sped up", ...) in the parts of a title that clean_title
+    removes, so "Live Forever" has none but "Espresso - Live at Coachella" has "live".
+    """
+    removed = _PARENTHETICALS.findall(title)
+    suffix = _VERSION_SUFFIX.search(_PARENTHETICALS.sub("", title))
+    if suffix:
+        removed.append(suffix.group(0))
+    return set(_VERSION_MARKERS.findall(normalize_text(" ".join(removed))))
+
+def split_artists(artist: str) -> List[str]:
+    """
+    Split a chart artist credit ("A Featuring B & C") into its artists, lead artist first.
+    """
+    return [part.strip() for part in _ARTIST_SEPARATORS.split(artist) if part and part.strip()] or [artist.strip()]
+
+def _similarity(queries: List[str], choices: List[str], vectorized_scorer: str) -> List[List[float]]:
+    """
+    Score every query against every choice on a 0-100 scale, as a len(queries) x len(choices) matrix.
+    Uses rapidfuzz's vectorized cdist when it is installed.
+    """
+    if not queries or not choices:
+        return [[0.0] * len(choices) for _ in queries]
+    if process is not None:
+        scorer = getattr(fuzz, vectorized_scorer)
+        return process.cdist(queries, choices, scorer=scorer, workers=1).tolist()
+    if vectorized_scorer == "token_sort_ratio":
+        queries = [" ".join(sorted(query.split())) for query in queries]
+        choices = [" ".join(sorted(choice.split())) for choice in choices]
+    return [[difflib.SequenceMatcher(None, query, choice).ratio() * 100 for choice in choices] for query in queries]
+
+class TrackMatch:
+    def __init__(self, uri: str, name: str, artists: List[str], score: float, strategy: str, popularity: int = 0):
+        """
+        The Spotify track chosen for a chart song.
+
+        :param uri: The track's Spotify URI.
+        :param name: The track's title on Spotify.
+        :param artists: The track's artist names on Spotify.
+        :param score: Weighted title/artist similarity, 0-100.
+        :param strategy: Name of the query strategy that found it.
+        :param popularity: Spotify popularity, 0-100.
+        """
+        self.uri = uri
+        self.name = name
+        self.artists = artists
+        self.score = score
+        self.strategy = strategy
+        self.popularity = popularity
+
+def rank_candidates(title: str, artists: List[str], candidates: List[dict], strategy: str = "",
+                    chart_title: Optional[str] = None) -> Optional[TrackMatch]:
+    """
+    Return the best-scoring candidate that clears the title and artist minimums, or None.
+
+    Titles are compared cleaned, so a candidate whose name carries version markers the chart title
+    lacks (see version_markers) loses VERSION_PENALTY: a remix or live recording is not taken for the
+    charting original.
+
+    :param title: The cleaned chart title.
+    :param artists: The chart artist variants (full credit and each split artist).
+    :param candidates: Spotify track objects.
+    :param strategy: Recorded on the returned match.
+    :param chart_title: The chart title as published, whose version markers are allowed (default title).
+    """
+    candidates = [track for track in candidates if track and track.get("uri")]
+    if not candidates:
+        return None
+
+    title_scores = _similarity([normalize_text(title)],
+                               [normalize_text(clean_title(track.get("name", ""))) for track in candidates],
+                               "token_sort_ratio")[0]
+
+    # Score every chart artist against every candidate artist in one matrix, then take each
+    # candidate's best pair
+    candidate_artists = [[artist["name"] for artist in track.get("artists", [])] or [""] for track in candidates]
+    flat_artists = [name for names in candidate_artists for name in names]
+    artist_matrix = _similarity([normalize_text(artist) for artist in artists],
+                                [normalize_text(name) for name in flat_artists], "token_set_ratio")
+
+    chart_markers = version_markers(chart_title if chart_title is not None else title)
+    best = None
+    offset = 0
+    for track, names, title_score in zip(candidates, candidate_artists, title_scores):
+        artist_score = max(row[column] for row in artist_matrix for column in range(offset, offset + len(names)))
+        offset += len(names)
+        if title_score < MIN_TITLE_SCORE or artist_score < MIN_ARTIST_SCORE:
+            continue
+        score = TITLE_WEIGHT * title_score + ARTIST_WEIGHT * artist_score
+        if version_markers(track.get("name", "")) - chart_markers:
+            score -= VERSION_PENALTY
+        popularity = track.get("popularity") or 0
+        if best is None or (score, popularity) > (best.score, best.popularity):
+            best = TrackMatch(track["uri"], track.get("name", ""), names, score, strategy, popularity)
+    return best
+
+class TrackMatcher:
+    # (name, candidates requested) in the order they are tried; each later one is looser
+    STRATEGIES = (("fielded", 5), ("free_text", 5), ("title_only", 10))
+
+    def __init__(self, search: Callable[[str, int], List[dict]], threshold: float = MATCH_THRESHOLD):
+        """
+        Resolve chart songs to Spotify tracks by ranking several search candidates.
+
+        Chart strings are cleaned (featuring credits, parentheticals, version suffixes) and the
+        query escalates only while no candidate is good enough:
+        fielded "track:<title> artist:<lead artist>", then free text "<title> <lead artist>",
+        then "track:<title>" with more candidates. Candidates are ranked by fuzzy title and artist
+        similarity on diacritic- and punctuation-folded strings, with popularity breaking ties; a
+        remix, live or other version the chart title does not name is penalized.
+
+        :param search: Called as search(query, limit) and returns Spotify track objects, e.g.
+            SpotifyPlaylistMaker._search_tracks.
+        :param threshold: Weighted score (0-100) a candidate needs to be accepted (default MATCH_THRESHOLD).
+        """
+        self.search = search
+        self.threshold = threshold
+
+        self._lock = threading.Lock()
+        self._metrics = {"songs": 0, "matched": 0, "api_calls": 0}
+        self._by_strategy: Dict[str, int] = {name: 0 for name, _ in self.STRATEGIES}
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[TrackMatcher]: %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    def match(self, artist: str, title: str) -> Optional[TrackMatch]:
+        """
+        Find the Spotify track for a chart song.
+
+        :param artist: The chart's artist credit, e.g. "Artist Featuring Other".
+        :param title: The chart's title, e.g. "Title (From Movie)".
+        :return: The best TrackMatch, or None when no candidate reached the threshold.
+        """
+        title_clean = clean_title(title)
+        artists = split_artists(artist)
+        queries = {
+            "fielded": f"track:{title_clean} artist:{artists[0]}",
+            "free_text": f"{title_clean} {artists[0]}",
+            "title_only": f"track:{title_clean}"
+        }
+
+        calls = 0
+        best = None
+        try:
+            for strategy, limit in self.STRATEGIES:
+                calls += 1
+                candidates = self.search(queries[strategy], limit)
+                match = rank_candidates(title_clean, [artist] + artists, candidates, strategy, chart_title=title)
+                if match is not None and (best is None or match.score > best.score):
+                    best = match
+                if best is not None and best.score >= self.threshold:
+                    self._record(calls, best.strategy)
+                    return best
+        except Exception:
+            # The caller may retry the song (e.g. after a 429), so only the searches are counted
+            with self._lock:
+                self._metrics["api_calls"] += calls
+            raise
+
+        self._record(calls, None)
+        self.logger.info(f"No confident match for '{title}' by {artist} after {calls} searches")
+        return None
+
+    def _record(self, calls: int, strategy: Optional[str]) -> None:
+        with self._lock:
+            self._metrics["songs"] += 1
+            self._metrics["api_calls"] += calls
+            if strategy is not None:
+                self._metrics["matched"] += 1
+                self._by_strategy[strategy] += 1
+
+    def metrics(self) -> dict:
+        """
+        Return match counters: songs looked up, matches, Spotify searches, matches per strategy,
+        match rate and searches per matched song.
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["matched_by_strategy"] = dict(self._by_strategy)
+        metrics["match_rate"] = metrics["matched"] / metrics["songs"] if metrics["songs"] else 0.0
+        metrics["api_calls_per_match"] = metrics["api_calls"] / metrics["matched"] if metrics["matched"] else 0.0
+        metrics["fuzzy_backend"] = "rapidfuzz" if process is not None else "difflib"
+        return metrics
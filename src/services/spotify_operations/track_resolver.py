@@ -0,0 +1,245 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional
+from spotipy.exceptions import SpotifyException
+from model.song import Song
+
+# Per-song outcomes of TrackResolver.resolve
+FOUND = "found"
+NOT_FOUND = "not_found"
+FAILED = "failed"
+
+# Marks the end of the submitted searches in TrackResolver.iter_resolve
+_END_OF_SONGS = object()
+
+# Seconds to back off after a 429 that carried no Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+class TokenBucket:
+    def __init__(self, rate: float = 10.0, capacity: Optional[float] = None):
+        """
+        Thread-safe token bucket shared by everything that calls the Spotify Web API.
+
+        :param rate: Tokens (requests) added per second.
+        :param capacity: Largest burst allowed; defaults to one second's worth of tokens.
+        """
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available (and any Retry-After pause has ended), then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for the given number of seconds, e.g. a 429's Retry-After.
+        The bucket restarts empty so requests resume at the steady rate rather than in a burst.
+        """
+        with self._lock:
+            resume_at = time.monotonic() + seconds
+            if resume_at > self._paused_until:
+                self._paused_until = resume_at
+                self._tokens = 0.0
+                self._updated = resume_at
+
+class TrackResolution:
+    def __init__(self, song: Song, status: str, uri: Optional[str] = None, error: Optional[str] = None):
+        """
+        Outcome of resolving one song to a Spotify track.
+
+        :param song: The song that was looked up.
+        :param status: FOUND, NOT_FOUND or FAILED.
+        :param uri: The Spotify URI when found.
+        :param error: The error message when the lookup failed.
+        """
+        self.song = song
+        self.status = status
+        self.uri = uri
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return {
+            "title": self.song.title,
+            "artist": self.song.artist,
+            "status": self.status,
+            "uri": self.uri,
+            "error": self.error
+        }
+
+class TrackResolver:
+    def __init__(self, search: Callable[[str, str], Optional[str]], rate_limiter: Optional[TokenBucket] = None,
+                 max_workers: int = 8, max_retries: int = 3):
+        """
+        Resolve songs to Spotify URIs with bounded, self-adjusting concurrency.
+
+        Concurrency follows AIMD: it is halved whenever Spotify answers 429 and grows back by about
+        one slot per window of successful lookups, never above max_workers.
+
+        :param search: Called as search(artist, track) and returns a URI or None, e.g.
+            SpotifyPlaylistMaker.search_song. It is expected to take its tokens from rate_limiter.
+        :param rate_limiter: The shared TokenBucket; paused for Retry-After on a 429, optional.
+        :param max_workers: Upper bound on concurrent lookups (default 8).
+        :param max_retries: Times a throttled lookup is retried before it counts as failed (default 3).
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        self.search = search
+        self.rate_limiter = rate_limiter
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+
+        self._limit = float(max_workers)
+        self._in_flight = 0
+        self._slots = threading.Condition()
+        self.throttled = 0
+
+        self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        handler = logging.StreamHandler()
+        formatter = logging.Formatter('[TrackResolver]: %(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        handler.setFormatter(formatter)
+        self.logger.addHandler(handler)
+
+    @property
+    def concurrency(self) -> int:
+        """The number of lookups currently allowed to run at once."""
+        with self._slots:
+            return int(self._limit)
+
+    def resolve(self, songs: Iterable[Song]) -> List[TrackResolution]:
+        """
+        Resolve songs concurrently.
+
+        Songs are submitted as the iterable produces them, so a streamed chart is searched while it
+        is still being scraped.
+
+        :param songs: The songs to look up, in chart order.
+        :return: One TrackResolution per song, in the same order.
+        """
+        return list(self.iter_resolve(songs))
+
+    def iter_resolve(self, songs: Iterable[Song]) -> Iterator[TrackResolution]:
+        """
+        Resolve songs concurrently, yielding each TrackResolution in song order as soon as it and
+        every earlier one are done.
+
+        Songs are drawn from the iterable and submitted on a producer thread, so results are yielded
+        while later songs are still being produced and searched. An exception raised by the iterable
+        is re-raised after the results of the songs it produced before failing.
+
+        :param songs: The songs to look up, in chart order.
+        :return: An iterator of one TrackResolution per song, in the same order.
+        """
+        submitted = queue.Queue()
+        stopped = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="track-resolver")
+
+        def submit():
+            try:
+                for song in songs:
+                    with self._slots:
+                        self._slots.wait_for(lambda: stopped.is_set() or self._in_flight < int(self._limit))
+                        if stopped.is_set():
+                            return
+                        self._in_flight += 1
+                    submitted.put(executor.submit(self._resolve_one, song))
+            except Exception as e:
+                submitted.put(e)
+            finally:
+                submitted.put(_END_OF_SONGS)
+
+        threading.Thread(target=submit, name="track-resolver-submit", daemon=True).start()
+
+        counts = {FOUND: 0, NOT_FOUND: 0, FAILED: 0}
+        try:
+            while True:
+                item = submitted.get()
+                if item is _END_OF_SONGS:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                result = item.result()
+                counts[result.status] += 1
+                yield result
+        finally:
+            # Stop submitting if the caller stops early; searches already running are left to finish
+            with self._slots:
+                stopped.set()
+                self._slots.notify_all()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.logger.info(f"Resolved {sum(counts.values())} songs: {counts[FOUND]} found, {counts[NOT_FOUND]} not found, "
+                         f"{counts[FAILED]} failed ({self.throttled} throttled, concurrency now {self.concurrency})")
+
+    def _resolve_one(self, song: Song) -> TrackResolution:
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    uri = self.search(song.artist, song.title)
+                except SpotifyException as e:
+                    if e.http_status != 429 or attempt == self.max_retries:
+                        return self._failed(song, e)
+                    self._on_throttled(e)
+                except Exception as e:
+                    return self._failed(song, e)
+                else:
+                    self._on_success()
+                    if uri:
+                        return TrackResolution(song, FOUND, uri=uri)
+                    self.logger.warning(f"Could not find '{song.title}' by {song.artist} on Spotify")
+                    return TrackResolution(song, NOT_FOUND)
+        finally:
+            with self._slots:
+                self._in_flight -= 1
+                self._slots.notify_all()
+
+    def _failed(self, song: Song, error: Exception) -> TrackResolution:
+        self.logger.error(f"Error searching for '{song.title}' by {song.artist}: {str(error)}")
+        return TrackResolution(song, FAILED, error=str(error))
+
+    def _on_success(self) -> None:
+        with self._slots:
+            # Additive increase: about one extra slot per `limit` successful lookups
+            self._limit = min(float(self.max_workers), self._limit + 1 / self._limit)
+            self._slots.notify_all()
+
+    def _on_throttled(self, error: SpotifyException) -> None:
+        retry_after = retry_after_seconds(error)
+        with self._slots:
+            # Multiplicative decrease
+            self._limit = max(1.0, self._limit / 2)
+            self.throttled += 1
+        self.logger.warning(f"Spotify rate limit hit, backing off {retry_after:.1f}s "
+                            f"with concurrency {self.concurrency}")
+        if self.rate_limiter is not None:
+            self.rate_limiter.pause(retry_after)
+        time.sleep(retry_after)
+
+def retry_after_seconds(error: SpotifyException) -> float:
+    """Seconds to wait according to a 429's Retry-After header."""
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After") or headers.get("retry-after") or DEFAULT_RETRY_AFTER)
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
@@ -1,9 +1,13 @@
 from services.spotify_operations.spotify_auth import SpotifyAuth
 import logging
 import json
+from typing import Optional
 
 class UserInfoViewer:
-    def __init__(self):
+    def __init__(self, auth: Optional[SpotifyAuth] = None):
+        """
+        :param auth: Shared SpotifyAuth, e.g. from the ClientRegistry; a new one is created if omitted
+        """
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         handler = logging.StreamHandler()
@@ -11,7 +15,7 @@ class UserInfoViewer:
         handler.setFormatter(formatter)
         self.logger.addHandler(handler)
 
-        self.auth = SpotifyAuth()
+        self.auth = auth or SpotifyAuth()
         self.sp = self.auth.get_spotify_client()
 
     def get_user_info(self):
@@ -60,3 +60,8 @@ class TestSongs:
         # Verify JSON is properly indented
         assert json_output.count('\n') > 0  # Should have line breaks
         assert '    ' in json_output  # Should have indentation
+
+    def test_songs_from_json_round_trip(self, sample_songs):
+        """Test rebuilding a Songs collection from its JSON output"""
+        songs = Songs.from_json(Songs(sample_songs).to_json())
+        assert [song.to_dict() for song in songs.songs] == [song.to_dict() for song in sample_songs]
@@ -0,0 +1,91 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from model.songs import Songs
+from music_chart_scraper_config import MUSIC_CHART_SCRAPER_CONFIG
+from services.async_scraper import AsyncScraper, scrape_charts
+
+
+class TestAsyncScraper:
+    """Test suite for AsyncScraper service"""
+
+    @pytest.fixture
+    def mock_async_playwright(self):
+        """Async Playwright stand-in whose pages take 0.2s to load and echo the loaded URL"""
+        with patch('services.async_scraper.async_playwright') as mock:
+            def new_page():
+                page = MagicMock()
+                page.url = None
+
+                async def goto(url, **kwargs):
+                    page.url = url
+                    if "fail" in url:
+                        raise TimeoutError("page load timed out")
+                    await asyncio.sleep(0.2)
+
+                page.goto = AsyncMock(side_effect=goto)
+                page.wait_for_selector = AsyncMock()
+                page.eval_on_selector_all = AsyncMock(side_effect=lambda *args: [[page.url, "Test Artist"]])
+                return page
+
+            def new_context():
+                context = MagicMock()
+                context.new_page = AsyncMock(side_effect=new_page)
+                context.close = AsyncMock()
+                return context
+
+            browser = MagicMock()
+            browser.new_context = AsyncMock(side_effect=new_context)
+            browser.close = AsyncMock()
+            mock.return_value.__aenter__.return_value.chromium.launch = AsyncMock(return_value=browser)
+            yield mock
+
+    def test_invalid_concurrency(self):
+        """Test that a zero concurrency limit is rejected"""
+        with pytest.raises(ValueError):
+            AsyncScraper(concurrency=0)
+
+    def test_scrape_all_configured_charts(self, mock_async_playwright):
+        """Test that every configured chart is scraped by default"""
+        results, errors = scrape_charts()
+        assert errors == {}
+        assert list(results) == list(MUSIC_CHART_SCRAPER_CONFIG)
+        for chart_type, songs in results.items():
+            assert isinstance(songs, Songs)
+            assert songs.songs[0].title == MUSIC_CHART_SCRAPER_CONFIG[chart_type]["url"]
+
+    def test_charts_scraped_concurrently(self, mock_async_playwright):
+        """Test that wall-clock time tracks the slowest chart rather than the sum"""
+        start = time.perf_counter()
+        scrape_charts(list(MUSIC_CHART_SCRAPER_CONFIG), concurrency=3)
+        assert time.perf_counter() - start < 0.45
+
+    def test_failed_chart_does_not_sink_batch(self, mock_async_playwright):
+        """Test that one failing chart returns empty Songs while the others succeed"""
+        failing_config = dict(MUSIC_CHART_SCRAPER_CONFIG["billboard_hot_100"], url="https://example.com/fail")
+        with patch.dict(MUSIC_CHART_SCRAPER_CONFIG, {"failing_chart": failing_config}):
+            scraper = AsyncScraper()
+            results, errors = asyncio.run(scraper.scrape_charts(["failing_chart", "billboard_hot_100", "unknown_chart"]))
+
+        assert results["failing_chart"].songs == []
+        assert results["unknown_chart"].songs == []
+        assert len(results["billboard_hot_100"].songs) == 1
+        assert "timed out" in errors["failing_chart"]
+        assert "not supported" in errors["unknown_chart"]
+        assert "billboard_hot_100" not in errors
+
+    def test_concurrent_batches_keep_their_own_errors(self, mock_async_playwright):
+        """Test that two batches running at once on one scraper each report only their own failures"""
+        failing_config = dict(MUSIC_CHART_SCRAPER_CONFIG["billboard_hot_100"], url="https://example.com/fail")
+        scraper = AsyncScraper()
+
+        async def both():
+            return await asyncio.gather(scraper.scrape_charts(["failing_chart"]),
+                                        scraper.scrape_charts(["billboard_hot_100"]))
+
+        with patch.dict(MUSIC_CHART_SCRAPER_CONFIG, {"failing_chart": failing_config}):
+            (_, failing_errors), (_, ok_errors) = asyncio.run(both())
+
+        assert list(failing_errors) == ["failing_chart"]
+        assert ok_errors == {}
@@ -0,0 +1,183 @@
+import asyncio
+import json
+import threading
+import httpx
+import pytest
+from unittest.mock import patch
+from spotipy.exceptions import SpotifyException
+from services.spotify_operations.async_spotify_client import AsyncSpotifyClient, BlockingSpotifyClient
+from services.spotify_operations.spotify_auth import SpotifyAuth
+
+
+def stand_in_spotify(request: httpx.Request) -> httpx.Response:
+    """Minimal Spotify Web API stand-in for the endpoints the client covers"""
+    path = request.url.path
+    if path == "/v1/me":
+        return httpx.Response(200, json={"id": "test_user", "display_name": "Test User"})
+    if path == "/v1/search":
+        query = request.url.params["q"]
+        if "throttled" in query:
+            return httpx.Response(429, headers={"Retry-After": "3"},
+                                  json={"error": {"status": 429, "message": "API rate limit exceeded"}})
+        return httpx.Response(200, json={"tracks": {"items": [{"uri": f"spotify:track:{query}"}]}})
+    if path == "/v1/users/test_user/playlists":
+        return httpx.Response(201, json={"id": "new_playlist", **json.loads(request.content)})
+    if path == "/v1/playlists/new_playlist/tracks":
+        return httpx.Response(201, json={"snapshot_id": "snap", **json.loads(request.content)})
+    if path == "/v1/playlists/new_playlist/images":
+        return httpx.Response(202, content=b"")
+    if path == "/v1/playlists/new_playlist":
+        return httpx.Response(200, json={"id": "new_playlist", "params": dict(request.url.params)})
+    return httpx.Response(404, json={"error": {"status": 404, "message": "Not found"}})
+
+
+class TestAsyncSpotifyClient:
+    """Test suite for the asyncio Spotify client"""
+
+    @pytest.fixture
+    def requests_seen(self):
+        return []
+
+    @pytest.fixture
+    def transport(self, requests_seen):
+        def handler(request):
+            requests_seen.append(request)
+            return stand_in_spotify(request)
+        return httpx.MockTransport(handler)
+
+    def make_client(self, transport):
+        return AsyncSpotifyClient(lambda: "test-token", transport=transport)
+
+    def test_search_sends_token_and_query(self, transport, requests_seen):
+        """Test that search authenticates and returns spotipy-shaped results"""
+        async def run():
+            client = self.make_client(transport)
+            try:
+                return await client.search(q="artist:A track:B", type="track", limit=1)
+            finally:
+                await client.aclose()
+
+        result = asyncio.run(run())
+
+        assert result["tracks"]["items"][0]["uri"] == "spotify:track:artist:A track:B"
+        assert requests_seen[0].headers["Authorization"] == "Bearer test-token"
+        assert requests_seen[0].url.params["limit"] == "1"
+
+    def test_errors_raise_spotify_exception(self, transport):
+        """Test that a 429 surfaces as SpotifyException with its Retry-After header"""
+        async def run():
+            client = self.make_client(transport)
+            try:
+                await client.search(q="throttled")
+            finally:
+                await client.aclose()
+
+        with pytest.raises(SpotifyException) as exc_info:
+            asyncio.run(run())
+
+        assert exc_info.value.http_status == 429
+        assert exc_info.value.headers["Retry-After"] == "3"
+        assert "API rate limit exceeded" in exc_info.value.msg
+
+    def test_playlist_calls(self, transport, requests_seen):
+        """Test playlist creation, track adds, reads and cover upload"""
+        async def run():
+            client = self.make_client(transport)
+            try:
+                user = await client.current_user()
+                playlist = await client.user_playlist_create(user["id"], "Test", public=False, description="Desc")
+                added = await client.playlist_add_items("spotify:playlist:new_playlist", ["spotify:track:1"])
+                details = await client.playlist(playlist["id"], fields="name")
+                cover = await client.playlist_upload_cover_image(playlist["id"], "aW1hZ2U=")
+                return playlist, added, details, cover
+            finally:
+                await client.aclose()
+
+        playlist, added, details, cover = asyncio.run(run())
+
+        assert playlist["public"] is False and playlist["description"] == "Desc"
+        assert added["uris"] == ["spotify:track:1"]
+        assert details["params"] == {"additional_types": "track", "fields": "name"}
+        assert cover is None
+        assert requests_seen[-1].headers["Content-Type"] == "image/jpeg"
+
+    def test_playlist_edit_calls(self, transport, requests_seen):
+        """Test that removes, reorders and replaces send the Web API payloads"""
+        async def run():
+            client = self.make_client(transport)
+            try:
+                await client.playlist_remove_all_occurrences_of_items("new_playlist", ["spotify:track:1"],
+                                                                      snapshot_id="snap")
+                await client.playlist_reorder_items("new_playlist", 5, 0, range_length=2)
+                await client.playlist_replace_items("new_playlist", ["spotify:track:2"])
+            finally:
+                await client.aclose()
+
+        asyncio.run(run())
+
+        assert [request.method for request in requests_seen] == ["DELETE", "PUT", "PUT"]
+        assert json.loads(requests_seen[0].content) == {"tracks": [{"uri": "spotify:track:1"}], "snapshot_id": "snap"}
+        assert json.loads(requests_seen[1].content) == {"range_start": 5, "insert_before": 0, "range_length": 2}
+        assert json.loads(requests_seen[2].content) == {"uris": ["spotify:track:2"]}
+
+    def test_blocking_client_from_many_threads(self, transport):
+        """Test that the sync facade serves concurrent callers through one event loop"""
+        client = BlockingSpotifyClient(lambda: "test-token", transport=transport)
+        results = {}
+
+        def search(n):
+            results[n] = client.search(q=f"song {n}")["tracks"]["items"][0]["uri"]
+
+        threads = [threading.Thread(target=search, args=(n,)) for n in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        client.close()
+
+        assert results == {n: f"spotify:track:song {n}" for n in range(10)}
+        # Closing again is a no-op
+        client.close()
+
+    def test_token_provider_runs_off_the_event_loop(self, transport):
+        """Test that a slow token refresh does not block other requests on the client's event loop"""
+        provider_threads = []
+
+        def token_provider():
+            provider_threads.append(threading.get_ident())
+            return "test-token"
+
+        client = BlockingSpotifyClient(token_provider, transport=transport)
+        client.search(q="song")
+        client.close()
+
+        assert provider_threads and client._thread.ident not in provider_threads
+
+
+class TestSpotifyAuthClients:
+    """Test suite for the Spotify clients shared through SpotifyAuth"""
+
+    @pytest.fixture
+    def spotify_auth(self):
+        with patch('services.spotify_operations.spotify_auth.spotipy.Spotify'), \
+                patch('services.spotify_operations.spotify_auth.SpotifyOAuth'):
+            auth = SpotifyAuth()
+        auth.sp.auth_manager.get_access_token.return_value = "test-token"
+        yield auth
+        auth.close()
+
+    def test_one_async_client_per_event_loop(self, spotify_auth):
+        """Test that coroutines on the same loop share a client and other loops get their own"""
+        async def get_pair():
+            return spotify_auth.get_async_spotify_client(), spotify_auth.get_async_spotify_client()
+
+        first, second = asyncio.run(get_pair())
+        other, _ = asyncio.run(get_pair())
+
+        assert first is second
+        assert other is not first
+        assert first.token_provider() == "test-token"
+
+    def test_blocking_client_is_shared(self, spotify_auth):
+        """Test that sync callers share one blocking client"""
+        assert spotify_auth.get_blocking_spotify_client() is spotify_auth.get_blocking_spotify_client()
@@ -0,0 +1,98 @@
+import pytest
+from unittest.mock import MagicMock, patch
+from services.browser_pool import BrowserPool
+
+
+class TestBrowserPool:
+    """Test suite for BrowserPool service"""
+
+    @pytest.fixture
+    def mock_playwright(self):
+        with patch('services.browser_pool.sync_playwright') as mock:
+            chromium = mock.return_value.__enter__.return_value.chromium
+            mock.launched = []
+
+            def launch(**kwargs):
+                browser = MagicMock()
+                browser.is_connected.return_value = True
+                mock.launched.append(browser)
+                return browser
+
+            chromium.launch.side_effect = launch
+            yield mock
+
+    @pytest.fixture
+    def pool(self, mock_playwright):
+        pool = BrowserPool(size=1, max_pages_per_browser=2)
+        yield pool
+        pool.close()
+
+    def test_invalid_size(self):
+        """Test that an empty pool is rejected"""
+        with pytest.raises(ValueError):
+            BrowserPool(size=0)
+
+    def test_run_returns_result(self, pool):
+        """Test that run hands a page to the callable and returns its result"""
+        result = pool.run(lambda page: page is not None)
+        assert result is True
+        assert pool.stats()["pages_served"] == 1
+
+    def test_workers_start_lazily(self, pool, mock_playwright):
+        """Test that no browser is launched before the first lease"""
+        assert pool.stats()["workers"] == 0
+        mock_playwright.assert_not_called()
+
+    def test_browser_reused_between_leases(self, pool, mock_playwright):
+        """Test that consecutive leases share one browser"""
+        pool.run(lambda page: None)
+        pool.run(lambda page: None)
+        assert pool.stats()["browsers_launched"] == 1
+
+    def test_browser_recycled_after_max_pages(self, pool):
+        """Test that the browser is relaunched after serving max_pages_per_browser pages"""
+        for _ in range(3):
+            pool.run(lambda page: None)
+        stats = pool.stats()
+        assert stats["browsers_launched"] == 2
+        assert stats["browsers_recycled"] == 1
+
+    def test_unhealthy_browser_relaunched(self, pool, mock_playwright):
+        """Test that a disconnected browser fails the health check and is replaced"""
+        pool.run(lambda page: None)
+        mock_playwright.launched[0].is_connected.return_value = False
+        pool.run(lambda page: None)
+        stats = pool.stats()
+        assert stats["unhealthy_browsers"] == 1
+        assert stats["browsers_launched"] == 2
+
+    def test_exception_propagates(self, pool):
+        """Test that errors raised inside the lease reach the caller"""
+        def fail(page):
+            raise RuntimeError("navigation failed")
+
+        with pytest.raises(RuntimeError, match="navigation failed"):
+            pool.run(fail)
+        # The pool keeps serving after a failed lease
+        assert pool.run(lambda page: "ok") == "ok"
+
+    def test_run_after_close(self, pool):
+        """Test that a closed pool refuses new leases"""
+        pool.run(lambda page: None)
+        pool.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.run(lambda page: None)
+
+    def test_reuse_context(self, mock_playwright):
+        """Test that reuse_context opens every leased page in one cached context"""
+        pool = BrowserPool(size=1, reuse_context=True)
+        try:
+            pool.run(lambda page: None)
+            pool.run(lambda page: None)
+        finally:
+            pool.close()
+
+        browser = mock_playwright.launched[0]
+        browser.new_context.assert_called_once()
+        assert browser.new_context.return_value.new_page.call_count == 2
+        browser.new_context.return_value.close.assert_not_called()
@@ -0,0 +1,88 @@
+import pytest
+from datetime import date
+from unittest.mock import patch
+from model.song import Song
+from model.songs import Songs
+from services.chart_archive import ChartArchive
+from services.scraper import chart_week
+
+
+def make_songs(week, count=3):
+    return Songs([Song(f"Song {rank} {week}", f"Artist {rank}") for rank in range(1, count + 1)])
+
+
+class TestChartArchive:
+    """Test suite for ChartArchive service"""
+
+    @pytest.fixture
+    def archive(self, tmp_path):
+        archive = ChartArchive(str(tmp_path / "archive.sqlite3"))
+        yield archive
+        archive.close()
+
+    def test_chart_week(self):
+        """Test that any day maps to the Saturday ending its chart week"""
+        assert chart_week(date(2015, 7, 4)) == date(2015, 7, 4)
+        assert chart_week(date(2015, 6, 29)) == date(2015, 7, 4)
+        assert chart_week(date(2015, 7, 5)) == date(2015, 7, 11)
+
+    def test_store_and_get_chart(self, archive):
+        """Test that a stored week is returned in rank order for any day of that week"""
+        archive.store("billboard_hot_100", date(2015, 7, 4), make_songs("2015-07-04"))
+        songs = archive.get_chart("billboard_hot_100", date(2015, 7, 1))
+        assert [song.title for song in songs.songs] == ["Song 1 2015-07-04", "Song 2 2015-07-04", "Song 3 2015-07-04"]
+        assert archive.get_chart("billboard_hot_100", date(2015, 7, 11)) is None
+
+    def test_store_replaces_week(self, archive):
+        """Test that storing a week again replaces its rows"""
+        archive.store("billboard_hot_100", date(2015, 7, 4), make_songs("old", count=5))
+        archive.store("billboard_hot_100", date(2015, 7, 4), make_songs("new", count=2))
+        assert len(archive.get_chart("billboard_hot_100", date(2015, 7, 4)).songs) == 2
+
+    def test_get_range(self, archive):
+        """Test that a range query returns weeks oldest first, optionally cut at a rank"""
+        for day in (date(2015, 7, 18), date(2015, 7, 4), date(2015, 7, 11)):
+            archive.store("billboard_hot_100", day, make_songs(day.isoformat()))
+        archive.store("billboard_tiktok_top_50", date(2015, 7, 11), make_songs("tiktok"))
+
+        weeks = archive.get_range("billboard_hot_100", date(2015, 7, 1), date(2015, 7, 12), max_rank=2)
+
+        assert list(weeks) == ["2015-07-04", "2015-07-11"]
+        assert len(weeks["2015-07-11"].songs) == 2
+
+    def test_backfill_resumes(self, archive):
+        """Test that backfill skips archived weeks and leaves failed weeks for the next run"""
+        archive.store("billboard_hot_100", date(2015, 7, 4), make_songs("2015-07-04"))
+
+        def get_chart_for_date(week):
+            return Songs([]) if week == date(2015, 7, 18) else make_songs(week.isoformat())
+
+        with patch('services.chart_archive.Scraper') as mock_scraper:
+            mock_scraper.return_value.get_chart_for_date.side_effect = get_chart_for_date
+            summary = archive.backfill("billboard_hot_100", date(2015, 7, 1), date(2015, 7, 25), concurrency=2)
+
+        assert summary == {"archived": 2, "skipped": 1, "failed": 1, "failed_weeks": ["2015-07-18"]}
+        assert archive.archived_weeks("billboard_hot_100") == {"2015-07-04", "2015-07-11", "2015-07-25"}
+        scraped_weeks = {call.args[0] for call in mock_scraper.return_value.get_chart_for_date.call_args_list}
+        assert date(2015, 7, 4) not in scraped_weeks
+
+    def test_backfill_scraper_error(self, archive):
+        """Test that a week raising an error is reported as failed without stopping the backfill"""
+        with patch('services.chart_archive.Scraper') as mock_scraper:
+            mock_scraper.return_value.get_chart_for_date.side_effect = Exception("Scrape failed")
+            summary = archive.backfill("billboard_hot_100", date(2015, 7, 4), date(2015, 7, 11))
+        assert summary["failed"] == 2
+        assert archive.archived_weeks("billboard_hot_100") == set()
+
+    def test_backfill_includes_the_week_containing_end(self, archive):
+        """Test that a range ending mid-week still backfills the week that contains its last day"""
+        with patch('services.chart_archive.Scraper') as mock_scraper:
+            mock_scraper.return_value.get_chart_for_date.side_effect = lambda week: make_songs(week.isoformat())
+            summary = archive.backfill("billboard_hot_100", date(2015, 7, 1), date(2015, 7, 1))
+        assert summary["archived"] == 1
+        assert archive.archived_weeks("billboard_hot_100") == {"2015-07-04"}
+
+    def test_backfill_requires_dated_chart(self, archive):
+        """Test that charts without a date_url cannot be backfilled"""
+        with pytest.raises(ValueError):
+            archive.backfill("billboard_decade_end_hot_100", date(2015, 7, 4), date(2015, 7, 11))
@@ -0,0 +1,187 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from model.song import Song
+from model.songs import Songs
+from services.chart_cache import ChartCache, NOT_MODIFIED
+from services.scraper import Scraper
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestChartCache:
+    """Test suite for ChartCache service"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = ChartCache(str(tmp_path / "charts.sqlite3"), stale_ttl=100)
+        yield cache
+        cache.close()
+
+    @pytest.fixture
+    def songs(self):
+        return Songs([Song("Test Song", "Test Artist")])
+
+    def age_snapshot(self, cache, chart_type, seconds):
+        cache._conn.execute("UPDATE chart_snapshots SET fetched_at = fetched_at - ? WHERE chart_type = ?",
+                            (seconds, chart_type))
+        cache._conn.commit()
+
+    def test_miss_then_hit(self, cache, songs):
+        """Test that a miss refreshes and stores the chart and the next lookup hits"""
+        refresh = MagicMock(return_value=(songs, '"etag"', None))
+
+        first = cache.get("billboard_hot_100", 60, refresh)
+        second = cache.get("billboard_hot_100", 60, refresh)
+
+        refresh.assert_called_once_with(None)
+        assert first.songs[0].title == "Test Song"
+        assert second.songs[0].title == "Test Song"
+        assert cache.get_snapshot("billboard_hot_100").etag == '"etag"'
+        metrics = cache.metrics()
+        assert metrics["misses"] == 1
+        assert metrics["hits"] == 1
+
+    def test_persists_across_instances(self, tmp_path, songs):
+        """Test that snapshots survive a restart"""
+        path = str(tmp_path / "charts.sqlite3")
+        ChartCache(path).put("billboard_hot_100", songs)
+        restored = ChartCache(path).get("billboard_hot_100", 60, MagicMock())
+        assert restored.songs[0].to_dict() == songs.songs[0].to_dict()
+
+    def test_stale_while_revalidate(self, cache, songs):
+        """Test that a stale snapshot is served while a background refresh replaces it"""
+        cache.put("billboard_hot_100", songs)
+        self.age_snapshot(cache, "billboard_hot_100", 90)
+        new_songs = Songs([Song("New Song", "New Artist")])
+        refresh = MagicMock(return_value=(new_songs, None, None))
+
+        result = cache.get("billboard_hot_100", 60, refresh)
+
+        assert result.songs[0].title == "Test Song"
+        assert wait_for(lambda: cache.get_snapshot("billboard_hot_100").songs.songs[0].title == "New Song")
+        assert cache.metrics()["stale_hits"] == 1
+
+    def test_expired_snapshot_refreshed_synchronously(self, cache, songs):
+        """Test that a snapshot past the stale window is refreshed before returning"""
+        cache.put("billboard_hot_100", songs)
+        self.age_snapshot(cache, "billboard_hot_100", 500)
+        refresh = MagicMock(return_value=(Songs([Song("New Song", "New Artist")]), None, None))
+
+        result = cache.get("billboard_hot_100", 60, refresh)
+
+        assert result.songs[0].title == "New Song"
+        assert cache.metrics()["misses"] == 1
+
+    def test_not_modified_revalidates(self, cache, songs):
+        """Test that a NOT_MODIFIED refresh keeps the snapshot and renews it"""
+        cache.put("billboard_hot_100", songs)
+        self.age_snapshot(cache, "billboard_hot_100", 500)
+
+        result = cache.get("billboard_hot_100", 60, MagicMock(return_value=NOT_MODIFIED))
+
+        assert result.songs[0].title == "Test Song"
+        assert time.time() - cache.get_snapshot("billboard_hot_100").fetched_at < 5
+        assert cache.metrics()["revalidated_unchanged"] == 1
+
+    def test_unchanged_content_counts_as_revalidated(self, cache, songs):
+        """Test that a re-scrape with identical content is detected by hash"""
+        cache.put("billboard_hot_100", songs)
+        self.age_snapshot(cache, "billboard_hot_100", 500)
+
+        cache.get("billboard_hot_100", 60, MagicMock(return_value=(Songs([Song("Test Song", "Test Artist")]), None, None)))
+
+        assert cache.metrics()["revalidated_unchanged"] == 1
+
+    def test_failed_refresh_serves_expired_snapshot(self, cache, songs):
+        """Test that an expired snapshot is returned when the refresh fails"""
+        cache.put("billboard_hot_100", songs)
+        self.age_snapshot(cache, "billboard_hot_100", 500)
+
+        result = cache.get("billboard_hot_100", 60, MagicMock(return_value=(Songs([]), None, None)))
+
+        assert result.songs[0].title == "Test Song"
+        assert cache.metrics()["refresh_failures"] == 1
+
+    def test_failed_refresh_without_snapshot(self, cache):
+        """Test that nothing cached and a failing refresh returns empty Songs"""
+        result = cache.get("billboard_hot_100", 60, MagicMock(side_effect=Exception("Scrape failed")))
+        assert result.songs == []
+        assert cache.get_snapshot("billboard_hot_100") is None
+
+    def test_scraper_reads_through_cache(self, cache, songs):
+        """Test that Scraper.get_latest_chart uses the cache unless bypassed"""
+        cache.put("billboard_hot_100", songs)
+        scraper = Scraper(chart_type="billboard_hot_100", chart_cache=cache)
+        scraper._scrape_chart = MagicMock(return_value=Songs([Song("Fresh Song", "Fresh Artist")]))
+
+        assert scraper.get_latest_chart().songs[0].title == "Test Song"
+        scraper._scrape_chart.assert_not_called()
+
+        assert scraper.get_latest_chart(bypass_cache=True).songs[0].title == "Fresh Song"
+        assert cache.get_snapshot("billboard_hot_100").songs.songs[0].title == "Fresh Song"
+        assert cache.metrics()["bypasses"] == 1
+
+    def test_scraper_streams_through_cache(self, cache, songs):
+        """Test that Scraper.iter_latest_chart replays a fresh snapshot and stores streamed scrapes"""
+        scraper = Scraper(chart_type="billboard_hot_100", chart_cache=cache, engine="playwright")
+        scraper._iter_with_browser = MagicMock(return_value=iter([Song("Fresh Song", "Fresh Artist")]))
+
+        assert [song.title for song in scraper.iter_latest_chart()] == ["Fresh Song"]
+        assert cache.get_snapshot("billboard_hot_100").songs.songs[0].title == "Fresh Song"
+
+        assert [song.title for song in scraper.iter_latest_chart()] == ["Fresh Song"]
+        scraper._iter_with_browser.assert_called_once()
+        metrics = cache.metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+
+    def test_failed_stream_is_not_cached(self, cache, songs):
+        """Test that a stream failing midway is raised and never stored as a fresh snapshot"""
+        def partial_chart():
+            yield Song("Song 1", "Artist 1")
+            raise TimeoutError("page closed")
+
+        stream = cache.stream("billboard_hot_100", 60, MagicMock(), partial_chart)
+
+        assert next(stream).title == "Song 1"
+        with pytest.raises(TimeoutError):
+            next(stream)
+        assert cache.get_snapshot("billboard_hot_100") is None
+        assert cache.metrics()["refresh_failures"] == 1
+
+    def test_stream_falls_back_to_stale_snapshots(self, cache, songs):
+        """Test that streaming serves stale snapshots like get, and an expired one when the scrape fails"""
+        cache.put("billboard_hot_100", songs)
+        self.age_snapshot(cache, "billboard_hot_100", 90)
+        refresh = MagicMock(return_value=NOT_MODIFIED)
+        scrape = MagicMock()
+
+        assert [song.title for song in cache.stream("billboard_hot_100", 60, refresh, scrape)] == ["Test Song"]
+        assert wait_for(lambda: refresh.called and not cache._refreshing)
+        scrape.assert_not_called()
+
+        self.age_snapshot(cache, "billboard_hot_100", 3600)
+        scrape.side_effect = TimeoutError("browser crashed")
+        assert [song.title for song in cache.stream("billboard_hot_100", 60, refresh, scrape)] == ["Test Song"]
+        metrics = cache.metrics()
+        assert metrics["stale_hits"] == 1
+        assert metrics["refresh_failures"] == 1
+
+    def test_http_engine_stream_keeps_validators(self, cache, songs):
+        """Test that streaming an HTTP-engine chart revalidates with the stored ETag"""
+        cache.put("billboard_hot_100", songs, etag='"v1"')
+        self.age_snapshot(cache, "billboard_hot_100", 30 * 24 * 3600)
+        scraper = Scraper(chart_type="billboard_hot_100", chart_cache=cache, engine="http")
+        scraper.http_fetcher = MagicMock()
+        scraper.http_fetcher.fetch_conditional.return_value = MagicMock(not_modified=True)
+
+        assert [song.title for song in scraper.iter_latest_chart()] == ["Test Song"]
+        assert scraper.http_fetcher.fetch_conditional.call_args.kwargs["etag"] == '"v1"'
+        assert cache.get_snapshot("billboard_hot_100").etag == '"v1"'
+        assert cache.metrics()["revalidated_unchanged"] == 1
@@ -0,0 +1,86 @@
+import pytest
+from unittest.mock import Mock, patch
+from services.client_registry import ClientRegistry
+from services.spotify_operations.user_info_viewer import UserInfoViewer
+
+
+class TestClientRegistry:
+    """Test suite for the process-wide client registry"""
+
+    @pytest.fixture
+    def config(self):
+        return Mock(**{
+            'get_spotify_http_pool_size.return_value': 5,
+            'get_spotify_http_timeout.return_value': 7.0,
+            'get_spotify_http_retries.return_value': 2,
+            'get_openai_timeout.return_value': 30.0,
+            'get_openai_max_retries.return_value': 1,
+            'get_gpt_key.return_value': 'test-key',
+            'get_gpt_model.return_value': 'test-model',
+            'get_gpt_cache_path.return_value': ':memory:',
+            'get_gpt_cache_ttl.return_value': 60.0,
+            'get_gpt_cache_similarity.return_value': 0.0
+        })
+
+    @pytest.fixture
+    def clients(self, config):
+        with patch('services.client_registry.SpotifyAuth') as spotify_auth, \
+                patch('services.client_registry.OpenAI') as openai:
+            registry = ClientRegistry(config)
+            registry.spotify_auth_class = spotify_auth
+            registry.openai_class = openai
+            yield registry
+
+    def test_clients_are_built_once(self, clients):
+        """Test that every caller gets the same session, auth and OpenAI client"""
+        assert clients.get_spotify_auth() is clients.get_spotify_auth()
+        assert clients.get_gpt_operations() is clients.get_gpt_operations()
+        assert clients.get_gpt_operations().client is clients.get_openai_client()
+
+        clients.spotify_auth_class.assert_called_once_with(
+            requests_session=clients.get_spotify_session(),
+            requests_timeout=7.0,
+            client_options={"max_connections": 5, "timeout": 7.0}
+        )
+        clients.openai_class.assert_called_once_with(api_key='test-key', timeout=30.0, max_retries=1)
+
+    def test_spotify_session_pool_and_retries(self, clients):
+        """Test that the shared session pools connections, retries 5xx and leaves 429s to the caller"""
+        adapter = clients.get_spotify_session().get_adapter("https://api.spotify.com/v1/me")
+
+        assert adapter._pool_maxsize == 5
+        assert adapter.max_retries.total == 2
+        assert 503 in adapter.max_retries.status_forcelist
+        # A 429 reaches TrackResolver and SpotifyPlaylistMaker with its Retry-After header
+        assert 429 not in adapter.max_retries.status_forcelist
+        assert adapter.max_retries.raise_on_status is False
+        # Playlist adds are retried by SpotifyPlaylistMaker, which checks the snapshot_id first
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_services_share_the_auth(self, clients):
+        """Test that services handed the registry's auth do not authenticate again"""
+        viewer = UserInfoViewer(auth=clients.get_spotify_auth())
+
+        assert viewer.auth is clients.get_spotify_auth()
+        clients.spotify_auth_class.assert_called_once()
+
+    def test_start_warms_up_connection(self, clients):
+        """Test that start loads a cached token and opens a connection, tolerating failures"""
+        with patch.object(clients.get_spotify_session(), 'head', side_effect=OSError("offline")) as head:
+            clients.start()
+
+        clients.get_spotify_auth().get_access_token.assert_called_once()
+        head.assert_called_once()
+
+    def test_close_releases_clients(self, clients):
+        """Test that close shuts every client once and later calls rebuild them"""
+        auth = clients.get_spotify_auth()
+        openai_client = clients.get_openai_client()
+
+        clients.close()
+        clients.close()
+
+        auth.close.assert_called_once()
+        openai_client.close.assert_called_once()
+        clients.get_spotify_auth()
+        assert clients.spotify_auth_class.call_count == 2
@@ -0,0 +1,99 @@
+import pytest
+from unittest.mock import MagicMock
+from services.gpt_cache import GPTResponseCache, normalize_prompt, prompt_similarity
+from services.gpt_operations import GPTOperations
+
+
+SONGS = [{"title": "Song 1", "artist": "Artist 1"}, {"title": "Song 2", "artist": "Artist 2"}]
+
+
+class TestGPTResponseCache:
+    """Test suite for GPTResponseCache service"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = GPTResponseCache(str(tmp_path / "gpt.sqlite3"))
+        yield cache
+        cache.close()
+
+    def age_entries(self, cache, seconds):
+        cache._conn.execute("UPDATE responses SET fetched_at = fetched_at - ?, last_used = last_used - ?",
+                            (seconds, seconds))
+        cache._conn.commit()
+
+    def test_normalize_prompt(self):
+        """Test that case, whitespace and surrounding punctuation do not change the key"""
+        assert normalize_prompt("  Workout  SONGS! ") == normalize_prompt("workout songs") == "workout songs"
+
+    def test_key_includes_endpoint_model_and_temperature(self, cache):
+        """Test that a cached list is only served for the same endpoint, model and temperature"""
+        cache.put("fetch_songs", "Workout", "gpt-4", 0.7, SONGS)
+
+        assert cache.get("fetch_songs", "workout", "gpt-4", 0.7) == SONGS
+        assert cache.get("fetch_songs_by_mood_or_activity", "workout", "gpt-4", 0.7) is None
+        assert cache.get("fetch_songs", "workout", "gpt-3.5-turbo", 0.7) is None
+        assert cache.get("fetch_songs", "workout", "gpt-4", 0.2) is None
+
+    def test_expired_entries_miss_and_are_pruned(self, cache):
+        """Test that entries past the TTL are not served and are deleted by prune"""
+        cache.put("fetch_songs", "Workout", "gpt-4", 0.7, SONGS)
+        self.age_entries(cache, cache.ttl + 1)
+
+        assert cache.get("fetch_songs", "Workout", "gpt-4", 0.7) is None
+        assert cache.prune() == 1
+
+    def test_prune_evicts_least_recently_used(self, tmp_path):
+        """Test that entries above max_entries are evicted oldest first"""
+        cache = GPTResponseCache(str(tmp_path / "gpt.sqlite3"), max_entries=2)
+        for n, prompt in enumerate(["first", "second", "third"]):
+            cache.put("fetch_songs", prompt, "gpt-4", 0.7, SONGS)
+            cache._conn.execute("UPDATE responses SET last_used = ? WHERE prompt_key = ?", (n, prompt))
+        cache._conn.commit()
+
+        assert cache.prune() == 1
+        assert cache.get("fetch_songs", "first", "gpt-4", 0.7) is None
+        assert cache.metrics()["evictions"] == 1
+        cache.close()
+
+    def test_similar_prompts_hit_when_enabled(self, tmp_path):
+        """Test that a reworded prompt reuses the closest cached prompt above the threshold"""
+        cache = GPTResponseCache(str(tmp_path / "gpt.sqlite3"), similarity_threshold=0.85)
+        cache.put("fetch_songs", "upbeat songs for a summer road trip", "gpt-4", 0.7, SONGS)
+
+        assert cache.get("fetch_songs", "songs for an upbeat summer road trip", "gpt-4", 0.7) == SONGS
+        assert cache.get("fetch_songs", "sad songs for a rainy day", "gpt-4", 0.7) is None
+        assert cache.metrics()["endpoints"]["fetch_songs"]["similar_hits"] == 1
+        cache.close()
+
+    def test_prompt_similarity_compares_words(self):
+        """Test that similarity counts shared words and never matches prompts with different numbers"""
+        assert prompt_similarity("upbeat songs for a summer road trip", "songs for an upbeat summer road trip") > 0.85
+        assert prompt_similarity("90s hip hop", "80s hip hop") == 0.0
+        assert prompt_similarity("top 10 workout songs", "top 20 workout songs") == 0.0
+        assert prompt_similarity("chill 90s r&b", "90s chill r&b") == 1.0
+
+    def test_gpt_operations_reads_through_cache(self, cache):
+        """Test that only the first of two equivalent prompts calls the API, and per-endpoint rates are reported"""
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices[0].message.content = (
+            '[{"title": "Song 1", "artist": "Artist 1"}, {"title": "Song 2", "artist": "Artist 2"}]'
+        )
+        gpt_operations = GPTOperations(client=client, cache=cache)
+
+        first = gpt_operations.fetch_songs_by_mood_or_activity("Workout")
+        second = gpt_operations.fetch_songs_by_mood_or_activity("workout")
+
+        client.chat.completions.create.assert_called_once()
+        assert [song.title for song in second.songs] == [song.title for song in first.songs] == ["Song 1", "Song 2"]
+        endpoint = cache.metrics()["endpoints"]["fetch_songs_by_mood_or_activity"]
+        assert (endpoint["hits"], endpoint["misses"], endpoint["hit_rate"]) == (1, 1, 0.5)
+
+    def test_unparseable_responses_are_not_cached(self, cache):
+        """Test that a response with no songs is retried on the next request"""
+        client = MagicMock()
+        client.chat.completions.create.return_value.choices[0].message.content = "Sorry, I can't help."
+        gpt_operations = GPTOperations(client=client, cache=cache)
+
+        assert gpt_operations.fetch_songs("happy songs").songs == []
+        gpt_operations.fetch_songs("happy songs")
+        assert client.chat.completions.create.call_count == 2
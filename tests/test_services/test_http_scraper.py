@@ -0,0 +1,86 @@
+import os
+import pytest
+from unittest.mock import MagicMock
+from model.chart_tags import ChartTags
+from music_chart_scraper_config import MUSIC_CHART_SCRAPER_CONFIG
+from services.http_scraper import HttpChartFetcher, parse_chart_html
+from services.scraper import Scraper
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "..", "fixtures", "charts", "billboard_hot_100.html")
+
+
+def load_fixture():
+    with open(FIXTURE_PATH, encoding="utf-8") as fixture:
+        return fixture.read()
+
+
+def chart_tags(chart_type):
+    tags = MUSIC_CHART_SCRAPER_CONFIG[chart_type]["tags"]
+    return ChartTags(tags["chart_item"], tags["title"], tags["artist"])
+
+
+class TestHttpChartFetcher:
+    """Test suite for the browserless HTTP scraper engine"""
+
+    @pytest.mark.parametrize("chart_type", list(MUSIC_CHART_SCRAPER_CONFIG))
+    def test_parse_fixture(self, chart_type):
+        """Test that the configured selectors read every row from the saved chart page"""
+        rows = parse_chart_html(load_fixture(), chart_tags(chart_type))
+        assert len(rows) == 100
+        assert rows[0] == ["Chart Song 001", "Chart Artist 001"]
+        assert rows[4] == ["Chart Song 005", "Chart Artist 005 Featuring Guest 05"]
+
+    def test_parse_no_rows(self):
+        """Test that a page without chart rows yields no rows"""
+        rows = parse_chart_html("<html><body><p>Access denied</p></body></html>", chart_tags("billboard_hot_100"))
+        assert rows == []
+
+    def test_parse_missing_cells(self):
+        """Test that missing title or artist cells come back as None"""
+        html = '<ul class="o-chart-results-list-row"><h3 class="c-title"> Only Title </h3></ul>'
+        rows = parse_chart_html(html, chart_tags("billboard_hot_100"))
+        assert rows == [["Only Title", None]]
+
+    def test_fetch_uses_session(self):
+        """Test that fetch downloads through the given session and parses the response"""
+        session = MagicMock()
+        session.get.return_value.text = load_fixture()
+        fetcher = HttpChartFetcher(session=session, timeout=5)
+
+        rows = fetcher.fetch("https://example.com/chart", chart_tags("billboard_hot_100"))
+
+        session.get.assert_called_once_with("https://example.com/chart", headers={}, timeout=5)
+        session.get.return_value.raise_for_status.assert_called_once()
+        assert len(rows) == 100
+
+    def test_fetch_conditional_not_modified(self):
+        """Test that validators are sent and a 304 response is reported as not modified"""
+        session = MagicMock()
+        session.get.return_value.status_code = 304
+        fetcher = HttpChartFetcher(session=session)
+
+        result = fetcher.fetch_conditional("https://example.com/chart", chart_tags("billboard_hot_100"),
+                                           etag='"abc"', last_modified="Sat, 01 Jun 2024 00:00:00 GMT")
+
+        headers = session.get.call_args.kwargs["headers"]
+        assert headers == {"If-None-Match": '"abc"', "If-Modified-Since": "Sat, 01 Jun 2024 00:00:00 GMT"}
+        assert result.not_modified
+        assert result.rows == []
+
+    def test_matches_playwright_path(self):
+        """Test that both engines extract identical songs from the saved chart page"""
+        playwright = pytest.importorskip("playwright.sync_api")
+        html = load_fixture()
+        scraper = Scraper(chart_type="billboard_hot_100", engine="playwright")
+        try:
+            with playwright.sync_playwright() as p:
+                browser = p.chromium.launch(headless=True)
+                page = browser.new_page()
+                page.set_content(html)
+                browser_songs = [song.to_dict() for song in scraper._extract_songs(page)]
+                browser.close()
+        except Exception as e:
+            pytest.skip(f"Chromium is not available: {e}")
+
+        http_rows = parse_chart_html(html, scraper.tags)
+        assert [{"title": title, "artist": artist} for title, artist in http_rows] == browser_songs
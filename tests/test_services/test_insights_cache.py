@@ -0,0 +1,79 @@
+import pytest
+from unittest.mock import patch
+from services.insights_cache import InsightsCache, PlaylistInsights
+from services.playlist_manager import PlaylistManager
+
+
+def song(n, user):
+    return {"title": f"Song {n}", "artist": "Artist", "added_by": user,
+            "uri": f"spotify:track:{n}", "added_at": f"2024-01-{n + 1:02d}T00:00:00Z"}
+
+
+def details(songs, snapshot_id):
+    return {"name": "Playlist", "description": "Shared", "snapshot_id": snapshot_id, "total": len(songs),
+            "collaborators": [], "songs": songs}
+
+
+class TestInsightsCache:
+    """Test suite for InsightsCache and snapshot-validated collaborator insights"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = InsightsCache(str(tmp_path / "insights.sqlite3"))
+        yield cache
+        cache.close()
+
+    @pytest.fixture
+    def spotify_maker(self):
+        with patch('services.playlist_manager.SpotifyPlaylistMaker') as mock:
+            yield mock.return_value
+
+    @pytest.fixture
+    def manager(self, spotify_maker, cache):
+        return PlaylistManager(insights_cache=cache)
+
+    def test_put_and_get_round_trip(self, cache):
+        """Test that a stored entry is returned as stored"""
+        cache.put(PlaylistInsights("p1", "snap-1", {"collaborator_stats": {"a": {"songs_added": 2}}}))
+
+        entry = cache.get("p1")
+        assert entry.snapshot_id == "snap-1"
+        assert entry.insights["collaborator_stats"]["a"]["songs_added"] == 2
+        assert cache.get("p2") is None
+
+    def test_unchanged_snapshot_is_served_from_cache(self, manager, spotify_maker, cache):
+        """Test that only the snapshot_id is fetched while the playlist is unchanged"""
+        spotify_maker.get_playlist_details.return_value = details([song(0, "a"), song(1, "b")], "snap-1")
+        spotify_maker.get_playlist_snapshot_id.return_value = "snap-1"
+
+        first = manager.get_collaborator_insights("p1")
+        second = manager.get_collaborator_insights("p1")
+
+        assert second == first
+        assert first["collaborator_stats"] == {"a": {"songs_added": 1}, "b": {"songs_added": 1}}
+        spotify_maker.get_playlist_details.assert_called_once_with("p1")
+        metrics = cache.metrics()
+        assert metrics["misses"] == 1
+        assert metrics["hits"] == 1
+
+    def test_changed_playlist_is_read_again(self, manager, spotify_maker, cache):
+        """Test that any new snapshot, an append or a removal, recomputes the insights from a full read"""
+        spotify_maker.get_playlist_details.return_value = details([song(0, "a"), song(1, "b")], "snap-1")
+        manager.get_collaborator_insights("p1")
+
+        spotify_maker.get_playlist_snapshot_id.return_value = "snap-2"
+        spotify_maker.get_playlist_details.return_value = details([song(0, "a"), song(1, "b"), song(2, "b")],
+                                                                  "snap-2")
+        assert manager.get_collaborator_insights("p1")["collaborator_stats"] == {"a": {"songs_added": 1},
+                                                                                 "b": {"songs_added": 2}}
+
+        spotify_maker.get_playlist_snapshot_id.return_value = "snap-3"
+        spotify_maker.get_playlist_details.return_value = details([song(4, "c"), song(1, "b")], "snap-3")
+        insights = manager.get_collaborator_insights("p1")
+
+        assert insights["collaborator_stats"] == {"c": {"songs_added": 1}, "b": {"songs_added": 1}}
+        spotify_maker.get_playlist_details.assert_called_with("p1")
+        assert cache.get("p1").snapshot_id == "snap-3"
+        metrics = cache.metrics()
+        assert metrics["misses"] == 1
+        assert metrics["full_refreshes"] == 2
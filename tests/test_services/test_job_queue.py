@@ -0,0 +1,189 @@
+import threading
+import time
+import pytest
+from services.job_queue import (DONE, ERROR, FAILED, PLAYLIST_CREATED, QUEUED, RUNNING, SUCCEEDED, JobQueueFull,
+                                JobRunner, JobStore)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestJobQueue:
+    """Test suite for JobStore and JobRunner"""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        store = JobStore(str(tmp_path / "jobs.sqlite3"))
+        yield store
+        store.close()
+
+    def wait_for_status(self, store, job_id, status):
+        deadline = time.time() + 2
+        while store.get(job_id).status != status:
+            assert time.time() < deadline, f"job {job_id} never reached {status}"
+            time.sleep(0.01)
+        return store.get(job_id)
+
+    def test_job_runs_in_the_background_and_records_progress(self, store):
+        """Test that submit returns a queued job at once and the runner stores its progress and result"""
+        release = threading.Event()
+
+        def handler(params, progress_callback):
+            progress_callback({"stage": "resolving", "searched": 1, "found": 1})
+            assert release.wait(timeout=2)
+            return {"status": "success", "message": f"Created playlist for {params['chart_type']}"}
+
+        runner = JobRunner(store, {"chart_playlist": handler})
+        job = runner.submit("chart_playlist", {"chart_type": "billboard_hot_100"})
+        assert job.status == QUEUED
+
+        running = self.wait_for_status(store, job.id, RUNNING)
+        while store.get(job.id).progress.get("stage") != "resolving":
+            time.sleep(0.01)
+        assert store.get(job.id).progress == {"stage": "resolving", "searched": 1, "found": 1}
+        assert running.started_at is not None
+        release.set()
+
+        done = self.wait_for_status(store, job.id, SUCCEEDED)
+        assert done.result == {"status": "success", "message": "Created playlist for billboard_hot_100"}
+        assert runner.metrics()["succeeded"] == 1
+        runner.close()
+
+    def test_error_results_and_exceptions_fail_the_job(self, store):
+        """Test that an error result or a raised exception marks the job failed with its message"""
+        runner = JobRunner(store, {
+            "error": lambda params, progress: {"status": "error", "message": "No songs found."},
+            "crash": lambda params, progress: 1 / 0
+        })
+        error_job = runner.submit("error", {})
+        crash_job = runner.submit("crash", {})
+
+        assert self.wait_for_status(store, error_job.id, FAILED).error == "No songs found."
+        assert "division by zero" in self.wait_for_status(store, crash_job.id, FAILED).error
+        assert runner.metrics()["failed"] == 2
+        runner.close()
+
+    def test_submit_is_bounded(self, store):
+        """Test that jobs beyond max_pending are refused and unknown kinds are rejected"""
+        release = threading.Event()
+        runner = JobRunner(store, {"slow": lambda params, progress: release.wait(timeout=2) and {}},
+                           max_workers=1, max_pending=2)
+        runner.submit("slow", {})
+        runner.submit("slow", {})
+
+        with pytest.raises(JobQueueFull):
+            runner.submit("slow", {})
+        with pytest.raises(ValueError):
+            runner.submit("unknown", {})
+        assert runner.metrics()["rejected"] == 1
+        release.set()
+        runner.close()
+
+    def test_interrupted_and_queued_jobs_resume_after_a_restart(self, store):
+        """Test that start() requeues jobs of a lost runner and runs every queued job"""
+        interrupted = store.create("chart_playlist", {"chart_type": "billboard_hot_100"})
+        assert store.claim(interrupted.id)
+        # The job was claimed by a worker that has not reported progress since long ago
+        store._conn.execute("UPDATE jobs SET owner = 'other-host:1', updated_at = 0 WHERE id = ?", (interrupted.id,))
+        waiting = store.create("chart_playlist", {"chart_type": "billboard_tiktok_top_50"})
+
+        runner = JobRunner(store, {"chart_playlist": lambda params, progress: {"status": "success"}})
+        runner.start()
+
+        self.wait_for_status(store, interrupted.id, SUCCEEDED)
+        self.wait_for_status(store, waiting.id, SUCCEEDED)
+        assert runner.metrics()["requeued"] == 1
+        runner.close()
+
+    def test_interrupted_job_resumes_on_its_created_playlist(self, store):
+        """Test that a job lost after creating its playlist is rerun against that playlist instead of a new one"""
+        job = store.create("chart_playlist", {"chart_type": "billboard_hot_100"})
+        store.claim(job.id)
+        store.update_progress(job.id, {"stage": PLAYLIST_CREATED, "playlist_id": "playlist-1"})
+        store.update_progress(job.id, {"stage": "resolving", "searched": 10, "found": 9})
+        store._conn.execute("UPDATE jobs SET owner = 'other-host:1', updated_at = 0 WHERE id = ?", (job.id,))
+        seen = []
+
+        runner = JobRunner(store, {"chart_playlist": lambda params, progress: seen.append(params) or {}})
+        runner.start()
+
+        self.wait_for_status(store, job.id, SUCCEEDED)
+        assert seen == [{"chart_type": "billboard_hot_100", "playlist_id": "playlist-1"}]
+        runner.close()
+
+    def test_heartbeat_keeps_long_jobs_from_going_stale(self, store):
+        """Test that a runner marks its running jobs alive, so a slow job is not requeued while it runs"""
+        release = threading.Event()
+        runner = JobRunner(store, {"slow": lambda params, progress: release.wait(timeout=2) and {}},
+                           heartbeat_interval=0.01)
+        job = runner.submit("slow", {})
+        self.wait_for_status(store, job.id, RUNNING)
+        store._conn.execute("UPDATE jobs SET updated_at = 0 WHERE id = ?", (job.id,))
+
+        assert wait_until(lambda: store._conn.execute("SELECT updated_at FROM jobs WHERE id = ?",
+                                                      (job.id,)).fetchone()[0] > 0)
+        assert store.requeue_interrupted(stale_after=60) == 0
+        release.set()
+        self.wait_for_status(store, job.id, SUCCEEDED)
+        runner.close()
+
+    def test_claim_runs_a_job_once(self, store):
+        """Test that only one runner can claim a queued job and live running jobs are not requeued"""
+        job = store.create("chart_playlist", {})
+
+        assert store.claim(job.id)
+        assert not store.claim(job.id)
+        assert store.requeue_interrupted() == 0
+        assert store.counts()[RUNNING] == 1
+
+    def test_events_replay_and_end_with_done(self, store):
+        """Test that a job's events are replayed in order, resume after a sequence number and end with done"""
+        job = store.create("chart_playlist", {})
+        store.claim(job.id)
+        store.update_progress(job.id, {"stage": "scraped", "rows": 100})
+        store.update_progress(job.id, {"stage": "resolving", "searched": 1, "found": 1})
+        store.finish(job.id, SUCCEEDED, {"status": "success"})
+
+        events = store.events(job.id)
+        assert [event["stage"] for _, event in events] == ["scraped", "resolving", DONE]
+        assert events[-1][1] == {"stage": DONE, "status": SUCCEEDED, "result": {"status": "success"}, "error": None}
+        assert store.events(job.id, after=events[0][0]) == events[1:]
+
+    def test_waiting_for_events_wakes_on_new_events(self, store):
+        """Test that a reader waiting for events returns as soon as one is recorded"""
+        job = store.create("chart_playlist", {})
+        timer = threading.Timer(0.05, store.update_progress, (job.id, {"stage": "started"}))
+        timer.start()
+
+        started = time.monotonic()
+        events = store.events(job.id, timeout=2)
+
+        assert [event for _, event in events] == [{"stage": "started"}]
+        assert time.monotonic() - started < 1
+        assert store.events(job.id, after=events[0][0], timeout=0.05) == []
+
+    def test_follow_ends_at_done(self, store):
+        """Test that following a job stops after its done event"""
+        job = store.create("chart_playlist", {})
+        store.claim(job.id)
+        store.update_progress(job.id, {"stage": "started"})
+        store.finish(job.id, SUCCEEDED, {"status": "success"})
+
+        assert [event["stage"] for _, event in store.follow(job.id, wait=0.01)] == ["started", DONE]
+
+    def test_follow_gives_up_on_stopped_and_silent_jobs(self, store):
+        """Test that a job that stopped without a done event, or went silent, ends the stream with an error"""
+        stopped = store.create("chart_playlist", {})
+        store._conn.execute("UPDATE jobs SET status = ? WHERE id = ?", (FAILED, stopped.id))
+        silent = store.create("chart_playlist", {})
+        store.claim(silent.id)
+
+        assert list(store.follow(stopped.id, wait=0.01)) == [(None, {"stage": ERROR,
+                                                                     "message": "The job is no longer running"})]
+        items = list(store.follow(silent.id, wait=0.01, idle_timeout=0.05))
+        assert None in items
+        assert items[-1][1]["stage"] == ERROR
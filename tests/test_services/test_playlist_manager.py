@@ -1,7 +1,11 @@
+import threading
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from model.song import Song
+from model.songs import Songs
 from services import playlist_manager
+from services.job_queue import SUCCEEDED, JobRunner, JobStore
 from services.playlist_manager import PlaylistManager
 
 class TestPlaylistManager:
@@ -10,8 +14,8 @@ class TestPlaylistManager:
     @pytest.fixture
     def mock_spotify_maker(self):
         with patch('services.spotify_operations.spotify_playlist_maker.SpotifyPlaylistMaker') as mock:
-            mock.return_value.sp.current_user.return_value = {'id': 'test_user'}
-            mock.return_value.create_playlist.return_value = 'test_playlist_id'
+            mock.return_value.api.current_user.return_value = {'id': 'test_user'}
+            mock.return_value.create_playlist.return_value = ('test_playlist_id', 'test_snapshot_id')
             yield mock
             
     @pytest.fixture
@@ -78,3 +82,164 @@ class TestPlaylistManager:
         result = playlist_manager.create_mood_or_activity_playlist("Relaxation")
         assert result["status"] == "success"
         assert "Playlist 'Relaxation Playlist' created" in result["message"]
+
+
+class TestPlaylistManagerStreaming:
+    """Test suite for the streamed chart-to-playlist pipeline"""
+
+    @pytest.fixture
+    def spotify_maker(self):
+        with patch('services.playlist_manager.SpotifyPlaylistMaker') as mock:
+            mock.return_value.api.current_user.return_value = {'id': 'test_user', 'display_name': 'Test User'}
+            mock.return_value.create_playlist.return_value = ('test_playlist_id', 'test_snapshot_id')
+            yield mock.return_value
+
+    def test_searches_overlap_with_scraping(self, spotify_maker):
+        """Test that the first song is searched before the chart stream has finished"""
+        first_search_done = threading.Event()
+
+        def chart_stream(bypass_cache=False):
+            yield Song("Song 1", "Artist 1")
+            # The rest of the chart only arrives once searching has already started
+            assert first_search_done.wait(timeout=2)
+            yield Song("Song 2", "Artist 2")
+
+        def search_song(artist, track):
+            first_search_done.set()
+            return f"spotify:track:{track}"
+
+        spotify_maker.search_song.side_effect = search_song
+        with patch('services.playlist_manager.Scraper') as mock_scraper:
+            mock_scraper.return_value.iter_latest_chart.side_effect = chart_stream
+            result = PlaylistManager().create_playlist("billboard_hot_100")
+
+        assert result == {"status": "success", "message": "Created playlist with 2 songs."}
+        spotify_maker.add_tracks_to_playlist.assert_called_once_with(
+            'test_playlist_id', ["spotify:track:Song 1", "spotify:track:Song 2"], snapshot_id='test_snapshot_id',
+            progress_callback=None
+        )
+
+    def test_empty_stream_reports_no_songs(self, spotify_maker):
+        """Test that an empty chart stream stops before touching Spotify"""
+        with patch('services.playlist_manager.Scraper') as mock_scraper:
+            mock_scraper.return_value.iter_latest_chart.return_value = iter([])
+            result = PlaylistManager().create_playlist("billboard_hot_100")
+
+        assert result == {"status": "error", "message": "No songs found."}
+        spotify_maker.create_playlist.assert_not_called()
+
+    def test_stream_errors_are_reported(self, spotify_maker):
+        """Test that an exception raised by the chart stream surfaces as an error result"""
+        def chart_stream(bypass_cache=False):
+            raise RuntimeError("Scrape failed")
+            yield
+
+        with patch('services.playlist_manager.Scraper') as mock_scraper:
+            mock_scraper.return_value.iter_latest_chart.side_effect = chart_stream
+            result = PlaylistManager().create_playlist("billboard_hot_100")
+
+        assert result["status"] == "error"
+
+    def test_sync_mode_updates_existing_playlist(self, spotify_maker):
+        """Test that a playlist_id syncs that playlist instead of creating one"""
+        spotify_maker.search_song.side_effect = lambda artist, track: f"spotify:track:{track}"
+        spotify_maker.sync_playlist.return_value = {"strategy": "diff", "added": 1, "removed": 0, "moved": 1,
+                                                    "api_calls": 2, "snapshot_id": "snap"}
+        with patch('services.playlist_manager.Scraper') as mock_scraper:
+            mock_scraper.return_value.iter_latest_chart.return_value = iter([Song("Song 1", "Artist 1")])
+            result = PlaylistManager().create_playlist("billboard_hot_100", playlist_id="existing")
+
+        assert result["status"] == "success"
+        assert result["sync"]["api_calls"] == 2
+        spotify_maker.sync_playlist.assert_called_once_with("existing", ["spotify:track:Song 1"])
+        spotify_maker.create_playlist.assert_not_called()
+
+    def test_song_stream_is_resolved_while_generating(self, spotify_maker):
+        """Test that streamed songs are searched before the stream has finished"""
+        first_search_done = threading.Event()
+
+        def song_stream():
+            yield Song("Song 1", "Artist 1")
+            # The model is still generating when the first search runs
+            assert first_search_done.wait(timeout=2)
+            yield Song("Song 2", "Artist 2")
+
+        def search_song(artist, track):
+            first_search_done.set()
+            return f"spotify:track:{track}"
+
+        spotify_maker.search_song.side_effect = search_song
+        result = PlaylistManager().create_playlist(song_stream=song_stream(), playlist_name="GPT")
+
+        assert result == {"status": "success", "message": "Created playlist with 2 songs."}
+        spotify_maker.add_tracks_to_playlist.assert_called_once_with(
+            'test_playlist_id', ["spotify:track:Song 1", "spotify:track:Song 2"], snapshot_id='test_snapshot_id',
+            progress_callback=None
+        )
+
+    def test_progress_is_reported_by_stage(self, spotify_maker):
+        """Test that progress_callback receives the playlist, each search and the add, in order"""
+        events = []
+        spotify_maker.search_song.side_effect = lambda artist, track: "spotify:track:1" if track == "Song 1" else None
+        songs = Songs([Song("Song 1", "Artist 1"), Song("Song 2", "Artist 2")])
+
+        result = PlaylistManager().create_playlist(songs_data=songs, progress_callback=events.append)
+
+        assert result["status"] == "success"
+        assert events == [
+            {"stage": "playlist_created", "playlist_id": "test_playlist_id"},
+            {"stage": "resolving", "searched": 1, "found": 1},
+            {"stage": "resolving", "searched": 2, "found": 1},
+            {"stage": "adding", "playlist_id": "test_playlist_id", "tracks": 1}
+        ]
+
+    def test_resolving_progress_is_reported_while_searching(self, spotify_maker):
+        """Test that a finished search is reported before a slower later search completes"""
+        first_reported = threading.Event()
+        events = []
+
+        def search_song(artist, track):
+            if track == "Song 2":
+                # Only completes once the first search's progress has been delivered
+                assert first_reported.wait(timeout=2)
+            return f"spotify:track:{track}"
+
+        def progress(event):
+            events.append(event)
+            if event == {"stage": "resolving", "searched": 1, "found": 1}:
+                first_reported.set()
+
+        spotify_maker.search_song.side_effect = search_song
+        songs = Songs([Song("Song 1", "Artist 1"), Song("Song 2", "Artist 2")])
+        result = PlaylistManager().create_playlist(songs_data=songs, progress_callback=progress)
+
+        assert result == {"status": "success", "message": "Created playlist with 2 songs."}
+        assert {"stage": "resolving", "searched": 2, "found": 2} in events
+
+    def test_job_progress_shows_searches_in_flight(self, spotify_maker, tmp_path):
+        """Test that a polled job's stored progress advances while later searches are still running"""
+        release = threading.Event()
+
+        def search_song(artist, track):
+            if track == "Song 2":
+                assert release.wait(timeout=2)
+            return f"spotify:track:{track}"
+
+        spotify_maker.search_song.side_effect = search_song
+        store = JobStore(str(tmp_path / "jobs.sqlite3"))
+        songs = Songs([Song("Song 1", "Artist 1"), Song("Song 2", "Artist 2")])
+        runner = JobRunner(store, {"playlist": lambda params, progress: PlaylistManager().create_playlist(
+            songs_data=songs, progress_callback=progress)})
+        job = runner.submit("playlist", {})
+
+        deadline = time.time() + 2
+        while store.get(job.id).progress != {"stage": "resolving", "searched": 1, "found": 1}:
+            assert time.time() < deadline, "the first search was never reported"
+            time.sleep(0.01)
+        release.set()
+
+        while store.get(job.id).status != SUCCEEDED:
+            assert time.time() < deadline + 2
+            time.sleep(0.01)
+        runner.close()
+        store.close()
@@ -0,0 +1,101 @@
+import random
+import pytest
+from services.spotify_operations.playlist_sync import (
+    plan_playlist_sync, REMOVE, REORDER, ADD, REPLACE, DIFF, FULL_REPLACE
+)
+
+
+def apply_plan(current, plan):
+    """Apply a plan the way the Web API applies each request"""
+    playlist = list(current)
+    for edit in plan.edits:
+        if edit.kind == REMOVE:
+            playlist = [uri for uri in playlist if uri not in edit.uris]
+        elif edit.kind == REPLACE:
+            playlist = list(edit.uris)
+        elif edit.kind == ADD:
+            position = len(playlist) if edit.position is None else edit.position
+            playlist[position:position] = edit.uris
+        elif edit.kind == REORDER:
+            moved = playlist[edit.range_start:edit.range_start + edit.range_length]
+            before = playlist[edit.insert_before] if edit.insert_before < len(playlist) else None
+            del playlist[edit.range_start:edit.range_start + edit.range_length]
+            position = len(playlist) if before is None else playlist.index(before)
+            playlist[position:position] = moved
+    return playlist
+
+
+class TestPlanPlaylistSync:
+    """Test suite for the playlist diff planner"""
+
+    @pytest.fixture
+    def chart(self):
+        return [f"spotify:track:{n}" for n in range(100)]
+
+    def test_unchanged_playlist_needs_no_writes(self, chart):
+        """Test that syncing to the same tracks plans nothing"""
+        plan = plan_playlist_sync(chart, chart)
+
+        assert plan.strategy == DIFF
+        assert plan.edits == []
+
+    def test_weekly_refresh_is_a_small_diff(self, chart):
+        """Test that drop-outs, debuts and a climber cost a handful of batched requests"""
+        target = chart[:]
+        del target[90:95]
+        target[10:10] = ["spotify:track:new-1", "spotify:track:new-2"]
+        target.insert(0, target.pop(50))
+
+        plan = plan_playlist_sync(chart, target)
+
+        assert apply_plan(chart, plan) == target
+        assert plan.strategy == DIFF
+        assert [edit.kind for edit in plan.edits] == [REMOVE, REORDER, ADD]
+        assert (plan.added, plan.removed, plan.moved) == (2, 5, 1)
+
+    def test_contiguous_moves_are_batched(self, chart):
+        """Test that a block of tracks moving together is one reorder request"""
+        target = chart[20:30] + chart[:20] + chart[30:]
+
+        plan = plan_playlist_sync(chart, target)
+
+        assert apply_plan(chart, plan) == target
+        assert len(plan.edits) == 1 and plan.edits[0].kind == REORDER
+
+    def test_duplicates_are_removed_and_re_added(self):
+        """Test that a duplicated track ends up once, at its target position"""
+        current = ["a", "b", "a", "c"]
+
+        plan = plan_playlist_sync(current, ["a", "b", "c"])
+
+        assert apply_plan(current, plan) == ["a", "b", "c"]
+
+    def test_rewrite_when_diff_is_too_expensive(self, chart):
+        """Test that a reshuffled playlist is rewritten instead of moved track by track"""
+        target = chart[::-1]
+
+        plan = plan_playlist_sync(chart, target, max_diff_calls=10)
+
+        assert plan.strategy == FULL_REPLACE
+        assert [edit.kind for edit in plan.edits] == [REPLACE]
+        assert apply_plan(chart, plan) == target
+
+    def test_unavailable_tracks_force_rewrite(self, chart):
+        """Test that playlists with unavailable tracks are rewritten in chunks of 100"""
+        current = chart + [None]
+        target = chart + ["spotify:track:100", "spotify:track:101"]
+
+        plan = plan_playlist_sync(current, target)
+
+        assert [edit.kind for edit in plan.edits] == [REPLACE, ADD]
+        assert apply_plan(current, plan) == target
+
+    def test_random_playlists_converge(self):
+        """Test that applying any plan produces exactly the target order"""
+        rng = random.Random(7)
+        for _ in range(300):
+            pool = [f"spotify:track:{n}" for n in range(rng.randint(1, 250))]
+            current = [rng.choice(pool) for _ in range(rng.randint(0, len(pool)))]
+            target = rng.sample(pool, rng.randint(0, len(pool)))
+
+            assert apply_plan(current, plan_playlist_sync(current, target)) == target
@@ -0,0 +1,77 @@
+import pytest
+from unittest.mock import MagicMock
+from music_chart_scraper_config import DEFAULT_NETWORK_CONFIG
+from services.resource_blocker import DEFAULT_ESTIMATED_BYTES, ResourceBlocker
+
+
+def make_route(resource_type, url):
+    route = MagicMock()
+    route.request.resource_type = resource_type
+    route.request.url = url
+    return route
+
+
+class TestResourceBlocker:
+    """Test suite for ResourceBlocker service"""
+
+    @pytest.fixture
+    def blocker(self):
+        return ResourceBlocker.from_config(DEFAULT_NETWORK_CONFIG)
+
+    def test_blocks_resource_types(self, blocker):
+        """Test that configured resource types are blocked"""
+        assert blocker.should_block("image", "https://www.billboard.com/cover.jpg")
+        assert blocker.should_block("font", "https://www.billboard.com/font.woff2")
+        assert not blocker.should_block("document", "https://www.billboard.com/charts/hot-100")
+
+    def test_blocks_url_patterns(self, blocker):
+        """Test that tracker hosts are blocked regardless of resource type"""
+        assert blocker.should_block("script", "https://securepubads.g.doubleclick.net/tag/js/gpt.js")
+        assert not blocker.should_block("script", "https://www.billboard.com/app.js")
+
+    def test_allow_patterns_win(self):
+        """Test that allow patterns override both deny rules"""
+        blocker = ResourceBlocker(
+            block_resource_types=["stylesheet"],
+            block_url_patterns=["*billboard.com/wp-content/*"],
+            allow_url_patterns=["*/main.css"]
+        )
+        assert not blocker.should_block("stylesheet", "https://www.billboard.com/wp-content/main.css")
+        assert blocker.should_block("stylesheet", "https://www.billboard.com/wp-content/other.css")
+
+    def test_route_handler_counts(self, blocker):
+        """Test that the route handler aborts or continues and counts each request"""
+        image = make_route("image", "https://www.billboard.com/cover.jpg")
+        document = make_route("document", "https://www.billboard.com/charts/hot-100")
+        blocker._handle_route(image)
+        blocker._handle_route(document)
+
+        response = MagicMock()
+        response.headers = {"content-length": "2048"}
+        blocker._handle_response(response)
+
+        image.abort.assert_called_once()
+        document.continue_.assert_called_once()
+        assert blocker.summary() == {
+            "requests_blocked": 1,
+            "requests_allowed": 1,
+            "bytes_loaded": 2048,
+            "bytes_saved": 40_000,
+            "blocked_by_type": {"image": 1}
+        }
+
+    def test_bytes_saved_is_estimated_per_resource_type(self):
+        """Test that each blocked request adds its type's estimated size, with a default for unknown types"""
+        blocker = ResourceBlocker(block_url_patterns=["*tracker*"], estimated_bytes_by_type={"image": 1000})
+        blocker._handle_route(make_route("image", "https://tracker.example/pixel.gif"))
+        blocker._handle_route(make_route("ping", "https://tracker.example/beacon"))
+        blocker._handle_route(make_route("document", "https://www.billboard.com/charts/hot-100"))
+
+        assert blocker.summary()["bytes_saved"] == 1000 + DEFAULT_ESTIMATED_BYTES
+
+    def test_attach_registers_handlers(self, blocker):
+        """Test that attach installs the route and response listeners"""
+        page = MagicMock()
+        blocker.attach(page)
+        page.route.assert_called_once_with("**/*", blocker._handle_route)
+        page.on.assert_called_once_with("response", blocker._handle_response)
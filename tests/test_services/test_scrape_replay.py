@@ -0,0 +1,102 @@
+import os
+import pytest
+import requests
+from unittest.mock import MagicMock
+from requests.adapters import BaseAdapter
+from services.scrape_replay import ScrapeReplay, RECORD, REPLAY
+from services.scraper import Scraper
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "..", "fixtures", "charts", "billboard_hot_100.html")
+HOT_100_URL = "https://www.billboard.com/charts/hot-100"
+
+
+class TestScrapeReplay:
+    """Test suite for the ScrapeReplay record/replay harness"""
+
+    @pytest.fixture
+    def snapshots(self, tmp_path):
+        with open(FIXTURE_PATH, encoding="utf-8") as fixture:
+            ScrapeReplay(str(tmp_path), mode=RECORD).save(HOT_100_URL, fixture.read())
+        return str(tmp_path)
+
+    def test_invalid_mode(self, tmp_path):
+        """Test that unknown modes are rejected"""
+        with pytest.raises(ValueError):
+            ScrapeReplay(str(tmp_path), mode="invalid")
+
+    def test_save_and_load(self, snapshots):
+        """Test that a recorded page is found by URL after reopening the directory"""
+        replay = ScrapeReplay(snapshots, mode=REPLAY)
+        assert "Chart Song 001" in replay.load(HOT_100_URL)
+        assert replay.load("https://www.billboard.com/charts/unknown") is None
+
+    def test_replay_session(self, snapshots):
+        """Test that the replay session answers from disk and 404s unrecorded URLs"""
+        session = ScrapeReplay(snapshots, mode=REPLAY).session()
+        assert session.get(HOT_100_URL).status_code == 200
+        assert session.get("https://www.billboard.com/charts/unknown").status_code == 404
+
+    def test_http_engine_scrapes_offline(self, snapshots):
+        """Test that the HTTP engine scrapes a recorded chart without network access"""
+        scraper = Scraper(chart_type="billboard_hot_100", engine="http",
+                          replay=ScrapeReplay(snapshots, mode=REPLAY))
+        songs = scraper.get_latest_chart()
+        assert len(songs.songs) == 100
+        assert songs.songs[0].title == "Chart Song 001"
+
+    def test_playwright_route_replay(self, snapshots):
+        """Test that Playwright requests are fulfilled from disk or aborted"""
+        replay = ScrapeReplay(snapshots, mode=REPLAY)
+        page = MagicMock()
+        replay.attach(page)
+        handler = page.route.call_args.args[1]
+
+        recorded = MagicMock()
+        recorded.request.url = HOT_100_URL
+        handler(recorded)
+        other = MagicMock()
+        other.request.url = "https://www.billboard.com/app.js"
+        handler(other)
+
+        assert "Chart Song 001" in recorded.fulfill.call_args.kwargs["body"]
+        other.abort.assert_called_once()
+
+    def test_record_after_load(self, tmp_path):
+        """Test that record mode saves the rendered page and leaves routing alone"""
+        replay = ScrapeReplay(str(tmp_path), mode=RECORD)
+        page = MagicMock()
+        page.content.return_value = "<html>rendered</html>"
+
+        replay.attach(page)
+        replay.after_load(page, HOT_100_URL)
+
+        page.route.assert_not_called()
+        assert ScrapeReplay(str(tmp_path)).load(HOT_100_URL) == "<html>rendered</html>"
+
+    def test_record_redirected_page_under_requested_url(self, tmp_path):
+        """Test that a page reached through a redirect replays under the URL that was requested"""
+        class RedirectingAdapter(BaseAdapter):
+            def send(self, request, **kwargs):
+                response = requests.Response()
+                response.request = request
+                response.url = request.url
+                if request.url == HOT_100_URL:
+                    response.status_code = 301
+                    response.headers["Location"] = HOT_100_URL + "/"
+                    response._content = b""
+                else:
+                    response.status_code = 200
+                    response._content = b"<html>chart</html>"
+                    response.encoding = "utf-8"
+                return response
+
+            def close(self):
+                pass
+
+        session = ScrapeReplay(str(tmp_path), mode=RECORD).session()
+        session.mount("https://", RedirectingAdapter())
+        assert session.get(HOT_100_URL).url == HOT_100_URL + "/"
+
+        replay = ScrapeReplay(str(tmp_path), mode=REPLAY)
+        assert replay.load(HOT_100_URL) == "<html>chart</html>"
+        assert replay.load(HOT_100_URL + "/") == "<html>chart</html>"
@@ -1,5 +1,8 @@
+import threading
 import pytest
+from datetime import date
 from unittest.mock import Mock, patch, MagicMock
+from services.http_scraper import HttpFetchResult
 from services.scraper import Scraper
 from model.songs import Songs
 from model.song import Song
@@ -14,7 +17,7 @@ class TestScraper:
             
     @pytest.fixture
     def scraper(self):
-        return Scraper(headless=True, chart_type="billboard_hot_100")
+        return Scraper(headless=True, chart_type="billboard_hot_100", engine="playwright")
     
     def test_scraper_initialization(self):
         """Test scraper initialization with default values"""
@@ -84,4 +87,200 @@ class TestScraper:
         captured = capsys.readouterr()
         
         assert "1. Test Song 1 by Test Artist 1" in captured.out
-        assert "2. Test Song 2 by Test Artist 2" in captured.out
\ No newline at end of file
+        assert "2. Test Song 2 by Test Artist 2" in captured.out
+
+    def test_scraper_invalid_extraction_mode(self):
+        """Test scraper initialization with invalid extraction mode"""
+        with pytest.raises(ValueError) as exc_info:
+            Scraper(extraction_mode="invalid_mode")
+        assert "Extraction mode 'invalid_mode' is not supported" in str(exc_info.value)
+
+    def test_extract_songs_evaluate_mode(self, scraper):
+        """Test that evaluate mode reads every row in a single page evaluation"""
+        mock_page = MagicMock()
+        mock_page.eval_on_selector_all.return_value = [
+            ["Test Song 1", "Test Artist 1"],
+            [None, "Test Artist 2"]
+        ]
+
+        songs = scraper._extract_songs(mock_page)
+
+        mock_page.eval_on_selector_all.assert_called_once()
+        mock_page.query_selector_all.assert_not_called()
+        selector, _, selectors = mock_page.eval_on_selector_all.call_args.args
+        assert selector == scraper.tags.chart_item
+        assert selectors == [scraper.tags.title, scraper.tags.artist]
+        assert [song.to_dict() for song in songs] == [
+            {"title": "Test Song 1", "artist": "Test Artist 1"},
+            {"title": "Unknown Title", "artist": "Test Artist 2"}
+        ]
+
+    def test_extract_songs_per_element_mode(self):
+        """Test that per-element mode matches the evaluate mode output"""
+        scraper = Scraper(chart_type="billboard_hot_100", extraction_mode="per_element")
+        mock_title_element = MagicMock()
+        mock_title_element.inner_text.return_value = "  Test Song  "
+        mock_item = MagicMock()
+        mock_item.query_selector.side_effect = lambda selector: {
+            scraper.tags.title: mock_title_element
+        }.get(selector)
+        mock_page = MagicMock()
+        mock_page.query_selector_all.return_value = [mock_item]
+
+        songs = scraper._extract_songs(mock_page)
+
+        mock_page.eval_on_selector_all.assert_not_called()
+        assert songs[0].to_dict() == {"title": "Test Song", "artist": "Unknown Artist"}
+
+    def test_get_latest_chart_uses_browser_pool(self):
+        """Test that a pooled scraper leases a page instead of launching Chromium"""
+        mock_page = MagicMock()
+        mock_page.eval_on_selector_all.return_value = [["Test Song", "Test Artist"]]
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = lambda fn: fn(mock_page)
+        scraper = Scraper(chart_type="billboard_hot_100", browser_pool=mock_pool, engine="playwright")
+
+        with patch('services.scraper.sync_playwright') as mock_sync_playwright:
+            result = scraper.get_latest_chart()
+
+        mock_sync_playwright.assert_not_called()
+        mock_page.goto.assert_called_once()
+        assert result.songs[0].to_dict() == {"title": "Test Song", "artist": "Test Artist"}
+
+    def test_scraper_invalid_engine(self):
+        """Test scraper initialization with invalid engine"""
+        with pytest.raises(ValueError) as exc_info:
+            Scraper(engine="invalid_engine")
+        assert "Scraper engine 'invalid_engine' is not supported" in str(exc_info.value)
+
+    def test_http_engine_skips_browser(self):
+        """Test that the HTTP engine returns parsed rows without launching Chromium"""
+        scraper = Scraper(chart_type="billboard_hot_100", engine="http")
+        scraper.http_fetcher = MagicMock()
+        scraper.http_fetcher.fetch_conditional.return_value = HttpFetchResult([["Test Song", "Test Artist"]])
+
+        with patch('services.scraper.sync_playwright') as mock_sync_playwright:
+            result = scraper.get_latest_chart()
+
+        mock_sync_playwright.assert_not_called()
+        assert result.songs[0].to_dict() == {"title": "Test Song", "artist": "Test Artist"}
+
+    def test_http_engine_falls_back_to_playwright(self):
+        """Test that zero matched rows on the HTTP engine falls back to Playwright"""
+        mock_page = MagicMock()
+        mock_page.eval_on_selector_all.return_value = [["Test Song", "Test Artist"]]
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = lambda fn: fn(mock_page)
+        scraper = Scraper(chart_type="billboard_hot_100", engine="http", browser_pool=mock_pool)
+        scraper.http_fetcher = MagicMock()
+        scraper.http_fetcher.fetch_conditional.return_value = HttpFetchResult([])
+
+        result = scraper.get_latest_chart()
+
+        mock_pool.run.assert_called_once()
+        assert result.songs[0].title == "Test Song"
+
+    def test_get_chart_for_date(self, scraper):
+        """Test that a past week is scraped from the dated chart URL"""
+        scraper._scrape_chart = MagicMock(return_value=Songs([]))
+        scraper.get_chart_for_date(date(2015, 7, 1))
+        scraper._scrape_chart.assert_called_once_with("https://www.billboard.com/charts/hot-100/2015-07-04/")
+
+    def test_get_chart_for_date_discards_redirects(self):
+        """Test that a dated request answered with another week's page returns no songs"""
+        scraper = Scraper(chart_type="billboard_hot_100", engine="http")
+        scraper.http_fetcher = MagicMock()
+        scraper.http_fetcher.fetch_conditional.return_value = HttpFetchResult(
+            [["Test Song", "Test Artist"]], url="https://www.billboard.com/charts/hot-100/")
+
+        assert scraper.get_chart_for_date(date(1950, 1, 7)).songs == []
+
+        scraper.http_fetcher.fetch_conditional.return_value = HttpFetchResult(
+            [["Test Song", "Test Artist"]], url="https://www.billboard.com/charts/hot-100/2015-07-04/")
+        assert scraper.get_chart_for_date(date(2015, 7, 1)).songs[0].title == "Test Song"
+
+    def test_get_chart_for_date_unsupported(self):
+        """Test that charts without a dated URL reject date lookups"""
+        scraper = Scraper(chart_type="billboard_decade_end_hot_100")
+        with pytest.raises(ValueError):
+            scraper.get_chart_for_date(date(2015, 7, 4))
+
+    def test_iter_latest_chart_streams_batches(self):
+        """Test that Playwright streaming reads the page in row slices and yields every song in order"""
+        rows = [[f"Song {i}", f"Artist {i}"] for i in range(25)]
+        mock_page = MagicMock()
+        mock_page.eval_on_selector_all.side_effect = lambda selector, script, args: rows[args[2]:args[3]]
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = lambda fn: fn(mock_page)
+        scraper = Scraper(chart_type="billboard_hot_100", browser_pool=mock_pool, engine="playwright")
+
+        songs = list(scraper.iter_latest_chart())
+
+        assert [song.title for song in songs] == [f"Song {i}" for i in range(25)]
+        starts = [call.args[2][2] for call in mock_page.eval_on_selector_all.call_args_list]
+        assert starts == [0, 10, 20]
+
+    def test_iter_latest_chart_reports_rows(self):
+        """Test that progress_callback receives the rows streamed so far and the total at the end"""
+        rows = [[f"Song {i}", f"Artist {i}"] for i in range(3)]
+        mock_page = MagicMock()
+        mock_page.eval_on_selector_all.side_effect = lambda selector, script, args: rows[args[2]:args[3]]
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = lambda fn: fn(mock_page)
+        events = []
+        scraper = Scraper(chart_type="billboard_tiktok_top_50", browser_pool=mock_pool, engine="playwright",
+                          progress_callback=events.append)
+
+        assert len(list(scraper.iter_latest_chart())) == 3
+        assert events == [{"stage": "scraping", "rows": 1}, {"stage": "scraping", "rows": 2},
+                          {"stage": "scraping", "rows": 3}, {"stage": "scraped", "rows": 3}]
+
+    def test_iter_latest_chart_yields_before_scrape_finishes(self):
+        """Test that the first song reaches the caller while later rows are still being extracted"""
+        first_song_seen = threading.Event()
+        mock_page = MagicMock()
+
+        def eval_rows(selector, script, args):
+            if args[2] == 0:
+                return [[f"Song {i}", "Artist"] for i in range(10)]
+            assert first_song_seen.wait(timeout=2)
+            return [["Last Song", "Artist"]]
+
+        mock_page.eval_on_selector_all.side_effect = eval_rows
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = lambda fn: fn(mock_page)
+        scraper = Scraper(chart_type="billboard_hot_100", browser_pool=mock_pool, engine="playwright")
+
+        stream = scraper.iter_latest_chart()
+        assert next(stream).title == "Song 0"
+        first_song_seen.set()
+
+        assert [song.title for song in stream][-1] == "Last Song"
+
+    def test_iter_latest_chart_raises_scrape_errors(self):
+        """Test that a scrape failing midway raises after the rows already read instead of ending quietly"""
+        mock_page = MagicMock()
+        mock_page.eval_on_selector_all.side_effect = [[[f"Song {i}", "Artist"] for i in range(10)],
+                                                      Exception("Target page closed")]
+        mock_pool = MagicMock()
+        mock_pool.run.side_effect = lambda fn: fn(mock_page)
+        scraper = Scraper(chart_type="billboard_hot_100", browser_pool=mock_pool, engine="playwright")
+
+        stream = scraper.iter_latest_chart()
+        titles = []
+        with pytest.raises(Exception, match="Target page closed"):
+            for song in stream:
+                titles.append(song.title)
+        assert titles == [f"Song {i}" for i in range(10)]
+
+    def test_iter_latest_chart_http_engine(self):
+        """Test that the HTTP engine streams its parsed rows without launching Chromium"""
+        scraper = Scraper(chart_type="billboard_hot_100", engine="http")
+        scraper.http_fetcher = MagicMock()
+        scraper.http_fetcher.fetch_conditional.return_value = HttpFetchResult([["Test Song", "Test Artist"]])
+
+        with patch('services.scraper.sync_playwright') as mock_sync_playwright:
+            songs = list(scraper.iter_latest_chart())
+
+        mock_sync_playwright.assert_not_called()
+        assert songs[0].to_dict() == {"title": "Test Song", "artist": "Test Artist"}
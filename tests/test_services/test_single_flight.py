@@ -0,0 +1,127 @@
+import threading
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from services.single_flight import SingleFlight, get_single_flight, single_flight_metrics
+from services.spotify_operations.spotify_playlist_maker import SpotifyPlaylistMaker
+
+
+class TestSingleFlight:
+    """Test suite for SingleFlight coalescing"""
+
+    @pytest.fixture
+    def flight(self):
+        return SingleFlight("test")
+
+    def run_concurrently(self, count, fn):
+        executor = ThreadPoolExecutor(max_workers=count)
+        futures = [executor.submit(fn) for _ in range(count)]
+        executor.shutdown(wait=False)
+        return futures
+
+    def wait_for_calls(self, flight, calls):
+        while flight.metrics()["calls"] < calls:
+            time.sleep(0.01)
+
+    def test_concurrent_calls_share_one_execution(self, flight):
+        """Test that callers arriving while a call is in flight get its result without running it"""
+        release = threading.Event()
+        executions = []
+
+        def work():
+            executions.append(1)
+            assert release.wait(timeout=2)
+            return "chart"
+
+        futures = self.run_concurrently(5, lambda: flight.do("key", work))
+        self.wait_for_calls(flight, 5)
+        release.set()
+
+        assert [future.result() for future in futures] == ["chart"] * 5
+        assert len(executions) == 1
+        metrics = flight.metrics()
+        assert (metrics["executions"], metrics["coalesced"], metrics["in_flight"]) == (1, 4, 0)
+
+    def test_errors_reach_every_waiter_and_are_not_kept(self, flight):
+        """Test that a failure is raised in all joined callers and the next call runs again"""
+        release = threading.Event()
+
+        def fail():
+            assert release.wait(timeout=2)
+            raise RuntimeError("scrape failed")
+
+        futures = self.run_concurrently(3, lambda: flight.do("key", fail))
+        self.wait_for_calls(flight, 3)
+        release.set()
+
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+        assert flight.do("key", lambda: "retried") == "retried"
+        assert flight.metrics()["failures"] == 1
+
+    def test_different_keys_run_separately(self, flight):
+        """Test that only identical keys are coalesced"""
+        assert flight.do("a", lambda: 1) == 1
+        assert flight.do("b", lambda: 2) == 2
+        assert flight.metrics()["executions"] == 2
+
+    def test_stream_followers_replay_and_follow(self, flight):
+        """Test that a stream joined late replays earlier items and then follows the same source"""
+        produced = threading.Event()
+        release = threading.Event()
+
+        def source():
+            yield 1
+            produced.set()
+            assert release.wait(timeout=2)
+            yield 2
+
+        first = flight.stream("chart", source)
+        assert produced.wait(timeout=2)
+        second = flight.stream("chart", source)
+        release.set()
+
+        assert list(second) == [1, 2]
+        assert list(first) == [1, 2]
+        assert flight.metrics()["coalesced"] == 1
+
+    def test_stream_errors_follow_the_items(self, flight):
+        """Test that a failing source raises in every follower after the items it produced"""
+        def source():
+            yield 1
+            raise RuntimeError("stream broke")
+
+        stream = flight.stream("chart", source)
+        items = []
+        with pytest.raises(RuntimeError):
+            for item in stream:
+                items.append(item)
+        assert items == [1]
+
+    def test_named_groups_are_shared(self):
+        """Test that groups are process-wide and reported by name"""
+        assert get_single_flight("shared-test") is get_single_flight("shared-test")
+        assert "shared-test" in single_flight_metrics()
+
+    def test_search_song_coalesces_identical_searches(self):
+        """Test that concurrent searches for the same normalized song make one Spotify lookup"""
+        release = threading.Event()
+        with patch('services.spotify_operations.spotify_playlist_maker.SpotifyAuth'):
+            maker = SpotifyPlaylistMaker()
+
+        def search(**kwargs):
+            assert release.wait(timeout=2)
+            return {'tracks': {'items': [{'uri': 'spotify:track:1', 'name': 'Song', 'artists': [{'name': 'Artist'}]}]}}
+
+        maker.sp.search.side_effect = search
+        flight = get_single_flight("track_search")
+        calls = flight.metrics()["calls"]
+        futures = self.run_concurrently(3, lambda: maker.search_song("Artist", "Song"))
+        futures += self.run_concurrently(1, lambda: maker.search_song("ARTIST", "song"))
+        self.wait_for_calls(flight, calls + 4)
+        release.set()
+
+        assert [future.result() for future in futures] == ["spotify:track:1"] * 4
+        maker.sp.search.assert_called_once()
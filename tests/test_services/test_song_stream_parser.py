@@ -0,0 +1,86 @@
+import threading
+import pytest
+from unittest.mock import MagicMock
+from services.gpt_cache import GPTResponseCache
+from services.gpt_operations import GPTOperations
+from services.song_stream_parser import SongStreamParser
+
+
+RESPONSE = ('Here you go:\n```json\n[\n  {"title": "Don\'t Stop Me Now", "artist": "Queen"},\n'
+            '  {"title": "Say \\"Hi\\" {Remix}", "artist": "A]B"},\n'
+            '  {"name": "missing fields"},\n'
+            '  {"title": "Eye of the Tiger", "artist": "Survivor", "year": {"released": 1982}}\n]\n```')
+
+
+def chunk(text):
+    item = MagicMock()
+    item.choices[0].delta.content = text
+    return item
+
+
+class TestSongStreamParser:
+    """Test suite for SongStreamParser and streamed GPT song requests"""
+
+    def test_songs_complete_as_their_objects_close(self):
+        """Test that each song is returned by the fragment that closes it, however the text is split"""
+        parser = SongStreamParser()
+        completed = [parser.feed(char) for char in RESPONSE]
+
+        songs = [song for batch in completed for song in batch]
+        assert songs == [{"title": "Don't Stop Me Now", "artist": "Queen"},
+                         {"title": 'Say "Hi" {Remix}', "artist": "A]B"},
+                         {"title": "Eye of the Tiger", "artist": "Survivor"}]
+        first_close = RESPONSE.index('"Queen"}') + len('"Queen"}') - 1
+        assert completed[first_close] == [songs[0]]
+        assert parser.skipped == 1
+        assert parser.finished
+
+    def test_unfinished_array(self):
+        """Test that a truncated response yields the complete objects and is not finished"""
+        parser = SongStreamParser()
+
+        assert parser.feed('[{"title": "A", "artist": "B"}, {"title": "C", "art') == [{"title": "A", "artist": "B"}]
+        assert not parser.finished
+
+    @pytest.fixture
+    def client(self):
+        return MagicMock()
+
+    def test_stream_songs_yields_before_the_completion_ends(self, client, tmp_path):
+        """Test that the first song is yielded while the model is still generating, and complete lists are cached"""
+        first_song_read = threading.Event()
+
+        def completion(**kwargs):
+            assert kwargs["stream"] is True
+            yield chunk('[{"title": "A", ')
+            yield chunk('"artist": "B"}')
+            # The rest of the completion only arrives once the first song has been consumed
+            assert first_song_read.wait(timeout=2)
+            yield chunk(', {"title": "C", "artist": "D"}]')
+
+        client.chat.completions.create.side_effect = completion
+        cache = GPTResponseCache(str(tmp_path / "gpt.sqlite3"))
+        gpt_operations = GPTOperations(client=client, cache=cache)
+
+        stream = gpt_operations.stream_songs("road trip")
+        assert next(stream).title == "A"
+        first_song_read.set()
+        assert [song.title for song in stream] == ["C"]
+
+        assert [song.title for song in gpt_operations.stream_songs("Road trip")] == ["A", "C"]
+        client.chat.completions.create.assert_called_once()
+        cache.close()
+
+    def test_stream_errors_end_the_stream_uncached(self, client, tmp_path):
+        """Test that songs before an API error are kept and the partial list is not cached"""
+        def completion(**kwargs):
+            yield chunk('[{"title": "A", "artist": "B"},')
+            raise RuntimeError("connection reset")
+
+        client.chat.completions.create.side_effect = completion
+        cache = GPTResponseCache(str(tmp_path / "gpt.sqlite3"))
+        gpt_operations = GPTOperations(client=client, cache=cache)
+
+        assert [song.title for song in gpt_operations.stream_songs("road trip")] == ["A"]
+        assert cache.metrics()["entries"] == 0
+        cache.close()
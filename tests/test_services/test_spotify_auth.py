@@ -1,3 +1,5 @@
+import threading
+import time
 import pytest
 from unittest.mock import Mock, patch, MagicMock
 from services.scraper import Scraper
@@ -41,3 +43,65 @@ class TestSpotifyAuth:
         spotify_auth.sp = None
         client = spotify_auth.get_spotify_client()
         assert client is not None
+
+
+class TestSpotifyAuthTokenLifecycle:
+    """Test suite for the in-memory token lifecycle"""
+
+    @pytest.fixture
+    def spotify_auth(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('SPOTIFY_TOKEN_CACHE_PATH', str(tmp_path / "token.json"))
+        with patch('services.spotify_operations.spotify_auth.spotipy.Spotify'), \
+                patch('services.spotify_operations.spotify_auth.SpotifyOAuth'):
+            auth = SpotifyAuth()
+        yield auth
+        auth.close()
+
+    @staticmethod
+    def token(expires_in, access_token="access"):
+        return {"access_token": access_token, "refresh_token": "refresh",
+                "expires_at": int(time.time()) + expires_in}
+
+    def test_fresh_token_needs_no_io(self, spotify_auth):
+        """Test that a fresh in-memory token is returned without refreshing or reading the file"""
+        spotify_auth.token_cache.save_token_to_cache(self.token(3600))
+
+        with patch.object(spotify_auth.token_cache, 'reload') as reload:
+            for _ in range(100):
+                spotify_auth.refresh_token_if_expired()
+            assert spotify_auth.get_access_token() == "access"
+
+        reload.assert_not_called()
+        spotify_auth.sp.auth_manager.refresh_access_token.assert_not_called()
+
+    def test_expiring_token_refreshed_once(self, spotify_auth):
+        """Test that concurrent callers trigger a single proactive refresh"""
+        spotify_auth.token_cache.save_token_to_cache(self.token(60))
+        refreshes = []
+
+        def refresh_access_token(refresh_token):
+            time.sleep(0.05)
+            refreshes.append(refresh_token)
+            new_token = self.token(3600, access_token="refreshed")
+            spotify_auth.token_cache.save_token_to_cache(new_token)
+            return new_token
+
+        spotify_auth.sp.auth_manager.refresh_access_token.side_effect = refresh_access_token
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(spotify_auth.get_access_token()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert refreshes == ["refresh"]
+        assert results == ["refreshed"] * 8
+
+    def test_first_token_runs_authorization_flow(self, spotify_auth):
+        """Test that with nothing cached the OAuth manager's flow supplies the token"""
+        spotify_auth.sp.auth_manager.get_access_token.return_value = "authorized"
+
+        assert spotify_auth.get_access_token() == "authorized"
+        spotify_auth.sp.auth_manager.refresh_access_token.assert_not_called()
+
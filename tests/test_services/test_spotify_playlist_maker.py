@@ -0,0 +1,168 @@
+import pytest
+from unittest.mock import patch
+from spotipy.exceptions import SpotifyException
+from services.spotify_operations.spotify_playlist_maker import SpotifyPlaylistMaker
+
+
+class TestSpotifyPlaylistMaker:
+    """Test suite for SpotifyPlaylistMaker service"""
+
+    @pytest.fixture
+    def maker(self):
+        with patch('services.spotify_operations.spotify_playlist_maker.SpotifyAuth'), \
+                patch('services.spotify_operations.spotify_playlist_maker.time.sleep') as sleep:
+            maker = SpotifyPlaylistMaker()
+            maker.sleep = sleep
+            yield maker
+
+    @pytest.fixture
+    def uris(self):
+        return [f"spotify:track:{n}" for n in range(250)]
+
+    def test_add_tracks_in_ordered_chunks(self, maker, uris):
+        """Test that large lists are sent as ordered chunks of at most 100 and the last snapshot is returned"""
+        maker.sp.playlist_add_items.side_effect = [{"snapshot_id": f"snap-{n}"} for n in range(3)]
+
+        snapshot_id = maker.add_tracks_to_playlist("playlist", uris)
+
+        chunks = [call.args[1] for call in maker.sp.playlist_add_items.call_args_list]
+        assert [len(chunk) for chunk in chunks] == [100, 100, 50]
+        assert sum(chunks, []) == uris
+        assert snapshot_id == "snap-2"
+
+    def test_add_tracks_reports_each_chunk(self, maker, uris):
+        """Test that progress_callback receives every chunk as it is added"""
+        maker.sp.playlist_add_items.side_effect = [{"snapshot_id": f"snap-{n}"} for n in range(3)]
+        events = []
+
+        maker.add_tracks_to_playlist("playlist", uris, progress_callback=events.append)
+
+        assert events == [{"stage": "added_chunk", "chunk": 1, "chunks": 3, "tracks": 100},
+                          {"stage": "added_chunk", "chunk": 2, "chunks": 3, "tracks": 200},
+                          {"stage": "added_chunk", "chunk": 3, "chunks": 3, "tracks": 250}]
+
+    def test_rate_limited_chunk_is_retried(self, maker, uris):
+        """Test that a 429 waits for Retry-After and re-sends the same chunk"""
+        maker.sp.playlist_add_items.side_effect = [
+            SpotifyException(429, -1, "Too Many Requests", headers={"Retry-After": "2"}),
+            {"snapshot_id": "snap-0"}
+        ]
+
+        assert maker.add_tracks_to_playlist("playlist", uris[:100], snapshot_id="snap-start") == "snap-0"
+        maker.sleep.assert_called_once_with(2.0)
+        maker.sp.playlist.assert_not_called()
+
+    def test_server_error_retried_with_backoff(self, maker, uris):
+        """Test that 5xx failures back off exponentially"""
+        maker.sp.playlist_add_items.side_effect = [
+            SpotifyException(502, -1, "Bad Gateway"),
+            SpotifyException(502, -1, "Bad Gateway"),
+            {"snapshot_id": "snap-0"}
+        ]
+
+        assert maker.add_tracks_to_playlist("playlist", uris[:10]) == "snap-0"
+        assert [call.args[0] for call in maker.sleep.call_args_list] == [0.5, 1.0]
+
+    def test_applied_chunk_is_not_sent_twice(self, maker, uris):
+        """Test that a timed-out chunk whose write landed is detected through the snapshot_id"""
+        maker.sp.playlist_add_items.side_effect = [
+            {"snapshot_id": "snap-0"},
+            TimeoutError("Read timed out"),
+            {"snapshot_id": "snap-2"}
+        ]
+        maker.sp.playlist.return_value = {"snapshot_id": "snap-1"}
+
+        assert maker.add_tracks_to_playlist("playlist", uris, snapshot_id="snap-start") == "snap-2"
+        assert maker.sp.playlist_add_items.call_count == 3
+        maker.sp.playlist.assert_called_once_with("playlist", fields="snapshot_id")
+
+    def test_single_chunk_is_not_sent_twice(self, maker, uris):
+        """Test that a new playlist's snapshot_id guards its first chunk, and is read when not given"""
+        maker.sp.user_playlist_create.return_value = {"id": "playlist", "snapshot_id": "snap-created"}
+        maker.sp.playlist_add_items.side_effect = [TimeoutError("Read timed out"), TimeoutError("Read timed out")]
+        maker.sp.playlist.return_value = {"snapshot_id": "snap-added"}
+
+        assert maker.create_playlist("user", "Chart", "description") == ("playlist", "snap-created")
+        assert maker.add_tracks_to_playlist("playlist", uris[:10], snapshot_id="snap-created") == "snap-added"
+        assert maker.sp.playlist_add_items.call_count == 1
+
+        maker.sp.playlist.side_effect = [{"snapshot_id": "snap-before"}, {"snapshot_id": "snap-after"}]
+        assert maker.add_tracks_to_playlist("playlist", uris[:10]) == "snap-after"
+        assert maker.sp.playlist_add_items.call_count == 2
+
+    def test_client_errors_are_not_retried(self, maker, uris):
+        """Test that a 4xx other than 429 fails immediately"""
+        maker.sp.playlist_add_items.side_effect = SpotifyException(403, -1, "Forbidden")
+
+        with pytest.raises(SpotifyException):
+            maker.add_tracks_to_playlist("playlist", uris)
+        maker.sp.playlist_add_items.assert_called_once()
+
+    def test_gives_up_after_max_retries(self, maker, uris):
+        """Test that a chunk still failing after the retries raises"""
+        maker.sp.playlist_add_items.side_effect = SpotifyException(503, -1, "Service Unavailable")
+
+        with pytest.raises(SpotifyException):
+            maker.add_tracks_to_playlist("playlist", uris[:10])
+        assert maker.sp.playlist_add_items.call_count == 5
+
+    def test_sync_playlist_applies_only_the_diff(self, maker, uris):
+        """Test that sync reads every page and sends the planned edits chained by snapshot_id"""
+        maker.sp.playlist.return_value = {
+            "snapshot_id": "snap-0",
+            "tracks": {"items": [{"track": {"uri": uri}} for uri in uris[:100]], "next": "page-2"}
+        }
+        maker.sp.playlist_items.return_value = {"items": [{"track": {"uri": uris[100]}}], "next": None}
+        maker.sp.playlist_remove_all_occurrences_of_items.return_value = {"snapshot_id": "snap-1"}
+        maker.sp.playlist_add_items.return_value = {"snapshot_id": "snap-2"}
+
+        result = maker.sync_playlist("playlist", ["spotify:track:new"] + uris[1:101])
+
+        maker.sp.playlist_items.assert_called_once_with("playlist", fields='items(track(uri)),next',
+                                                        limit=100, offset=100)
+        maker.sp.playlist_remove_all_occurrences_of_items.assert_called_once_with(
+            "playlist", [uris[0]], snapshot_id="snap-0")
+        maker.sp.playlist_add_items.assert_called_once_with("playlist", ["spotify:track:new"], position=0)
+        maker.sp.playlist_reorder_items.assert_not_called()
+        assert result == {"strategy": "diff", "added": 1, "removed": 1, "moved": 0, "api_calls": 2,
+                          "snapshot_id": "snap-2"}
+
+    def playlist_item(self, n, user="user-a"):
+        return {"added_by": {"id": user}, "track": {"uri": f"spotify:track:{n}", "name": f"Song {n}",
+                                                     "artists": [{"name": "A"}, {"name": "B"}]}}
+
+    def test_playlist_details_fetches_every_page(self, maker):
+        """Test that details cover the whole playlist in order, fetching pages after the first by offset"""
+        maker.sp.playlist.return_value = {
+            "name": "Big", "description": "", "snapshot_id": "snap-1",
+            "tracks": {"total": 250, "items": [self.playlist_item(n) for n in range(100)]}
+        }
+        maker.sp.playlist_items.side_effect = lambda playlist_id, fields, limit, offset: {
+            "items": [self.playlist_item(n, "user-b") if n != 120 else {"track": None}
+                      for n in range(offset, min(offset + limit, 250))]
+        }
+
+        details = maker.get_playlist_details("playlist")
+
+        assert "tracks(total," in maker.sp.playlist.call_args.kwargs["fields"]
+        offsets = sorted(call.kwargs["offset"] for call in maker.sp.playlist_items.call_args_list)
+        assert offsets == [100, 200]
+        assert [song["title"] for song in details["songs"]] == [f"Song {n}" for n in range(250) if n != 120]
+        assert details["songs"][0] == {"title": "Song 0", "artist": "A, B", "added_by": "user-a",
+                                       "uri": "spotify:track:0", "added_at": None}
+        assert details["collaborators"] == ["user-a", "user-b"]
+        assert details["snapshot_id"] == "snap-1"
+        assert details["total"] == 250
+
+    def test_iter_playlist_pages_streams_in_order(self, maker):
+        """Test that the iterator fetches one page at a time until there is no next page"""
+        pages = {0: {"items": [self.playlist_item(n) for n in range(100)], "next": "page-2"},
+                 100: {"items": [self.playlist_item(100)], "next": None}}
+        maker.sp.playlist_items.side_effect = lambda playlist_id, fields, limit, offset: pages[offset]
+
+        stream = maker.iter_playlist_pages("playlist")
+        assert len(next(stream)) == 100
+        assert maker.sp.playlist_items.call_count == 1
+        assert [song["title"] for song in next(stream)] == ["Song 100"]
+        assert list(stream) == []
+        maker.sp.playlist.assert_not_called()
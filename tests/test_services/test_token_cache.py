@@ -0,0 +1,77 @@
+import json
+import multiprocessing
+import os
+import stat
+import time
+import pytest
+from services.spotify_operations.token_cache import LockedFileCacheHandler
+
+
+def token(expires_in, access_token="access"):
+    return {"access_token": access_token, "refresh_token": "refresh", "expires_at": int(time.time()) + expires_in}
+
+
+def refresh_once(cache_path, log_path):
+    """One worker process: refresh the shared token unless another worker already did"""
+    cache = LockedFileCacheHandler(cache_path)
+    with cache.refresh_lock():
+        if not cache.is_fresh(cache.reload()):
+            time.sleep(0.05)
+            with open(log_path, "a") as log:
+                log.write(f"{os.getpid()}\n")
+            cache.save_token_to_cache(token(3600, access_token=str(os.getpid())))
+
+
+class TestLockedFileCacheHandler:
+    """Test suite for the shared Spotify token cache"""
+
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        return str(tmp_path / "token.json")
+
+    def test_save_and_reload(self, cache_path):
+        """Test that a saved token is written privately and read back by another instance"""
+        LockedFileCacheHandler(cache_path).save_token_to_cache(token(3600))
+
+        assert stat.S_IMODE(os.stat(cache_path).st_mode) == 0o600
+        assert LockedFileCacheHandler(cache_path).get_cached_token()["access_token"] == "access"
+
+    def test_fresh_token_served_from_memory(self, cache_path):
+        """Test that a fresh token is not re-read from disk"""
+        cache = LockedFileCacheHandler(cache_path)
+        cache.save_token_to_cache(token(3600))
+        os.remove(cache_path)
+
+        assert cache.get_cached_token()["access_token"] == "access"
+
+    def test_expiring_token_picks_up_newer_file(self, cache_path):
+        """Test that a token inside the refresh margin is replaced by one another process saved"""
+        cache = LockedFileCacheHandler(cache_path, refresh_margin=300)
+        cache.save_token_to_cache(token(60))
+        with open(cache_path, "w") as f:
+            json.dump(token(3600, access_token="newer"), f)
+
+        assert cache.get_cached_token()["access_token"] == "newer"
+
+    def test_missing_or_corrupt_file(self, cache_path):
+        """Test that an absent or unreadable cache file means no token"""
+        assert LockedFileCacheHandler(cache_path).get_cached_token() is None
+        with open(cache_path, "w") as f:
+            f.write("{not json")
+        assert LockedFileCacheHandler(cache_path).get_cached_token() is None
+
+    @pytest.mark.skipif(os.name != "posix", reason="needs fcntl and fork")
+    def test_one_refresh_across_processes(self, cache_path, tmp_path):
+        """Test that concurrent workers refresh an expired token only once"""
+        LockedFileCacheHandler(cache_path).save_token_to_cache(token(-10))
+        log_path = str(tmp_path / "refreshes.log")
+        context = multiprocessing.get_context("fork")
+
+        workers = [context.Process(target=refresh_once, args=(cache_path, log_path)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=10)
+
+        with open(log_path) as log:
+            assert len(log.readlines()) == 1
@@ -0,0 +1,121 @@
+import threading
+import pytest
+from unittest.mock import patch
+from services.spotify_operations.track_cache import TrackCache, MISS, normalize_track_key
+from services.spotify_operations.spotify_playlist_maker import SpotifyPlaylistMaker
+
+
+class TestTrackCache:
+    """Test suite for TrackCache service"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        cache = TrackCache(str(tmp_path / "tracks.sqlite3"))
+        yield cache
+        cache.close()
+
+    def age_entries(self, cache, seconds):
+        cache._conn.execute("UPDATE tracks SET fetched_at = fetched_at - ?", (seconds,))
+        cache._conn.commit()
+
+    def test_normalize_track_key(self):
+        """Test that case, Unicode forms and whitespace do not change the key"""
+        assert normalize_track_key("  The  WEEKND ", "Blinding Lights") == ("the weeknd", "blinding lights")
+
+    def test_miss_then_hit(self, cache):
+        """Test that a stored URI is returned for the same normalized track"""
+        assert cache.get("Artist", "Song") is MISS
+        cache.put("Artist", "Song", "spotify:track:1")
+
+        assert cache.get("ARTIST", "song ") == "spotify:track:1"
+        metrics = cache.metrics()
+        assert metrics["hits"] == 1
+        assert metrics["misses"] == 1
+        assert metrics["api_calls_saved"] == 1
+        assert metrics["hit_rate"] == 0.5
+        assert metrics["entries"] == 1
+
+    def test_negative_results_use_shorter_ttl(self, cache):
+        """Test that a cached "no match" expires after negative_ttl while found tracks stay"""
+        cache.put("Artist", "Found", "spotify:track:1")
+        cache.put("Artist", "Missing", None)
+        assert cache.get("Artist", "Missing") is None
+        assert cache.metrics()["negative_hits"] == 1
+
+        self.age_entries(cache, cache.negative_ttl)
+
+        assert cache.get("Artist", "Missing") is MISS
+        assert cache.get("Artist", "Found") == "spotify:track:1"
+        assert cache.metrics()["expired"] == 1
+
+    def test_prune_evicts_expired_and_least_recently_used(self, tmp_path):
+        """Test that pruning drops expired entries and then the oldest by last use"""
+        cache = TrackCache(str(tmp_path / "tracks.sqlite3"), max_entries=2)
+        for i in range(3):
+            cache.put("Artist", f"Song {i}", f"spotify:track:{i}")
+            cache._conn.execute("UPDATE tracks SET last_used = ? WHERE title_key = ?", (i, f"song {i}"))
+        cache._conn.commit()
+        cache.put("Artist", "Gone", None)
+        cache._conn.execute("UPDATE tracks SET fetched_at = 0 WHERE title_key = 'gone'")
+        cache._conn.commit()
+
+        assert cache.prune() == 2
+        assert cache.get("Artist", "Song 0") is MISS
+        assert cache.get("Artist", "Song 2") == "spotify:track:2"
+        assert cache.metrics()["evictions"] == 2
+        cache.close()
+
+    def test_shared_between_connections(self, tmp_path):
+        """Test that several caches on one file (as in separate workers) see each other's writes"""
+        path = str(tmp_path / "tracks.sqlite3")
+        caches = [TrackCache(path) for _ in range(4)]
+
+        def write(cache, worker):
+            for i in range(50):
+                cache.put("Artist", f"Song {worker}-{i}", f"spotify:track:{worker}-{i}")
+
+        threads = [threading.Thread(target=write, args=(cache, n)) for n, cache in enumerate(caches)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert caches[0].get("Artist", "Song 3-49") == "spotify:track:3-49"
+        assert caches[3].metrics()["entries"] == 200
+        for cache in caches:
+            cache.close()
+
+    def test_search_song_reads_through_cache(self, cache):
+        """Test that SpotifyPlaylistMaker.search_song only calls Spotify on a cache miss"""
+        with patch('services.spotify_operations.spotify_playlist_maker.SpotifyAuth'):
+            maker = SpotifyPlaylistMaker(track_cache=cache)
+        maker.sp.search.return_value = {'tracks': {'items': [
+            {'uri': 'spotify:track:1', 'name': 'Song', 'artists': [{'name': 'Artist'}]}
+        ]}}
+
+        assert maker.search_song("Artist", "Song") == "spotify:track:1"
+        assert maker.search_song("artist", "SONG") == "spotify:track:1"
+
+        maker.sp.search.assert_called_once()
+        assert cache.metrics()["api_calls_saved"] == 1
+
+    def test_search_song_caches_no_match(self, cache):
+        """Test that a search with no results is cached as None"""
+        with patch('services.spotify_operations.spotify_playlist_maker.SpotifyAuth'):
+            maker = SpotifyPlaylistMaker(track_cache=cache)
+        maker.sp.search.return_value = {'tracks': {'items': []}}
+
+        assert maker.search_song("Artist", "Song") is None
+        searches = maker.sp.search.call_count
+        assert maker.search_song("Artist", "Song") is None
+        assert maker.sp.search.call_count == searches
+
+    def test_search_errors_are_not_cached(self, cache):
+        """Test that a failed search is raised and not stored"""
+        with patch('services.spotify_operations.spotify_playlist_maker.SpotifyAuth'):
+            maker = SpotifyPlaylistMaker(track_cache=cache)
+        maker.sp.search.side_effect = Exception("Spotify API Error")
+
+        with pytest.raises(Exception):
+            maker.search_song("Artist", "Song")
+        assert cache.get("Artist", "Song") is MISS
@@ -0,0 +1,96 @@
+import pytest
+from unittest.mock import patch
+from services.spotify_operations.track_index import TrackIndex
+from services.spotify_operations.spotify_playlist_maker import SpotifyPlaylistMaker
+
+
+def spotify_track(uri, name, artists, popularity=50):
+    return {'uri': uri, 'name': name, 'artists': [{'name': artist} for artist in artists], 'popularity': popularity}
+
+
+class TestTrackIndex:
+    """Test suite for TrackIndex service"""
+
+    @pytest.fixture
+    def index(self, tmp_path):
+        index = TrackIndex(str(tmp_path / "index.sqlite3"))
+        yield index
+        index.close()
+
+    def test_lookup_matches_chart_strings(self, index):
+        """Test that featuring credits, version suffixes and diacritics still find the indexed track"""
+        index.add([
+            spotify_track('spotify:track:1', 'Despacito', ['Luis Fonsi', 'Daddy Yankee']),
+            spotify_track('spotify:track:2', 'Beyoncé Song', ['Beyoncé']),
+            spotify_track('spotify:track:3', 'Another Song', ['Luis Fonsi'])
+        ])
+
+        match = index.lookup("Luis Fonsi & Daddy Yankee Featuring Justin Bieber", "Despacito (Remix)")
+        assert match.uri == 'spotify:track:1'
+        assert match.strategy == "local_index"
+        assert index.lookup("Beyonce", "Beyonce Song").uri == 'spotify:track:2'
+
+    def test_lookup_rejects_weak_matches(self, index):
+        """Test that a different song by the artist or a cover by another artist is not returned"""
+        index.add([
+            spotify_track('spotify:track:1', 'Hello', ['Adele']),
+            spotify_track('spotify:track:2', 'Someone Like You', ['Cover Band'])
+        ])
+
+        assert index.lookup("Adele", "Someone Like You") is None
+        assert index.lookup("Adele", "Easy On Me") is None
+        metrics = index.metrics()
+        assert metrics["lookups"] == 2
+        assert metrics["misses"] == 2
+
+    def test_lookup_skips_other_versions(self, index):
+        """Test that an indexed remix or live recording does not stand in for the charting original"""
+        index.add([
+            spotify_track('spotify:track:1', 'Flowers (Sped Up Remix)', ['Miley Cyrus']),
+            spotify_track('spotify:track:2', 'Espresso - Live at Coachella', ['Sabrina Carpenter'])
+        ])
+
+        assert index.lookup("Miley Cyrus", "Flowers") is None
+        assert index.lookup("Sabrina Carpenter", "Espresso") is None
+        assert index.lookup("Miley Cyrus", "Flowers (Sped Up Remix)").uri == 'spotify:track:1'
+
+    def test_add_upserts_and_skips_local_files(self, index):
+        """Test that re-adding a URI updates it in place and non-track URIs are ignored"""
+        assert index.add([
+            spotify_track('spotify:track:1', 'Old Name', ['Artist']),
+            spotify_track('spotify:local:x', 'Local', ['Artist']),
+            None
+        ]) == 1
+        index.add([spotify_track('spotify:track:1', 'New Name', ['Artist'], popularity=90)])
+
+        assert index.metrics()["entries"] == 1
+        assert index.lookup("Artist", "Old Name") is None
+        assert index.lookup("Artist", "New Name").popularity == 90
+
+    def test_operator_words_are_searched_literally(self, index):
+        """Test that titles containing FTS5 keywords do not break the query"""
+        index.add([spotify_track('spotify:track:1', 'Now Or Never (NOT) AND "More"', ['Halsey'])])
+
+        assert index.lookup("Halsey", 'Now Or Never NOT AND "More"').uri == 'spotify:track:1'
+
+    def test_search_song_resolves_from_index(self, index):
+        """Test that tracks seen in search results and playlists resolve without a Spotify search"""
+        with patch('services.spotify_operations.spotify_playlist_maker.SpotifyAuth'):
+            maker = SpotifyPlaylistMaker(track_index=index)
+        maker.sp.search.return_value = {'tracks': {'items': [
+            spotify_track('spotify:track:1', 'Song', ['Artist']),
+            spotify_track('spotify:track:2', 'Other Song', ['Artist'])
+        ]}}
+        maker.sp.playlist.return_value = {
+            'name': 'Playlist', 'description': '',
+            'tracks': {'items': [{'track': spotify_track('spotify:track:3', 'Listed', ['Someone']), 'added_by': None}]}
+        }
+
+        assert maker.search_song("Artist", "Song") == 'spotify:track:1'
+        maker.get_playlist_details('playlist')
+        searches = maker.sp.search.call_count
+
+        assert maker.search_song("Artist", "Other Song") == 'spotify:track:2'
+        assert maker.search_song("Someone", "Listed") == 'spotify:track:3'
+        assert maker.sp.search.call_count == searches
+        assert index.metrics()["api_calls_saved"] == 2
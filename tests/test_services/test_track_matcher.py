@@ -0,0 +1,118 @@
+import pytest
+from services.spotify_operations import track_matcher
+from services.spotify_operations.track_matcher import (TrackMatcher, clean_title, split_artists, normalize_text,
+                                                       version_markers)
+
+
+def track(uri, name, *artists, popularity=50):
+    return {"uri": uri, "name": name, "artists": [{"name": artist} for artist in artists], "popularity": popularity}
+
+
+class TestChartNormalization:
+    """Test suite for chart string normalization"""
+
+    @pytest.mark.parametrize("title, expected", [
+        ("Title (From Movie)", "Title"),
+        ("Song feat. Other", "Song"),
+        ("Song [Remix] - Remastered 2011", "Song"),
+        ("Dancing With Myself", "Dancing With Myself"),
+        ("(Intro)", "(Intro)"),
+    ])
+    def test_clean_title(self, title, expected):
+        """Test that credits, parentheticals and version suffixes are removed"""
+        assert clean_title(title) == expected
+
+    def test_version_markers(self):
+        """Test that only version parts of a title, not the song's own words, carry version markers"""
+        assert version_markers("Flowers (Sped Up Remix)") == {"sped up", "remix"}
+        assert version_markers("Espresso - Live at Coachella") == {"live"}
+        assert version_markers("Live Forever") == set()
+
+    def test_split_artists(self):
+        """Test that featuring credits and separators split the lead artist from the rest"""
+        assert split_artists("Artist Featuring Other & Third") == ["Artist", "Other", "Third"]
+        assert split_artists("Lil Nas X") == ["Lil Nas X"]
+
+    def test_normalize_text(self):
+        """Test that diacritics, case and punctuation are folded"""
+        assert normalize_text("Beyoncé & JAY-Z!") == "beyonce and jay z"
+
+
+class TestTrackMatcher:
+    """Test suite for the multi-strategy track matcher"""
+
+    @pytest.fixture
+    def queries(self):
+        return []
+
+    def make_matcher(self, queries, results):
+        def search(query, limit):
+            queries.append((query, limit))
+            return results.get(query, [])
+        return TrackMatcher(search)
+
+    def test_strict_query_ranks_candidates(self, queries):
+        """Test that the best candidate wins even when it is not Spotify's first result"""
+        matcher = self.make_matcher(queries, {"track:Song artist:Artist": [
+            track("spotify:track:cover", "Song", "Tribute Band", popularity=90),
+            track("spotify:track:live", "Song - Live", "Artist", popularity=20),
+            track("spotify:track:right", "Song", "Artist", "Other", popularity=70),
+        ]})
+
+        match = matcher.match("Artist Featuring Other", "Song (From Movie)")
+
+        assert match.uri == "spotify:track:right"
+        assert match.strategy == "fielded"
+        assert queries == [("track:Song artist:Artist", 5)]
+
+    def test_escalates_only_when_needed(self, queries):
+        """Test that looser queries run only after stricter ones found nothing good enough"""
+        matcher = self.make_matcher(queries, {"Senorita Shawn Mendes": [
+            track("spotify:track:1", "Señorita", "Shawn Mendes", "Camila Cabello")
+        ]})
+
+        match = matcher.match("Shawn Mendes & Camila Cabello", "Senorita")
+
+        assert match.uri == "spotify:track:1"
+        assert match.strategy == "free_text"
+        assert [query for query, _ in queries] == ["track:Senorita artist:Shawn Mendes", "Senorita Shawn Mendes"]
+
+    def test_rejects_wrong_artist(self, queries):
+        """Test that a same-titled song by someone else is not accepted"""
+        matcher = self.make_matcher(queries, {"track:Hello": [track("spotify:track:other", "Hello", "Lionel Richie")]})
+
+        assert matcher.match("Adele", "Hello") is None
+        assert len(queries) == 3
+
+    def test_other_versions_are_not_taken_for_the_original(self, queries):
+        """Test that a remix or live version is rejected unless the chart title names that version"""
+        remix = track("spotify:track:remix", "Flowers (Sped Up Remix)", "Miley Cyrus", popularity=90)
+        original = track("spotify:track:original", "Flowers", "Miley Cyrus", popularity=60)
+        matcher = self.make_matcher(queries, {"track:Flowers artist:Miley Cyrus": [remix],
+                                              "Flowers Miley Cyrus": [remix, original]})
+
+        assert matcher.match("Miley Cyrus", "Flowers").uri == "spotify:track:original"
+        assert matcher.match("Miley Cyrus", "Flowers (Sped Up Remix)").uri == "spotify:track:remix"
+
+    def test_metrics(self, queries):
+        """Test that match rate and searches per match are reported"""
+        matcher = self.make_matcher(queries, {"track:Song artist:Artist": [track("spotify:track:1", "Song", "Artist")]})
+
+        matcher.match("Artist", "Song")
+        matcher.match("Nobody", "Nothing")
+        metrics = matcher.metrics()
+
+        assert metrics["songs"] == 2
+        assert metrics["matched"] == 1
+        assert metrics["match_rate"] == 0.5
+        assert metrics["api_calls"] == 4
+        assert metrics["api_calls_per_match"] == 4.0
+        assert metrics["matched_by_strategy"]["fielded"] == 1
+
+    def test_difflib_fallback(self, queries, monkeypatch):
+        """Test that ranking works without rapidfuzz"""
+        monkeypatch.setattr(track_matcher, "process", None)
+        matcher = self.make_matcher(queries, {"track:Song artist:Artist": [track("spotify:track:1", "Song", "Artist")]})
+
+        assert matcher.match("Artist", "Song").uri == "spotify:track:1"
+        assert matcher.metrics()["fuzzy_backend"] == "difflib"
@@ -0,0 +1,144 @@
+import random
+import threading
+import time
+import pytest
+from spotipy.exceptions import SpotifyException
+from model.song import Song
+from services.spotify_operations.track_resolver import (
+    TokenBucket, TrackResolver, FOUND, NOT_FOUND, FAILED
+)
+
+
+class TestTokenBucket:
+    """Test suite for the shared Spotify rate limiter"""
+
+    def test_burst_then_steady_rate(self):
+        """Test that a full bucket allows a burst and then hands out tokens at the configured rate"""
+        bucket = TokenBucket(rate=50, capacity=5)
+        start = time.monotonic()
+        for _ in range(10):
+            bucket.acquire()
+        # 5 from the burst, 5 more at 50/s
+        assert time.monotonic() - start >= 0.09
+
+    def test_pause_blocks_acquire(self):
+        """Test that a Retry-After pause holds back every caller"""
+        bucket = TokenBucket(rate=1000)
+        bucket.pause(0.1)
+        start = time.monotonic()
+        bucket.acquire()
+        assert time.monotonic() - start >= 0.09
+
+    def test_invalid_rate(self):
+        """Test that a non-positive rate is rejected"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestTrackResolver:
+    """Test suite for TrackResolver service"""
+
+    @pytest.fixture
+    def songs(self):
+        return [Song(f"Song {i}", f"Artist {i}") for i in range(20)]
+
+    def test_results_keep_chart_order(self, songs):
+        """Test that results come back in input order even when lookups finish out of order"""
+        def search(artist, track):
+            time.sleep(random.uniform(0, 0.01))
+            return f"spotify:track:{track}"
+
+        results = TrackResolver(search, max_workers=8).resolve(songs)
+
+        assert [result.uri for result in results] == [f"spotify:track:Song {i}" for i in range(20)]
+        assert all(result.status == FOUND for result in results)
+
+    def test_reports_status_per_song(self):
+        """Test that found, not found and failed lookups are told apart"""
+        def search(artist, track):
+            if track == "Missing":
+                return None
+            if track == "Broken":
+                raise Exception("Network error")
+            return "spotify:track:1"
+
+        results = TrackResolver(search).resolve([Song("Found", "A"), Song("Missing", "B"), Song("Broken", "C")])
+
+        assert [result.status for result in results] == [FOUND, NOT_FOUND, FAILED]
+        assert results[2].error == "Network error"
+        assert results[1].to_dict()["status"] == "not_found"
+
+    def test_concurrency_is_bounded(self, songs):
+        """Test that no more than max_workers lookups run at once"""
+        lock = threading.Lock()
+        running = {"now": 0, "peak": 0}
+
+        def search(artist, track):
+            with lock:
+                running["now"] += 1
+                running["peak"] = max(running["peak"], running["now"])
+            time.sleep(0.01)
+            with lock:
+                running["now"] -= 1
+            return "spotify:track:1"
+
+        TrackResolver(search, max_workers=3).resolve(songs)
+
+        assert 1 < running["peak"] <= 3
+
+    def test_rate_limited_lookup_retries_after_pause(self):
+        """Test that a 429 pauses the shared bucket for Retry-After, halves concurrency and retries"""
+        bucket = TokenBucket(rate=1000)
+        calls = []
+
+        def search(artist, track):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                raise SpotifyException(429, -1, "Too Many Requests", headers={"Retry-After": "0.05"})
+            return "spotify:track:1"
+
+        resolver = TrackResolver(search, rate_limiter=bucket, max_workers=8)
+        results = resolver.resolve([Song("Song", "Artist")])
+
+        assert results[0].status == FOUND
+        assert calls[1] - calls[0] >= 0.05
+        assert resolver.throttled == 1
+        assert resolver.concurrency == 4
+
+    def test_rate_limited_lookup_gives_up(self):
+        """Test that a lookup still throttled after max_retries counts as failed"""
+        def search(artist, track):
+            raise SpotifyException(429, -1, "Too Many Requests", headers={"Retry-After": "0"})
+
+        resolver = TrackResolver(search, max_retries=2)
+        results = resolver.resolve([Song("Song", "Artist")])
+
+        assert results[0].status == FAILED
+        assert resolver.throttled == 2
+        assert resolver.concurrency == 2
+
+    def test_concurrency_recovers_after_successes(self):
+        """Test that concurrency grows back additively once lookups succeed again"""
+        resolver = TrackResolver(lambda artist, track: "spotify:track:1", max_workers=4)
+        resolver._limit = 1.0
+
+        resolver.resolve([Song(f"Song {i}", "Artist") for i in range(10)])
+
+        assert resolver.concurrency == 4
+
+    def test_consumes_streamed_songs(self):
+        """Test that lookups start before the song iterable is exhausted"""
+        searched = threading.Event()
+
+        def stream():
+            yield Song("First", "Artist")
+            assert searched.wait(timeout=2)
+            yield Song("Second", "Artist")
+
+        def search(artist, track):
+            searched.set()
+            return f"spotify:track:{track}"
+
+        results = TrackResolver(search).resolve(stream())
+
+        assert [result.uri for result in results] == ["spotify:track:First", "spotify:track:Second"]